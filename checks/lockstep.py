@@ -0,0 +1,71 @@
+from typing import *
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import support.lockstep
+from support import LOCKSTEP, TaskTable, lockstep_eligible, simulate, simulate_lockstep
+from support.parsing import tabulate
+
+# Steps batches of random task sets through simulate_lockstep(), with numpy
+# and with the plain lane loops, and compares every set's Result with
+# simulate() on its own. Groups are kept small so that a batch spans
+# several of them and sets of different lengths finish at different ticks.
+#
+#   python3 checks/lockstep.py [sets per policy] [seed]
+
+KINDS: Dict[str, str] = {"RR": "U", "SRT": "U", "ED": "RA"}
+# lanes per group while checking
+GROUP: int = 64
+
+
+def task_set(rng: random.Random, kind: str) -> Tuple[TaskTable, Optional[int]]:
+    # out of arrival order half the time, RA deadlines possibly already past
+    rows = list()
+    clk = rng.randint(0, 30)
+    for index in range(rng.choice((0, 1, 3, 20, 60))):
+        clk += rng.choice((0, 0, 0, 1, 3, 20))
+        deadline = clk + rng.randint(-30, 40) if kind == "RA" else None
+        rows.append(("T{}".format(index), clk, rng.randint(1, 25), deadline))
+    if rng.random() < 0.5:
+        rng.shuffle(rows)
+    return tabulate(kind, rows), rng.choice((0, 1, rng.randint(1, 30)))
+
+
+def check(algorithm: str, tables: List[TaskTable], params: List[Optional[int]]) -> List[str]:
+    # one line per set whose lockstep Result differs
+    problems = list()
+    for index, (tasks, param, got) in enumerate(zip(tables, params, simulate_lockstep(algorithm, tables, params))):
+        expected = simulate(algorithm, tasks, param)
+        if (got.label, got.segments, got.missed) != (expected.label, expected.segments, expected.missed):
+            rows = [(tasks.names[row], tasks.arrival[row], tasks.estimated[row]) for row in range(len(tasks))]
+            problems.append("{} set {} param={}\n{}\nclass    {} {}\nlockstep {} {}".format(
+                algorithm, index, param, rows, expected.segments, sorted(expected.missed),
+                got.segments, sorted(got.missed)))
+    return problems
+
+
+def main(argv: List[str]) -> int:
+    count = int(argv[0]) if argv else 500
+    seed = int(argv[1]) if len(argv) > 1 else 0
+    failed = 0
+    numpy, lanes = support.lockstep.numpy, support.lockstep.LANES
+    support.lockstep.LANES = GROUP
+    for arrays in ((numpy, None) if numpy is not None else (None,)):
+        support.lockstep.numpy = arrays
+        for algorithm in LOCKSTEP:
+            rng = random.Random("{}{}".format(algorithm, seed))
+            sets = [task_set(rng, KINDS[algorithm]) for _ in range(count)]
+            sets = [(tasks, param) for tasks, param in sets if lockstep_eligible(algorithm, tasks)]
+            problems = check(algorithm, [tasks for tasks, param in sets], [param for tasks, param in sets])
+            for problem in problems[:3]:
+                print("{}{}\n".format("" if arrays is None else "numpy ", problem))
+            failed += len(problems)
+    support.lockstep.numpy, support.lockstep.LANES = numpy, lanes
+    print("lockstep: {} sets per policy, {} failed".format(count, failed))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,63 @@
+from typing import *
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import support.nonpreemptive
+from support import NONPREEMPTIVE, build, eligible, run_simulator, simulate_nonpreemptive
+from support.parsing import tabulate
+
+# Runs random U task sets through simulate_nonpreemptive() and through the
+# FCFS and SPN classes it stands in for, with numpy and without, and
+# compares the schedules. Sets come in and out of arrival order, with
+# arrivals before 0, zero length tasks, idle gaps and ties.
+#
+#   python3 checks/nonpreemptive.py [runs] [seed]
+
+
+def task_set(rng: random.Random, run: int) -> List[Tuple[str, int, int, None]]:
+    span = rng.choice((3, 20, 200))
+    rows = [("T{}".format(index),
+             rng.randint(-2 if run % 7 == 0 else 0, span),
+             rng.randint(0 if run % 5 == 0 else 1, 9),
+             None) for index in range(rng.randint(0, 30))]
+    if run % 2:
+        rows.sort(key=lambda row: row[1])
+    return rows
+
+
+def check(rng: random.Random, run: int) -> Optional[str]:
+    # the first disagreement, None if there was none
+    rows = task_set(rng, run)
+    tasks = tabulate("U", rows)
+    for algorithm in NONPREEMPTIVE:
+        if not eligible(algorithm, tasks):
+            continue
+        expected = run_simulator(build(algorithm, tasks.replay() if tasks.ordered else tasks.fresh()))
+        got = simulate_nonpreemptive(algorithm, tasks)
+        if got.label != expected.label or got.segments != expected.segments:
+            return "{} {}\nclass     {}\nfast path {}".format(algorithm, rows, expected.segments, got.segments)
+    return None
+
+
+def main(argv: List[str]) -> int:
+    runs = int(argv[0]) if argv else 2000
+    seed = int(argv[1]) if len(argv) > 1 else 0
+    failed = 0
+    numpy = support.nonpreemptive.numpy
+    for arrays in ((numpy, None) if numpy is not None else (None,)):
+        support.nonpreemptive.numpy = arrays
+        for run in range(seed, seed + runs):
+            problem = check(random.Random(run), run)
+            if problem is not None:
+                failed += 1
+                if failed <= 3:
+                    print("run {}{}:\n{}\n".format(run, "" if arrays is None else " (numpy)", problem))
+    support.nonpreemptive.numpy = numpy
+    print("nonpreemptive: {} runs, {} failed".format(runs, failed))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
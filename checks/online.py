@@ -0,0 +1,121 @@
+from typing import *
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from support import ONLINE, SUITES, OnlineSimulator, Result, simulate
+from support.parsing import tabulate
+from support.results import COMPLETED
+
+# Feeds random task sets to an OnlineSimulator a few tasks at a time,
+# moving the clock with advance_to() and step() in random amounts, and
+# compares the schedule with an offline run of the whole set. Projections
+# taken once every task is in must name the completions (or misses) the
+# offline run ends up with.
+#
+#   python3 checks/online.py [runs] [seed]
+
+Row = Tuple[str, int, int, Optional[int]]
+
+
+def task_set(rng: random.Random, kind: str) -> Tuple[List[Row], Optional[int]]:
+    # rows in arrival order and the quantum, idle allowance or ending time
+    rows = list()
+    if kind == "RP":
+        for index in range(rng.randint(1, 4)):
+            period = rng.randint(2, 25)
+            offset = rng.randint(0, period - 1) if rng.random() < 0.3 else 0
+            rows.append(("T{}".format(index), offset, rng.randint(0, period // 2 + 1), period))
+        return rows, rng.randint(10, 120)
+    clk = 0
+    for index in range(rng.randint(1, 12)):
+        clk += rng.choice((0, 0, 1, 2, 5, 9))
+        deadline = clk + rng.randint(0, 15) if kind == "RA" else None
+        rows.append(("T{}".format(index), clk, rng.randint(1, 9), deadline))
+    if kind == "U":
+        return rows, rng.randint(1, 5)
+    return rows, rng.choice((None, rng.randint(0, 10)))
+
+
+def finals(result: Result) -> Dict[str, Optional[int]]:
+    # completion time per job, None for a miss
+    final = dict((segment.task, segment.stop) for segment in result.segments if segment.kind == COMPLETED)
+    for name in result.missed:
+        final[name] = None
+    return final
+
+
+def drive(rng: random.Random, algorithm: str, kind: str, rows: List[Row],
+          param: Optional[int]) -> Tuple[Result, List[Dict[str, Optional[int]]]]:
+    # the online schedule and the projections taken along the way
+    online = OnlineSimulator(algorithm, None if kind == "RP" else param)
+    projections = list()
+    if kind == "RP":
+        # templates handed over later release from then on, which no
+        # offline run of the file does
+        for row in rows:
+            online.submit(*row)
+        while online.now <= param:
+            # the offline run stops at the ending time, so there is nothing
+            # to hold RP projections to; taking them must leave the run alone
+            if rng.random() < 0.3:
+                online.projection()
+            online.advance_to(min(param + 1, online.now + rng.randint(1, 15)))
+        return online.result, projections
+    pending = list(rows)
+    while pending or not online.simulator.all_done():
+        # some tasks are submitted ahead of their arrival, others just in time
+        while pending and online.now <= pending[0][1] and (pending[0][1] == online.now or rng.random() < 0.2):
+            online.submit(*pending.pop(0))
+        if not pending:
+            projections.append(online.projection())
+            if rng.random() < 0.5:
+                online.step()
+            else:
+                online.advance_to(online.now + rng.randint(1, 10))
+        elif rng.random() < 0.5:
+            online.advance_to(pending[0][1])
+        else:
+            online.advance_to(online.now + rng.randint(0, pending[0][1] - online.now))
+    return online.result, projections
+
+
+def check(rng: random.Random) -> Optional[str]:
+    # the first disagreement, None if there was none
+    kind = rng.choice(("U", "RA", "RP"))
+    rows, param = task_set(rng, kind)
+    for algorithm in SUITES[kind]:
+        if algorithm not in ONLINE:
+            continue
+        expected = simulate(algorithm, tabulate(kind, rows), param)
+        got, projections = drive(rng, algorithm, kind, rows, param)
+        where = "{} {} param={}\n{}".format(algorithm, kind, param, rows)
+        if got.segments != expected.segments or got.missed != expected.missed:
+            return "{}\noffline {} {}\nonline  {} {}".format(where, expected.segments, sorted(expected.missed),
+                                                             got.segments, sorted(got.missed))
+        final = finals(expected)
+        for projection in projections:
+            for name, stop in projection.items():
+                if final.get(name, "unfinished") != stop:
+                    return "{}\n{} projected at {}, offline {}".format(where, name, stop,
+                                                                       final.get(name, "unfinished"))
+    return None
+
+
+def main(argv: List[str]) -> int:
+    runs = int(argv[0]) if argv else 500
+    seed = int(argv[1]) if len(argv) > 1 else 0
+    failed = 0
+    for run in range(runs):
+        problem = check(random.Random(seed + run))
+        if problem is not None:
+            failed += 1
+            if failed <= 3:
+                print("run {}:\n{}\n".format(seed + run, problem))
+    print("online: {} runs, {} failed".format(runs, failed))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
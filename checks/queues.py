@@ -0,0 +1,116 @@
+from typing import *
+from operator import attrgetter
+import copy
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from support.queues import ReadyQueue
+
+# Drives a ReadyQueue and the list it stands in for (appended to, sorted
+# with reverse=True, popped from the end) through the same random
+# operations, keys with many ties re-keyed along the way, and compares
+# every answer the queue gives.
+#
+#   python3 checks/queues.py [runs] [seed]
+
+
+class Item:
+    def __init__(self, name: str, key: int):
+        self.name: str = name
+        self.key: int = key
+
+    def __repr__(self) -> str:
+        return "{}={}".format(self.name, self.key)
+
+
+def check(rng: random.Random, steps: int) -> Optional[str]:
+    # the first disagreement, None if there was none
+    key = attrgetter("key")
+    queue = ReadyQueue(key=key)
+    ready: List[Item] = list()
+    made = 0
+    # re-keyed since the last settle(), which least() does not see yet
+    rekeyed = False
+    log = list()
+    for step in range(steps):
+        roll = rng.random()
+        if roll < 0.3 or not ready:
+            made += 1
+            item = Item("T{}".format(made), rng.randint(0, 4))
+            ready.append(item)
+            queue.push(item)
+            log.append("push {}".format(item))
+        elif roll < 0.45:
+            item = rng.choice(ready)
+            item.key = max(0, item.key + rng.choice((-2, -1, 1, 2)))
+            queue.update(item)
+            rekeyed = True
+            log.append("rekey {}".format(item))
+        elif roll < 0.6:
+            ready.sort(key=key, reverse=True)
+            queue.settle()
+            rekeyed = False
+            log.append("settle")
+        elif roll < 0.72:
+            expected = ready.pop()
+            got = queue.pop()
+            log.append("pop {}".format(expected))
+            if got is not expected:
+                return "{}\npop gave {}".format("\n".join(log), got)
+        elif roll < 0.8:
+            item = rng.choice(ready)
+            ready.remove(item)
+            queue.remove(item)
+            log.append("remove {}".format(item))
+        elif roll < 0.9:
+            # leads() may say no when it cannot tell: anything unsettled but
+            # the item itself, or its key risen while it is the head
+            item = rng.choice(ready)
+            expected = sorted(ready, key=key, reverse=True)[-1] is item
+            settled = (not queue.tail and len(queue.stale) <= (id(item) in queue.stale)
+                       and (item.key <= queue.entries[id(item)][0] or queue.peek() is not item))
+            got = queue.leads(item)
+            log.append("leads {}".format(item))
+            if got and not expected or settled and got != expected:
+                return "{}\nleads gave {}".format("\n".join(log), got)
+        elif roll < 0.97:
+            subset = rng.sample(ready, rng.randint(1, len(ready)))
+            expected = [item for item in ready if item in subset]
+            got = queue.arrange(subset)
+            log.append("arrange {}".format(subset))
+            if [id(item) for item in got] != [id(item) for item in expected]:
+                return "{}\narrange gave {}".format("\n".join(log), got)
+        else:
+            # entries are found by id(), which a copy has to rebuild
+            ready, queue = copy.deepcopy((ready, queue))
+            log.append("copy")
+        if len(queue) != len(ready):
+            return "{}\nlength {} for {}".format("\n".join(log), len(queue), len(ready))
+        if ready:
+            if queue.peek() is not ready[-1]:
+                return "{}\npeek gave {}".format("\n".join(log), queue.peek())
+            if not rekeyed and queue.least() != min(map(key, ready)):
+                return "{}\nleast gave {}".format("\n".join(log), queue.least())
+        if [id(item) for item in queue.listing()] != [id(item) for item in ready]:
+            return "{}\nlisting gave {}".format("\n".join(log), queue.listing())
+    return None
+
+
+def main(argv: List[str]) -> int:
+    runs = int(argv[0]) if argv else 2000
+    seed = int(argv[1]) if len(argv) > 1 else 0
+    failed = 0
+    for run in range(runs):
+        problem = check(random.Random(seed + run), 60)
+        if problem is not None:
+            failed += 1
+            if failed <= 3:
+                print("run {}:\n{}\n".format(seed + run, problem))
+    print("queues: {} runs, {} failed".format(runs, failed))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,6 +1,10 @@
 from support import *
+import support.bench
+from concurrent.futures import Future, ProcessPoolExecutor
 import argparse
+import json
 import os
+import pickle
 import sys
 import re
 
@@ -9,11 +13,363 @@ def perror(*args, **kwargs):
     print(*args, file=sys.stderr, **kwargs)
 
 
+def show(renderer: Callable[[Any], str], outcome: Any, printed: bool = True) -> None:
+    # printed is False for results that only feed --metrics
+    if printed:
+        print(renderer(outcome))
+        print("")
+    if isinstance(outcome, Result) and outcome.profile is not None:
+        perror(render_profile(outcome) + "\n")
+
+
+def streamed(algorithm: str, filepath: str, param: Optional[int], profile: bool, printed: bool,
+             traced: Optional[Trace]) -> Result:
+    # simulate_stream() printing the report as it is produced, the same
+    # text show() gives for a whole Result
+    simulator = build(algorithm, stream_tasks(filepath), param)
+    if printed:
+        print(simulator.result.label)
+
+    def sink(clk: int, segments: List[Segment]) -> None:
+        if traced is not None:
+            traced.add(segments)
+        if printed:
+            sys.stdout.write("".join(render_segment(segment) + "\n" for segment in segments))
+    result = run_simulator(simulator, profile, sink, STREAM_BLOCK)
+    if printed:
+        print("")
+    return result
+
+
+def checkpointed(args: argparse.Namespace, filepaths: List[str]) -> None:
+    # Serial run writing reports to args.output as they are produced and
+    # saving a snapshot to args.checkpoint every so often, so that --resume
+    # picks up from the last one and ends with the same bytes.
+    path = os.path.expanduser(args.checkpoint)
+    digests = dict((filepath, digest_file(filepath)) for filepath in filepaths if os.path.exists(filepath))
+    config = (filepaths, digests, args.analyze, args.trace)
+    snapshot: Optional[Snapshot] = None
+    if args.resume and os.path.exists(path):
+        try:
+            snapshot = load_snapshot(path)
+        except (OSError, EOFError, ValueError, pickle.UnpicklingError) as error:
+            perror("schedule: {}: {}\n".format(path, error))
+            sys.exit(1)
+        if snapshot.config != config:
+            perror("schedule: {} was taken for other files, options or file contents\n".format(path))
+            sys.exit(1)
+    output = Output(open(os.path.expanduser(args.output), "r+b" if snapshot is not None else "wb"))
+    if snapshot is not None:
+        # anything written after the snapshot is produced again
+        output.file.truncate(snapshot.offset)
+        output.file.seek(snapshot.offset)
+        output.offset = snapshot.offset
+
+    work = 0
+    for filepath in filepaths:
+        if not os.path.exists(filepath):
+            perror("schedule: {} doesn't exist\n".format(filepath))
+            continue
+        header, tasks = load_compiled(filepath) if is_compiled(filepath) else load_tasks(filepath)
+        # (analysis, algorithm) per report, in output order
+        reports = list()
+        for algorithm in SUITES[header.kind]:
+            if args.analyze and header.kind == "RP":
+                reports.append((True, algorithm))
+                if not args.trace:
+                    continue
+            reports.append((False, algorithm))
+        for analysis, algorithm in reports:
+            work += 1
+            if snapshot is not None and work <= snapshot.work:
+                continue
+            start = output.offset
+            try:
+                if analysis:
+                    output.write(render_analysis(analyze(algorithm, tasks.fresh())) + "\n\n")
+                elif algorithm not in ONLINE:
+                    # FCFS runs its own loop, it is checkpointed once done
+                    output.write(render(simulate(algorithm, tasks, header.param)) + "\n\n")
+                else:
+                    clk = 0
+                    if snapshot is not None and work == snapshot.work + 1 and snapshot.state is not None:
+                        start = None
+                        simulator = thaw(snapshot.state, snapshot.tables, tasks)
+                        clk = snapshot.clk
+                    else:
+                        # RP templates keep their file order, which FP ranks them by
+                        rows = tasks.fresh() if header.kind == "RP" else Rows(tasks)
+                        simulator = build(algorithm, rows, header.param)
+                        output.write(simulator.result.label + "\n")
+
+                    def save(clk: int) -> None:
+                        state, tables = freeze(simulator, tasks)
+                        save_snapshot(path, Snapshot(SNAPSHOT_VERSION, config, work - 1, output.offset,
+                                                     clk, state, tables))
+                    run_checkpointed(simulator, clk, output, save, args.checkpoint_every, args.checkpoint_seconds)
+                    output.write("\n")
+            except ValueError as error:
+                perror("schedule: {}: {}\n".format(filepath, error))
+                if start is not None:
+                    # as without a checkpoint, a failed report leaves no output
+                    output.file.truncate(start)
+                    output.file.seek(start)
+                    output.offset = start
+                break
+            output.sync()
+            save_snapshot(path, Snapshot(SNAPSHOT_VERSION, config, work, output.offset, None, None, dict()))
+    output.file.close()
+    os.unlink(path)
+
+
+def compile_main(argv: List[str]) -> None:
+    parser = argparse.ArgumentParser(prog="schedule.py compile",
+                                     description="Compile a task file into a binary trace that loads without parsing")
+    parser.add_argument("source", help="task file to compile")
+    parser.add_argument("target", help="path of the compiled trace")
+    args = parser.parse_args(argv)
+    try:
+        compile_trace(os.path.expanduser(args.source), os.path.expanduser(args.target))
+    except (OSError, ValueError, IndexError) as error:
+        perror("schedule: {}: {}\n".format(args.source, error))
+        sys.exit(1)
+
+
+def sweep_main(argv: List[str]) -> None:
+    parser = argparse.ArgumentParser(prog="schedule.py sweep",
+                                     description="Run RR over a range of quanta and EDUI over a range of idle allowances",
+                                     epilog="ranges are N, N,M,... or an inclusive N..M")
+    parser.add_argument("files", nargs="+", help="U and RA task files (or compiled traces)")
+    parser.add_argument("--quantum", type=parse_range, help="RR quanta to try on U files")
+    parser.add_argument("--idle-allowed", type=parse_range, help="EDUI idle allowances to try on RA files")
+    parser.add_argument("-j", "--jobs", type=int, default=0,
+                        help="worker processes (default one per CPU, 1 to run serially)")
+    args = parser.parse_args(argv)
+
+    ranges = {"RR": args.quantum, "EDUI": args.idle_allowed}
+    tables = dict()
+    configs = list()
+    for filepath in args.files:
+        filepath = os.path.abspath(os.path.expanduser(filepath))
+        if not os.path.exists(filepath):
+            perror("schedule: {} doesn't exist\n".format(filepath))
+            continue
+        header, tasks = load_compiled(filepath) if is_compiled(filepath) else load_tasks(filepath)
+        for algorithm in SUITES[header.kind]:
+            if algorithm in KNOBS and ranges[algorithm]:
+                tables[filepath] = tasks
+                configs.extend((filepath, algorithm, param) for param in ranges[algorithm])
+    if not configs:
+        perror("schedule: nothing to sweep, give --quantum for U files or --idle-allowed for RA files\n")
+        sys.exit(1)
+    print(format_table(sweep(tables, configs, args.jobs)))
+
+
+def batch_main(argv: List[str]) -> None:
+    parser = argparse.ArgumentParser(prog="schedule.py batch",
+                                     description="Simulate many small task sets, written back to back in each file")
+    parser.add_argument("files", nargs="+", help="files of concatenated task sets")
+    parser.add_argument("--algorithms", help="comma separated subset of the policies to run")
+    parser.add_argument("-j", "--jobs", type=int, default=0,
+                        help="worker processes (default one per CPU, 1 to run serially)")
+    parser.add_argument("--metrics", choices=sorted(METRIC_FORMATS),
+                        help="print statistics per set and algorithm instead of schedules")
+    args = parser.parse_args(argv)
+
+    # (file#set, task set) with sets numbered from 1 within their file
+    labels = list()
+    sets = list()
+    for filepath in args.files:
+        filepath = os.path.abspath(os.path.expanduser(filepath))
+        try:
+            loaded = load_batch(filepath)
+        except (OSError, ValueError, IndexError) as error:
+            perror("schedule: {}: {}\n".format(filepath, error))
+            continue
+        labels.extend("{}#{}".format(filepath, number + 1) for number in range(len(loaded)))
+        sets.extend(loaded)
+    algorithms = args.algorithms.split(",") if args.algorithms else None
+    try:
+        outcomes = simulate_batch(sets, algorithms, args.jobs, args.metrics is not None)
+    except ValueError as error:
+        perror("schedule: {}\n".format(error))
+        sys.exit(1)
+    if args.metrics:
+        print(METRIC_FORMATS[args.metrics].policies([(label, metrics) for label, outcome in zip(labels, outcomes)
+                                                     for metrics in outcome]))
+        return
+    for label, outcome in zip(labels, outcomes):
+        print(label)
+        for result in outcome:
+            show(render, result)
+
+
+def timeline_main(argv: List[str]) -> None:
+    parser = argparse.ArgumentParser(prog="schedule.py timeline",
+                                     description="Write schedules to a timeline file as they are simulated")
+    parser.add_argument("files", nargs="+", help="task files (or compiled traces)")
+    parser.add_argument("-o", "--output", required=True, help="path of the timeline")
+    parser.add_argument("--format", choices=FORMATS, default="chrome",
+                        help="Chrome trace-event JSON or the columnar binary format")
+    parser.add_argument("--algorithms", help="comma separated subset of the policies to run")
+    parser.add_argument("--cpus", type=int, default=1,
+                        help="simulate M processors (each schedule is then computed whole first)")
+    parser.add_argument("--placement", choices=PLACEMENTS, default="global")
+    args = parser.parse_args(argv)
+    if args.cpus < 1:
+        parser.error("--cpus must be at least 1")
+
+    wanted = set(args.algorithms.split(",")) if args.algorithms else None
+    writer = open_timeline(os.path.expanduser(args.output), args.format)
+    try:
+        for filepath in args.files:
+            filepath = os.path.abspath(os.path.expanduser(filepath))
+            if not os.path.exists(filepath):
+                perror("schedule: {} doesn't exist\n".format(filepath))
+                continue
+            header, tasks = load_compiled(filepath) if is_compiled(filepath) else load_tasks(filepath)
+            for algorithm in SUITES[header.kind]:
+                if wanted is not None and algorithm not in wanted:
+                    continue
+                label = "{} {}".format(algorithm, os.path.basename(filepath))
+                try:
+                    if args.cpus > 1:
+                        export_result(simulate_multi(algorithm, tasks, header.param, args.cpus, args.placement),
+                                      writer, label)
+                    elif algorithm in ONLINE:
+                        rows = tasks.replay() if tasks.ordered else tasks.fresh()
+                        export(build(algorithm, rows, header.param), writer, label)
+                    else:
+                        export_result(simulate(algorithm, tasks, header.param), writer, label)
+                except ValueError as error:
+                    perror("schedule: {}: {}\n".format(filepath, error))
+                    break
+    finally:
+        writer.close()
+
+
+def bench_main(argv: List[str]) -> None:
+    parser = argparse.ArgumentParser(prog="schedule.py bench",
+                                     description="Time every policy on generated workloads")
+    parser.add_argument("--sizes", type=parse_range, default=list(support.bench.SIZES),
+                        help="task counts (templates for RP), default 10 to 10^6 by decades")
+    parser.add_argument("--kinds", default="U,RA,RP", help="comma separated workload kinds")
+    parser.add_argument("--algorithms", help="comma separated subset of the policies to time")
+    parser.add_argument("--arrivals", choices=support.bench.ARRIVALS, default="poisson")
+    parser.add_argument("--service", choices=support.bench.SERVICES, default="exponential")
+    parser.add_argument("--utilization", type=float, default=0.9)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=1, help="keep the best of N runs")
+    parser.add_argument("--budget", type=float, default=60.0,
+                        help="skip bigger sizes for a policy after a run takes this many seconds")
+    parser.add_argument("-o", "--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--compare", help="earlier JSON report to print time ratios against")
+    args = parser.parse_args(argv)
+
+    kinds = [kind for kind in args.kinds.split(",") if kind]
+    for kind in kinds:
+        if kind not in SUITES:
+            parser.error("unknown kind {}".format(kind))
+    wanted = set(args.algorithms.split(",")) if args.algorithms else None
+    algorithms = dict((kind, [algorithm for algorithm in SUITES[kind] if wanted is None or algorithm in wanted])
+                      for kind in kinds)
+    workloads = [Workload(kind, size, args.arrivals, args.service, args.utilization, seed=args.seed)
+                 for kind in kinds for size in args.sizes]
+    report = benchmark(workloads, algorithms, args.repeat, args.budget, log=perror)
+    if args.output:
+        save_report(report, args.output)
+    else:
+        print(json.dumps(report, indent=1))
+    if args.compare:
+        perror(compare(load_report(args.compare), report))
+
+
+def serve_main(argv: List[str]) -> None:
+    parser = argparse.ArgumentParser(prog="schedule.py serve",
+                                     description="Answer JSON line simulation requests on a local socket")
+    parser.add_argument("--socket", required=True, help="path of the Unix socket to listen on")
+    parser.add_argument("-j", "--jobs", type=int, default=0,
+                        help="worker processes (default one per CPU)")
+    parser.add_argument("--pending", type=int,
+                        help="requests in flight before clients are made to wait (default twice the workers)")
+    args = parser.parse_args(argv)
+    serve(os.path.expanduser(args.socket), args.jobs, args.pending)
+
+
 if __name__ == "__main__":
+    if sys.argv[1:2] == ["bench"]:
+        bench_main(sys.argv[2:])
+        sys.exit(0)
+    if sys.argv[1:2] == ["compile"]:
+        compile_main(sys.argv[2:])
+        sys.exit(0)
+    if sys.argv[1:2] == ["sweep"]:
+        sweep_main(sys.argv[2:])
+        sys.exit(0)
+    if sys.argv[1:2] == ["timeline"]:
+        timeline_main(sys.argv[2:])
+        sys.exit(0)
+    if sys.argv[1:2] == ["batch"]:
+        batch_main(sys.argv[2:])
+        sys.exit(0)
+    if sys.argv[1:2] == ["serve"]:
+        serve_main(sys.argv[2:])
+        sys.exit(0)
+
     parser = argparse.ArgumentParser(description="Perform Scheduling Simulation of given task file",
                                      epilog="accepts wildcards and multiple entries")
     parser.add_argument("files", nargs="+", help="lists of file paths to be processed")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="simulate files and algorithms in N worker processes (0 for one per CPU)")
+    parser.add_argument("--stream", action="store_true",
+                        help="read each file lazily per algorithm and print reports as they go "
+                             "(rows must be in arrival order)")
+    parser.add_argument("--analyze", action="store_true",
+                        help="report FP/EDCD schedulability of RP files instead of simulating them")
+    parser.add_argument("--trace", action="store_true",
+                        help="with --analyze, simulate RP files as well")
+    parser.add_argument("--profile", action="store_true",
+                        help="print per-algorithm counters and phase timings to stderr")
+    parser.add_argument("--cpus", type=int, default=1,
+                        help="simulate M processors (files are read whole, --stream is ignored)")
+    parser.add_argument("--placement", choices=PLACEMENTS, default="global",
+                        help="with --cpus, share one ready queue or bin-pack tasks onto processors")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="simulate everything again instead of reusing stored results")
+    parser.add_argument("--cache-dir", help="where results are stored (default ~/.cache/schedule)")
+    parser.add_argument("--cache-size", type=int, default=256,
+                        help="evict the least recently used results beyond this many MiB")
+    parser.add_argument("--metrics", choices=sorted(METRIC_FORMATS),
+                        help="print turnaround, response, waiting and miss statistics instead of schedules")
+    parser.add_argument("--metrics-per-task", action="store_true",
+                        help="with --metrics, print a row per job instead of per file and algorithm")
+    parser.add_argument("-o", "--output", help="write the reports here instead of stdout")
+    parser.add_argument("--checkpoint", help="snapshot long runs to this file as they go (needs --output)")
+    parser.add_argument("--checkpoint-every", type=int,
+                        help="with --checkpoint, take a snapshot every N segments written")
+    parser.add_argument("--checkpoint-seconds", type=float, default=60.0,
+                        help="with --checkpoint, take a snapshot every S seconds (default 60)")
+    parser.add_argument("--resume", action="store_true",
+                        help="with --checkpoint, carry on from the snapshot if there is one")
     args = parser.parse_args()
+    if args.cpus < 1:
+        parser.error("--cpus must be at least 1")
+    if args.checkpoint:
+        if not args.output:
+            parser.error("--checkpoint needs --output")
+        if args.jobs != 1 or args.cpus > 1 or args.profile or args.metrics:
+            parser.error("--checkpoint runs serially on one processor, without --profile or --metrics")
+    elif args.resume:
+        parser.error("--resume needs --checkpoint")
+    if args.metrics_per_task and not args.metrics:
+        parser.error("--metrics-per-task needs --metrics")
+    if args.cpus > 1:
+        args.stream = False
+    if args.stream:
+        # a streamed report is printed as it is produced, never held whole
+        # to be stored, pickled back from a worker or rendered
+        args.no_cache = True
+        args.jobs = 1
 
     filepaths = [os.path.abspath(os.path.expanduser(filepath)) for filepath in args.files]
 
@@ -30,79 +386,131 @@ if __name__ == "__main__":
             for this_file in file_list:
                 temp.append(os.path.join(base_dir, this_file))
         else:
-            temp.append()
+            temp.append(search_string)
     filepaths = temp
 
+    if args.checkpoint:
+        checkpointed(args, filepaths)
+        sys.exit(0)
+    if args.output:
+        sys.stdout = open(os.path.expanduser(args.output), "w")
+
+    cache: Optional[ResultCache] = None
+    if not args.no_cache:
+        cache = ResultCache(os.path.expanduser(args.cache_dir) if args.cache_dir else None, args.cache_size << 20)
+
+    pool: Optional[ProcessPoolExecutor] = None
+    if args.jobs != 1:
+        pool = ProcessPoolExecutor(args.jobs if args.jobs > 0 else None)
+
+    # results are collected in submission order so output stays deterministic
+    pending = list()
+    # (file, metrics) per simulation, or (file, algorithm, task metrics) per
+    # job with --metrics-per-task, and the jobs each file's runs report
+    measured = list()
+    job_sets = dict()
+
+    def record(filepath: str, outcome: Result, traced: Optional[Trace] = None) -> None:
+        if args.metrics_per_task:
+            measured.extend((filepath, outcome.algorithm, metrics)
+                            for metrics in task_metrics(outcome, job_sets[filepath], traced))
+        else:
+            measured.append((filepath, measure(outcome, job_sets[filepath], traced)))
     for filepath in filepaths:
         if not os.path.exists(filepath):
             perror("schedule: {} doesn't exist\n".format(filepath))
             continue
-        with open(filepath, "r") as f:
-            first = f.readline().rstrip("\n")
-            tokens = first.split(",")
-            for token in tokens:
-                token = token.strip(" ").rstrip(" ")
-            type_schedule = tokens[0]
-            if type_schedule == "U":
-                number_of_processes = int(tokens[1])
-                RR_quantum = int(tokens[2])
-                tasks: List[Task] = list()
-                lines = f.readlines()
-                for line in lines:
-                    line.rstrip("\n")
-                    tokens = line.split(",")
-                    for token in tokens:
-                        token = token.strip(" ").rstrip(" ")
-                    name = tokens[0]
-                    arrival = int(tokens[1])
-                    service_time = int(tokens[2])
-                    tasks.append(Task(name, arrival, service_time))
-                FCFS(deepcopy(tasks)).run()
-                print("")
-                RR(deepcopy(tasks), RR_quantum).run()
-                print("")
-                SPN(deepcopy(tasks)).run()
-                print("")
-                SRT(deepcopy(tasks)).run()
-                print("")
-                HRRN(deepcopy(tasks)).run()
-                print("")
-            elif type_schedule == "RA":
-                number_of_processes = int(tokens[1])
-                tasks: List[RealtimeTask] = list()
-                lines = f.readlines()
-                for line in lines:
-                    line.rstrip("\n")
-                    tokens = line.split(",")
-                    for token in tokens:
-                        token = token.strip(" ").rstrip(" ")
-                    name = tokens[0]
-                    arrival = int(tokens[1])
-                    execution_time = int(tokens[2])
-                    starting_deadline = int(tokens[3])
-                    tasks.append(RealtimeTask(name, arrival, execution_time, starting_deadline))
-                ED(deepcopy(tasks)).run()
-                print("")
-                EDUI(deepcopy(tasks)).run()
-                print("")
-                RFCSC(deepcopy(tasks)).run()
-                print("")
-            else:  # RP
-                number_of_processes = int(tokens[1])
-                ending_time = int(tokens[2])
-                tasks: List[RealtimeTask] = list()
-                lines = f.readlines()
-                for line in lines:
-                    line.rstrip("\n")
-                    tokens = line.split(",")
-                    for token in tokens:
-                        token = token.strip(" ").rstrip(" ")
-                    name = tokens[0]
-                    arrival = int(tokens[1])
-                    execution_time = int(tokens[2])
-                    ending_deadline = int(tokens[3])
-                    tasks.append(RealtimeTask(name, arrival, execution_time, end_dln=ending_deadline))
-                FP(deepcopy(tasks), ending_time).run()
-                print("")
-                EDCD(deepcopy(tasks), ending_time).run()
-                print("")
+        compiled = is_compiled(filepath)
+        tasks = None
+        if compiled:
+            # compiled traces are mapped, not read, so --stream has nothing to add
+            header, tasks = load_compiled(filepath)
+        else:
+            header = stream_header(filepath)
+        simulated = [algorithm for algorithm in SUITES[header.kind]
+                     if args.trace or not (args.analyze and header.kind == "RP")]
+        keys = dict()
+        if cache is not None:
+            digest = digest_file(filepath)
+            keys = dict((algorithm, cache_key(digest, algorithm, header.param, args.cpus, args.placement))
+                        for algorithm in simulated)
+        # results stored by earlier runs; profiled runs are always simulated
+        # and their counters are not stored
+        hits = dict()
+        if cache is not None and not args.profile:
+            for key in keys.values():
+                stored = cache.get(key)
+                if stored is not None:
+                    hits[key] = stored
+        # a text file is only parsed when something has to be computed from it
+        if tasks is None and not args.stream and (len(hits) < len(simulated) or args.analyze):
+            header, tasks = load_tasks(filepath)
+        if args.metrics:
+            rows = tasks.replay() if tasks is not None else stream_tasks(filepath)
+            job_sets[filepath] = job_set(header.kind, rows, header.param)
+        # (cache key, renderer, function, arguments...) per report, in output order
+        works = list()
+        for algorithm in SUITES[header.kind]:
+            if args.analyze and header.kind == "RP":
+                templates = list(stream_tasks(filepath)) if args.stream and not compiled else tasks.fresh()
+                works.append((None, render_analysis, analyze, algorithm, templates))
+                if not args.trace:
+                    continue
+            key = keys.get(algorithm)
+            if args.cpus > 1:
+                works.append((key, render, simulate_multi, algorithm, tasks, header.param,
+                              args.cpus, args.placement, args.profile))
+            elif args.stream and not compiled:
+                traced = Trace(job_sets[filepath]) if args.metrics else None
+                works.append((key, None, streamed, algorithm, filepath, header.param, args.profile,
+                              not args.metrics, traced))
+            else:
+                works.append((key, render, simulate, algorithm, tasks, header.param, args.profile))
+        for work in works:
+            key = work[0]
+            stored = hits.get(key)
+            if pool is None:
+                try:
+                    outcome = stored if stored is not None else work[2](*work[3:])
+                except ValueError as error:
+                    perror("schedule: {}: {}\n".format(filepath, error))
+                    break
+                if key is not None and stored is None:
+                    cache.put(key, outcome)
+                if args.metrics and work[1] is render:
+                    record(filepath, outcome)
+                elif work[2] is streamed:
+                    if args.metrics:
+                        record(filepath, outcome, work[-1])
+                    # already printed, only the profile is left
+                    show(work[1], outcome, False)
+                    continue
+                show(work[1], outcome, not args.metrics or work[1] is not render)
+            elif stored is not None:
+                future = Future()
+                future.set_result(stored)
+                pending.append((filepath, None, work[1], future))
+            else:
+                pending.append((filepath, key, work[1], pool.submit(*work[2:])))
+
+    if pool is not None:
+        failed = set()
+        for filepath, key, renderer, future in pending:
+            if filepath in failed:
+                continue
+            try:
+                outcome = future.result()
+            except ValueError as error:
+                perror("schedule: {}: {}\n".format(filepath, error))
+                failed.add(filepath)
+                continue
+            if key is not None:
+                cache.put(key, outcome)
+            if args.metrics and renderer is render:
+                record(filepath, outcome)
+            show(renderer, outcome, not args.metrics or renderer is not render)
+        pool.shutdown()
+
+    if args.metrics and measured:
+        formats = METRIC_FORMATS[args.metrics]
+        print(formats.tasks(measured) if args.metrics_per_task else formats.policies(measured))
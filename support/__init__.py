@@ -1,515 +1,965 @@
 from typing import *
 from collections import deque
-from copy import deepcopy
-
-
-class Task:
-    def __init__(self, name: str, arrival: int, estimated: int, priority: int = 0):
-        self.name: str = name
-        self.arrival: int = arrival
-        self.estimated: int = estimated
-        self.priority: int = priority
-        self.started: Union[int, None] = None
-        self.stopped: Union[int, None] = None
-        self.remaining: int = estimated
-        self.completed: Union[int, None] = None
-        self.serviced: Union[int, None] = None
-        self.waited: int = 0
-
-    def service(self, ticks: int):
-        self.remaining -= ticks
-
-    def wait(self, ticks: int):
-        self.waited += ticks
-
-    def is_done(self) -> bool:
-        return self.remaining <= 0
-
-
-class RealtimeTask(Task):
-    def __init__(self,
-                 name: str,
-                 arrival: int,
-                 estimated: int,
-                 start_dln: Optional[int] = None,
-                 end_dln: Optional[int] = None):
-        super(RealtimeTask, self).__init__(name, arrival, estimated)
-        self.start_dln: Optional[int] = start_dln
-        self.end_dln: Optional[int] = end_dln
-        self.missed: bool = False
-
-    def miss_check(self, time: int) -> None:
-        if self.start_dln is not None:
-            if time > self.start_dln and self.started is None:
-                self.missed = True
-        if self.end_dln is not None:
-            if time >= self.end_dln and self.remaining:
-                self.missed = True
-
-    def is_done(self) -> bool:
-        return self.missed or super(RealtimeTask, self).is_done()
+from heapq import heappush, heappop
+from math import gcd
+from operator import attrgetter
+from .tasks import Task, RealtimeTask, Releases, TaskTable, job_name, releasing
+from .queues import ReadyQueue
+from .results import Result, Segment, Switches, render, render_segment, render_table, COMPLETED, PREEMPTED, MISSED
+from .parsing import Header, load_tasks, stream_header, stream_tasks
+from .compiled import MappedTaskTable, compile_trace, is_compiled, load_compiled
+from .probe import Probe, render_profile
+from .analysis import Analysis, analyze, render_analysis
+from .bench import Workload, benchmark, compare, generate, load_report, save_report, write_tasks
+from .sweep import KNOBS, Summary, format_table, parse_range, summarize, sweep
+from .cache import ResultCache, cache_key, digest_file
+from .metrics import (METRIC_FORMATS, MetricFormat, Metrics, TaskMetrics, Trace, format_metrics, format_task_metrics,
+                      job_set, measure, metrics_csv, metrics_json, task_metrics, task_metrics_csv, task_metrics_json,
+                      trace)
+from .server import SimulationServer, serve
+from .batch import load_batch, simulate_batch
+from .timeline import (FORMATS, Block, ChromeWriter, ColumnarWriter, export, export_result, open_timeline, read_blocks,
+                       read_timeline)
+from .checkpoint import (SNAPSHOT_VERSION, Output, Rows, Snapshot, freeze, load_snapshot, run_checkpointed,
+                         save_snapshot, thaw)
 
 
 class Simulator:
-    def __init__(self, tasks: List[Task]):
-        self.tasks: List[Task] = tasks
+    label: str = ""
+    # set by an online run to the instant it was advanced to, which the
+    # event skipping must not pass while more arrivals may be submitted
+    horizon: Optional[int] = None
+
+    def __init__(self, tasks: Iterable[Task]):
+        self.running: Optional[Task] = None
+        self.result: Result = Result(type(self).__name__, self.label)
+        self.outstanding: int = 0
+        # A list is put in arrival order up front, ties keep their input
+        # order. Anything else is taken as a stream already in arrival order
+        # and is only read one task ahead of the clock.
+        self.streaming: bool = not isinstance(tasks, list)
+        if self.streaming:
+            self.tasks: List[Task] = list()
+            self.arrivals: Iterator[Task] = iter(tasks)
+        else:
+            self.tasks: List[Task] = tasks
+            self.arrivals: Iterator[Task] = iter(sorted(tasks, key=lambda x: x.arrival))
+            for this_task in self.tasks:
+                if not this_task.is_done():
+                    self.outstanding += 1
+        self.upcoming: Optional[Task] = None
+        self.fetch()
+
+    def fetch(self) -> None:
+        previous = self.upcoming
+        self.upcoming = next(self.arrivals, None)
+        if self.streaming and self.upcoming is not None:
+            if previous is not None and self.upcoming.arrival < previous.arrival:
+                raise ValueError("{} arrives before {}, streamed tasks must be in arrival order"
+                                 .format(self.upcoming.name, previous.name))
+            if not self.upcoming.is_done():
+                self.outstanding += 1
 
     def all_done(self) -> bool:
-        done: bool = True
-        for this_task in self.tasks:
-            done = done and this_task.is_done()
-        return done
+        return self.outstanding == 0 and (self.upcoming is None or not self.streaming)
+
+    def arrived(self, clk: int) -> Iterator[Task]:
+        while self.upcoming is not None and self.upcoming.arrival <= clk:
+            this_task = self.upcoming
+            self.fetch()
+            if this_task.arrival == clk:
+                yield this_task
 
-    def run(self):
+    def retire(self, task: Task) -> None:
+        # a task finished or missed; ones handed in already done never counted
+        if task.estimated > 0:
+            self.outstanding -= 1
+
+    def finished(self, clk: int) -> bool:
+        return self.all_done()
+
+    def tick(self, clk: int) -> None:
         pass
 
+    def events(self, clk: int) -> Iterable[Optional[int]]:
+        # instants after clk at which tick() may do something other than
+        # plain service; policies add their own on top of these
+        if self.upcoming is not None:
+            yield self.upcoming.arrival
+        if self.running is not None:
+            yield clk + self.running.remaining
+
+    def skip(self, ticks: int) -> None:
+        # account for ticks on which nothing but service happens
+        if self.running is not None:
+            self.running.service(ticks)
+
+    def advance(self, clk: int) -> int:
+        nxt: Optional[int] = None
+        for when in self.events(clk):
+            if when is None:
+                continue
+            if when <= clk:
+                nxt = clk + 1
+                break
+            if nxt is None or when < nxt:
+                nxt = when
+        if nxt is None:
+            nxt = clk + 1
+        if self.horizon is not None and clk < self.horizon < nxt:
+            nxt = self.horizon
+        if nxt - clk > 1:
+            self.skip(nxt - clk - 1)
+        return nxt
+
+    def drain(self) -> List[Segment]:
+        # hand over the segments reported so far and forget them
+        segments = self.result.segments
+        self.result.segments = list()
+        return segments
+
+    def waiting(self, clk: int) -> List[Task]:
+        # queued tasks, the one dispatched next first
+        ready = getattr(self, "ready", ())
+        order = list(reversed(ready.listing())) if isinstance(ready, ReadyQueue) else list(ready)
+        return [this_task for this_task in order
+                if this_task is not self.running and not getattr(this_task, "missed", False)]
+
+    def run(self,
+            clk: int = 0,
+            until: Optional[int] = None,
+            sink: Optional[Callable[[int, List[Segment]], None]] = None,
+            every: int = 1) -> Result:
+        # The tick loop from clk on, to the end or up to until. With a sink,
+        # segments go out as sink(clk, segments) each time every of them
+        # have piled up and the rest once the run is over, so the Result
+        # comes back without them.
+        mark = every
+        while not self.finished(clk) if until is None else clk < until:
+            self.tick(clk)
+            clk = self.advance(clk)
+            if sink is not None and len(self.result.segments) >= mark:
+                sink(clk, self.drain())
+                # a periodic simulator may hold some back for a recurrence
+                mark = len(self.result.segments) + every
+        if sink is not None and until is None and self.result.segments:
+            # the run is over, so nothing is held back for a recurrence any more
+            segments = self.result.segments
+            self.result.segments = list()
+            sink(clk, segments)
+        return self.result
+
 
 class FCFS(Simulator):
-    def __init__(self, tasks: List[Task]):
+    label = "FCFS:"
+
+    def __init__(self, tasks: Iterable[Task]):
         super(FCFS, self).__init__(tasks)
-        self.tasks.sort(key=lambda x: x.arrival)
-        self.ready: Deque[Task] = deque(tasks)
         self.running: Optional[Task] = None
 
-    def run(self):
-        print("FCFS:")
-        clk: int = 0
-        while self.ready:
-            self.running = self.ready.popleft()
+    def run(self,
+            clk: int = 0,
+            until: Optional[int] = None,
+            sink: Optional[Callable[[int, List[Segment]], None]] = None,
+            every: int = 1) -> Result:
+        # one task at a time to the end, until is not honoured
+        while self.upcoming is not None:
+            self.running = self.upcoming
+            self.fetch()
+            # an idle processor waits for the next arrival
+            clk = max(clk, self.running.arrival)
             self.running.started = clk
             clk += self.running.estimated
             self.running.completed = clk
+            self.retire(self.running)
             # clk += 1
-            print("{}:{}->{}".format(self.running.name,
-                                     self.running.started,
-                                     self.running.completed))
+            self.result.add(self.running.name,
+                            self.running.started,
+                            self.running.completed,
+                            COMPLETED)
+            if sink is not None and len(self.result.segments) >= every:
+                sink(clk, self.drain())
+        if sink is not None and self.result.segments:
+            sink(clk, self.drain())
+        return self.result
 
 
 class RR(Simulator):
-    def __init__(self, tasks: List[Task], quantum: int):
+    label = "RR:"
+
+    def __init__(self, tasks: Iterable[Task], quantum: int):
         super(RR, self).__init__(tasks)
         self.ready: Deque[Task] = deque()
         self.running: Optional[Task] = None
         self.quantum: int = quantum
+        self.time_slice: int = 0
 
-    def run(self):
-        print("RR:")
-        clk: int = 0
-        time_slice: int = 0
-        while not self.all_done():
-            for this_task in self.tasks:
-                if this_task.arrival == clk:
-                    self.ready.append(this_task)
-            if self.running is None and len(self.ready):
-                self.running = self.ready.popleft()
-                self.running.started = clk
-            elif self.running is not None:
-                self.running.service(1)
-                time_slice += 1
-                if self.running.is_done():
-                    self.running.completed = clk
-                    print("{}:{}->{}".format(self.running.name,
-                                             self.running.started,
-                                             self.running.completed))
-                    if len(self.ready):
-                        self.running = self.ready.popleft()
-                        self.running.started = clk
-                    else:
-                        self.running = None
-                    time_slice = 0
-                elif time_slice == self.quantum:
-                    self.running.stopped = clk
-                    print("{}:{}->{}".format(self.running.name,
-                                             self.running.started,
-                                             self.running.stopped))
-                    self.ready.append(self.running)
+    def tick(self, clk: int) -> None:
+        for this_task in self.arrived(clk):
+            self.ready.append(this_task)
+        if self.running is None and len(self.ready):
+            self.running = self.ready.popleft()
+            self.running.started = clk
+        elif self.running is not None:
+            self.running.service(1)
+            self.time_slice += 1
+            if self.running.is_done():
+                self.running.completed = clk
+                self.retire(self.running)
+                self.result.add(self.running.name,
+                                self.running.started,
+                                self.running.completed,
+                                COMPLETED)
+                if len(self.ready):
                     self.running = self.ready.popleft()
                     self.running.started = clk
-                    time_slice = 0
-            clk += 1
+                else:
+                    self.running = None
+                self.time_slice = 0
+            elif self.time_slice == self.quantum:
+                self.running.stopped = clk
+                self.result.add(self.running.name,
+                                self.running.started,
+                                self.running.stopped,
+                                PREEMPTED)
+                self.ready.append(self.running)
+                self.running = self.ready.popleft()
+                self.running.started = clk
+                self.time_slice = 0
+
+    def events(self, clk: int) -> Iterable[Optional[int]]:
+        yield from super(RR, self).events(clk)
+        if self.running is not None:
+            yield clk + self.quantum - self.time_slice
+
+    def skip(self, ticks: int) -> None:
+        super(RR, self).skip(ticks)
+        if self.running is not None:
+            self.time_slice += ticks
 
 
 class SPN(Simulator):
-    def __init__(self, tasks: List[Task]):
+    label = "SPN:"
+
+    def __init__(self, tasks: Iterable[Task]):
         super(SPN, self).__init__(tasks)
-        self.ready: List[Task] = list()
+        self.ready: ReadyQueue = ReadyQueue(key=attrgetter("estimated"))
         self.running: Optional[Task] = None
 
-    def run(self):
-        print("SPN:")
-        clk = 0
-        while not self.all_done():
-            for this_task in self.tasks:
-                if this_task.arrival == clk:
-                    self.ready.append(this_task)
-            self.ready.sort(key=lambda x: x.estimated, reverse=True)
-            if self.running is None and len(self.ready):
-                self.running = self.ready.pop()
-                self.running.started = clk
-            else:  #running not Node
-                self.running.service(1)
-                if self.running.is_done():
-                    self.running.completed = clk
-                    print("{}:{}->{}".format(self.running.name,
-                                             self.running.started,
-                                             self.running.completed))
-                    if len(self.ready):
-                        self.running = self.ready.pop()
-                        self.running.started = clk
-                    else:
-                        self.running = None
-            clk += 1
+    def tick(self, clk: int) -> None:
+        for this_task in self.arrived(clk):
+            self.ready.push(this_task)
+        self.ready.settle()
+        if self.running is None and len(self.ready):
+            self.running = self.ready.pop()
+            self.running.started = clk
+        elif self.running is not None:
+            self.running.service(1)
+            if self.running.is_done():
+                self.running.completed = clk
+                self.retire(self.running)
+                self.result.add(self.running.name,
+                                self.running.started,
+                                self.running.completed,
+                                COMPLETED)
+                if len(self.ready):
+                    self.running = self.ready.pop()
+                    self.running.started = clk
+                else:
+                    self.running = None
 
 
 class SRT(Simulator):
-    def __init__(self, tasks: List[Task]):
+    label = "SRT"
+
+    def __init__(self, tasks: Iterable[Task]):
         super(SRT, self).__init__(tasks)
-        self.ready: List[Task] = list()
+        self.ready: ReadyQueue = ReadyQueue(key=attrgetter("remaining"))
         self.running: Optional[Task] = None
 
-    def run(self):
-        print("SRT")
-        clk = 0
-        while not self.all_done():
-            for this_task in self.tasks:
-                if this_task.arrival == clk:
-                    self.ready.append(this_task)
-            self.ready.sort(key=lambda x: x.remaining, reverse=True)
-            if self.running is None and len(self.ready):
-                self.running = self.ready[-1]
-                self.running.started = clk
-            elif self.running is not None:
-                self.running.service(1)
-                if self.running.is_done():
-                    self.running.completed = clk
-                    self.ready.remove(self.running)
-                    print("{}:{}->{}".format(self.running.name,
-                                             self.running.started,
-                                             self.running.completed))
-                    if len(self.ready):
-                        self.running = self.ready[-1]
-                        self.running.started = clk
-                    else:
-                        self.running = None
-                elif self.running != self.ready[-1]:
-                    self.running.stopped = clk
-                    print("{}:{}->{}".format(self.running.name,
-                                             self.running.started,
-                                             self.running.stopped))
-                    self.running = self.ready[-1]
+    def tick(self, clk: int) -> None:
+        for this_task in self.arrived(clk):
+            self.ready.push(this_task)
+        # the running task stays queued, its remaining time has dropped
+        if self.running is not None:
+            self.ready.update(self.running)
+        self.ready.settle()
+        if self.running is None and len(self.ready):
+            self.running = self.ready.peek()
+            self.running.started = clk
+        elif self.running is not None:
+            self.running.service(1)
+            if self.running.is_done():
+                self.running.completed = clk
+                self.retire(self.running)
+                self.ready.remove(self.running)
+                self.result.add(self.running.name,
+                                self.running.started,
+                                self.running.completed,
+                                COMPLETED)
+                if len(self.ready):
+                    self.running = self.ready.peek()
                     self.running.started = clk
-            clk += 1
+                else:
+                    self.running = None
+            elif self.running is not self.ready.peek():
+                self.ready.update(self.running)
+                self.running.stopped = clk
+                self.result.add(self.running.name,
+                                self.running.started,
+                                self.running.stopped,
+                                PREEMPTED)
+                self.running = self.ready.peek()
+                self.running.started = clk
+
+    def events(self, clk: int) -> Iterable[Optional[int]]:
+        yield from super(SRT, self).events(clk)
+        # the next sort sees this tick's service, so a freshly dispatched
+        # task can still lose the head of the queue one tick later
+        if self.running is not None and not self.ready.leads(self.running):
+            yield clk + 1
 
 
 class HRRN(Simulator):
-    def __init__(self, tasks: List[Task]):
+    label = "HRRN:"
+
+    def __init__(self, tasks: Iterable[Task]):
         super(HRRN, self).__init__(tasks)
         self.ready: List[Task] = list()
         self.running: Optional[Task] = None
 
-    def run(self):
-        print("HRRN:")
-        clk = 0
-        while not self.all_done():
-            for this_task in self.tasks:
-                if this_task.arrival == clk:
-                    self.ready.append(this_task)
-            self.ready.sort(key=lambda x: (x.waited + x.estimated) / x.estimated)
-            if self.running is None and len(self.ready):
-                self.running = self.ready.pop()
-                self.running.started = clk
-            elif self.running is not None:
-                self.running.service(1)
-                for this_task in self.ready:
-                    if this_task != self.running:
-                        this_task.wait(1)
-                self.ready.sort(key=lambda x: (x.waited + x.estimated) / x.estimated)
-                if self.running.is_done():
-                    self.running.completed = clk
-                    print("{}:{}->{}".format(self.running.name,
-                                             self.running.started,
-                                             self.running.completed))
-                    if len(self.ready):
-                        self.running = self.ready.pop()
-                        self.running.started = clk
-                    else:
-                        self.running = None
-            clk += 1
+    def select(self, clk: int) -> Task:
+        # highest response ratio; on a tie whoever led a tick earlier wins,
+        # then the later arrival, which is how the re-sorted list fell out
+        best: int = 0
+        best_key: Optional[Tuple[float, float]] = None
+        for index, this_task in enumerate(self.ready):
+            # a queued task has waited every tick since it arrived
+            estimated = this_task.estimated
+            waited = this_task.waited + clk - this_task.arrival
+            key = ((waited + estimated) / estimated, (max(waited - 1, 0) + estimated) / estimated)
+            if best_key is None or key >= best_key:
+                best, best_key = index, key
+        chosen = self.ready.pop(best)
+        chosen.wait(clk - chosen.arrival)
+        return chosen
+
+    def waiting(self, clk: int) -> List[Task]:
+        # highest response ratio first, ties as select() breaks them
+        def ratio(pair: Tuple[int, Task]) -> Tuple[float, float, int]:
+            index, this_task = pair
+            estimated = this_task.estimated
+            waited = this_task.waited + clk - this_task.arrival
+            return ((waited + estimated) / estimated, (max(waited - 1, 0) + estimated) / estimated, index)
+        return [this_task for index, this_task in sorted(enumerate(self.ready), key=ratio, reverse=True)]
+
+    def tick(self, clk: int) -> None:
+        for this_task in self.arrived(clk):
+            # arriving while the processor is busy counts as a tick waited
+            if self.running is not None:
+                this_task.wait(1)
+            self.ready.append(this_task)
+        if self.running is None and len(self.ready):
+            self.running = self.select(clk)
+            self.running.started = clk
+        elif self.running is not None:
+            self.running.service(1)
+            if self.running.is_done():
+                self.running.completed = clk
+                self.retire(self.running)
+                self.result.add(self.running.name,
+                                self.running.started,
+                                self.running.completed,
+                                COMPLETED)
+                if len(self.ready):
+                    self.running = self.select(clk)
+                    self.running.started = clk
+                else:
+                    self.running = None
 
 
-class ED(Simulator):
-    def __init__(self, tasks: List[RealtimeTask]):
-        self.tasks: List[RealtimeTask] = tasks
+class RealtimeSimulator(Simulator):
+    def __init__(self, tasks: Iterable[RealtimeTask]):
+        super(RealtimeSimulator, self).__init__(tasks)
         self.ready: List[RealtimeTask] = list()
         self.running: Optional[RealtimeTask] = None
         self.missed: List[RealtimeTask] = list()
+        # (miss time, watch order, task) for every queued task that can
+        # miss; entries gone stale are dropped as they come up
+        self.deadlines: List[Tuple[int, int, RealtimeTask]] = list()
+        self.watched: int = 0
+
+    def arrived(self, clk: int) -> Iterator[RealtimeTask]:
+        for this_task in super(RealtimeSimulator, self).arrived(clk):
+            self.watch(this_task)
+            yield this_task
+
+    def watch(self, task: RealtimeTask) -> None:
+        # call whenever a task (re)enters the ready queue
+        when = task.miss_time()
+        if when is not None:
+            self.watched += 1
+            heappush(self.deadlines, (when, self.watched, task))
+
+    def queued(self, task: RealtimeTask) -> bool:
+        # these policies never put a task back once it has started
+        return task.started is None and not task.missed
+
+    def next_miss(self) -> Optional[int]:
+        while self.deadlines:
+            when, order, this_task = self.deadlines[0]
+            if self.queued(this_task) and this_task.miss_time() == when:
+                return when
+            heappop(self.deadlines)
+        return None
+
+    def due(self, clk: int) -> List[RealtimeTask]:
+        # queued tasks whose miss time has come, once each, in watch order
+        due = dict()
+        while self.deadlines and self.deadlines[0][0] <= clk:
+            when, order, this_task = heappop(self.deadlines)
+            if self.queued(this_task) and this_task.miss_time() == when:
+                due.setdefault(id(this_task), (order, this_task))
+        return [this_task for order, this_task in sorted(due.values(), key=lambda pair: pair[0])]
+
+    def events(self, clk: int) -> Iterable[Optional[int]]:
+        yield from super(RealtimeSimulator, self).events(clk)
+        yield self.next_miss()
+
+    def lapse(self, task: RealtimeTask) -> None:
+        # reported along with the next segment
+        self.missed.append(task)
+        self.result.missed.add(task.name)
+        self.retire(task)
+
+    def expire(self, clk: int) -> None:
+        # only tasks the deadline index says are late get looked at, in
+        # queue order front to back
+        due = self.due(clk)
+        for this_task in self.ready.arrange(due) if due else ():
+            this_task.miss_check(clk)
+            # print("{}:Missed".format(this_task.name))
+            self.ready.remove(this_task)
+            self.lapse(this_task)
+
+
+class ED(RealtimeSimulator):
+    label = "ED:"
+
+    def __init__(self, tasks: Iterable[RealtimeTask]):
+        super(ED, self).__init__(tasks)
+        self.ready: ReadyQueue = ReadyQueue(key=attrgetter("start_dln"))
+
+    def tick(self, clk: int) -> None:
+        for this_task in self.arrived(clk):
+            self.ready.push(this_task)
+        if len(self.ready):
+            self.expire(clk)
+        self.ready.settle()
+        if self.running is None and len(self.ready):
+            self.running = self.ready.pop()
+            self.running.started = clk
+        elif self.running is not None:
+            self.running.service(1)
+            if self.running.is_done():
+                self.running.completed = clk
+                self.retire(self.running)
+                self.result.add(self.running.name,
+                                self.running.started,
+                                self.running.completed,
+                                COMPLETED)
+                while len(self.missed):
+                    self.result.miss(self.missed.pop().name)
+                if len(self.ready):
+                    self.running = self.ready.pop()
+                    self.running.started = clk
+                else:
+                    self.running = None
 
-    def run(self):
-        print("ED:")
-        clk = 0
-        while not self.all_done():
-            for this_task in self.tasks:
-                if this_task.arrival == clk:
-                    self.ready.append(this_task)
-            if len(self.ready):
-                for this_task in self.ready:
-                    this_task.miss_check(clk)
-                    if this_task.missed:
-                        self.ready.remove(this_task)
-                        # print("{}:Missed".format(this_task.name))
-                        self.missed.append(this_task)
-            self.ready.sort(key=lambda x: x.start_dln, reverse=True)
-            if self.running is None and len(self.ready):
-                self.running = self.ready.pop()
-                self.running.started = clk
-            elif self.running is not None:
-                self.running.service(1)
-                if self.running.is_done():
-                    self.running.completed = clk
-                    print("{}:{}->{}".format(self.running.name,
-                                             self.running.started,
-                                             self.running.completed))
-                    while len(self.missed):
-                        print("{}:Missed".format(self.missed.pop().name))
-                    if len(self.ready):
-                        self.running = self.ready.pop()
-                        self.running.started = clk
-                    else:
-                        self.running = None
-            clk += 1
 
+class EDUI(RealtimeSimulator):
+    label = "EDUI:"
 
-class EDUI(Simulator):
-    def __init__(self, tasks: List[RealtimeTask], idle_allowed: int = 20):
-        self.tasks: List[RealtimeTask] = tasks
+    def __init__(self, tasks: Iterable[RealtimeTask], idle_allowed: int = 20):
+        super(EDUI, self).__init__(tasks)
         self.idle_allowed: int = idle_allowed
-        self.ready: List[RealtimeTask] = list()
-        self.running: Optional[RealtimeTask] = None
-        self.missed: List[RealtimeTask] = list()
-
-    def run(self):
-        print("EDUI:")
-        clk = 0
-        idle = 0
-        while not self.all_done():
-            for this_task in self.tasks:
-                if this_task.arrival == clk:
-                    self.ready.append(this_task)
-            if len(self.ready):
-                for this_task in self.ready:
+        self.idle: int = 0
+
+    def tick(self, clk: int) -> None:
+        for this_task in self.arrived(clk):
+            self.ready.append(this_task)
+        due = self.due(clk)
+        if due:
+            late = set(id(this_task) for this_task in due)
+            for this_task in self.ready:
+                if id(this_task) in late:
                     this_task.miss_check(clk)
-                    if this_task.missed:
-                        # print("{}:Missed".format(this_task.name))
-                        self.ready.remove(this_task)
-                        self.missed.append(this_task)
-            self.ready.sort(key=lambda x: x.start_dln, reverse=True)
-            if self.running is None and idle > self.idle_allowed and len(self.ready):
-                self.running = self.ready.pop()
+                    # print("{}:Missed".format(this_task.name))
+                    self.lapse(this_task)
+            self.ready[:] = [this_task for this_task in self.ready if id(this_task) not in late]
+        self.ready.sort(key=lambda x: x.start_dln, reverse=True)
+        if self.running is None and self.idle > self.idle_allowed and len(self.ready):
+            self.running = self.ready.pop()
+            self.running.started = clk
+            self.idle = 0
+        elif self.running is None and len(self.ready):
+            self.ready.reverse()
+            for this_task in self.ready:
+                if this_task.start_dln == clk:
+                    self.running = this_task
+                    break
+            if self.running is not None:
                 self.running.started = clk
-                idle = 0
-            elif self.running is None and len(self.ready):
-                self.ready.reverse()
-                for this_task in self.ready:
-                    if this_task.start_dln == clk:
-                        self.running = this_task
-                        break
-                if self.running is not None:
+                self.ready.remove(self.running)
+                self.idle = 0
+        elif self.running is not None:
+            self.running.service(1)
+            self.idle = 0
+            if self.running.is_done():
+                self.running.completed = clk
+                self.retire(self.running)
+                self.result.add(self.running.name,
+                                self.running.started,
+                                self.running.completed,
+                                COMPLETED)
+                while len(self.missed):
+                    self.result.miss(self.missed.pop().name)
+                if len(self.ready):
+                    self.running = self.ready.pop()
                     self.running.started = clk
-                    self.ready.remove(self.running)
-                    idle = 0
-            elif self.running is not None:
-                self.running.service(1)
-                idle = 0
-                if self.running.is_done():
-                    self.running.completed = clk
-                    print("{}:{}->{}".format(self.running.name,
-                                             self.running.started,
-                                             self.running.completed))
-                    while len(self.missed):
-                        print("{}:Missed".format(self.missed.pop().name))
-                    if len(self.ready):
-                        self.running = self.ready.pop()
-                        self.running.started = clk
-                    else:
-                        self.running = None
-            else:
-                idle += 1
-            clk += 1
-
+                else:
+                    self.running = None
+        else:
+            self.idle += 1
 
-class RFCSC(Simulator):
-    def __init__(self, tasks: List[RealtimeTask]):
-        self.tasks: List[RealtimeTask] = tasks
-        self.ready: Deque[RealtimeTask] = deque()
-        self.running: Optional[RealtimeTask] = None
-        self.missed: List[RealtimeTask] = list()
+    def waiting(self, clk: int) -> List[RealtimeTask]:
+        return sorted(self.ready, key=lambda x: x.start_dln)
 
-    def run(self):
-        print("RFCSC:")
-        clk = 0
-        while not self.all_done():
-            for this_task in self.tasks:
-                if this_task.arrival == clk:
-                    self.ready.append(this_task)
+    def events(self, clk: int) -> Iterable[Optional[int]]:
+        yield from super(EDUI, self).events(clk)
+        if self.running is None:
             for this_task in self.ready:
-                this_task.miss_check(clk)
-                if this_task.missed:
-                    self.missed.append(this_task)
-            temp = deque()
-            for this_task in self.ready:
-                if not this_task.missed:
-                    temp.append(this_task)
-            self.ready = temp
-            if self.running is None and len(self.ready):
-                self.running = self.ready.popleft()
-                self.running.started = clk
-            elif self.running is not None:
-                self.running.service(1)
-                if self.running.is_done():
-                    self.running.completed = clk
-                    print("{}:{}->{}".format(self.running.name,
-                                             self.running.started,
-                                             self.running.completed))
-                    while len(self.missed):
-                        print("{}:Missed".format(self.missed.pop().name))
-                    if len(self.ready):
-                        self.running = self.ready.popleft()
-                        self.running.started = clk
-                    else:
-                        self.running = None
-            clk += 1
+                if this_task.start_dln > clk:
+                    yield this_task.start_dln
+
+    def skip(self, ticks: int) -> None:
+        super(EDUI, self).skip(ticks)
+        if self.running is not None:
+            return
+        if not len(self.ready):
+            self.idle += ticks
+        else:
+            # waiting on a start deadline re-sorts and reverses the queue
+            # every tick, which only ever yields one of two orders
+            for _ in range(1 if ticks % 2 else 2):
+                self.ready.sort(key=lambda x: x.start_dln, reverse=True)
+                self.ready.reverse()
+
 
+class RFCSC(RealtimeSimulator):
+    label = "RFCSC:"
 
-class FP(Simulator):
-    def __init__(self, tasks: List[RealtimeTask], end: int = 100):
-        self.tasks: List[RealtimeTask] = tasks
-        self.end: int = end
+    def __init__(self, tasks: Iterable[RealtimeTask]):
+        super(RFCSC, self).__init__(tasks)
+        self.ready: Deque[RealtimeTask] = deque()
+
+    def tick(self, clk: int) -> None:
+        for this_task in self.arrived(clk):
+            self.ready.append(this_task)
+        # the queue is in arrival order, which is the order tasks are watched
+        for this_task in self.due(clk):
+            this_task.miss_check(clk)
+            self.lapse(this_task)
+        # missed tasks are dropped once they reach the front
+        while len(self.ready) and self.ready[0].missed:
+            self.ready.popleft()
+        if self.running is None and len(self.ready):
+            self.running = self.ready.popleft()
+            self.running.started = clk
+        elif self.running is not None:
+            self.running.service(1)
+            if self.running.is_done():
+                self.running.completed = clk
+                self.retire(self.running)
+                self.result.add(self.running.name,
+                                self.running.started,
+                                self.running.completed,
+                                COMPLETED)
+                while len(self.missed):
+                    self.result.miss(self.missed.pop().name)
+                if len(self.ready):
+                    self.running = self.ready.popleft()
+                    self.running.started = clk
+                else:
+                    self.running = None
+
+
+class PeriodicSimulator(RealtimeSimulator):
+    def __init__(self, tasks: Iterable[RealtimeTask], end: Optional[int]):
+        super(PeriodicSimulator, self).__init__(list(tasks))
+        # templates never run themselves, only the jobs they release count;
+        # without an ending time (an online run) releases never stop
+        self.outstanding = 0
+        self.end: Optional[int] = end
+        self.jobs: TaskTable = TaskTable(RealtimeTask)
+        # job name -> (template index, job number)
+        self.births: Dict[str, Tuple[int, int]] = dict()
+        self.lapsed: List[str] = list()
+        self.releases: Releases = Releases(self.tasks)
+        self.hyperperiod: Optional[int] = self.find_hyperperiod()
+        self.seen: Dict[tuple, Tuple[int, int, int]] = dict()
+
+    def find_hyperperiod(self) -> Optional[int]:
+        # None when there is nothing to gain (or a shared name would make
+        # job numbering depend on more than one template)
+        names = [this_task.name for this_task in self.tasks]
+        if not self.releases.calendar or len(set(names)) != len(names) or self.end is None:
+            return None
+        hyperperiod = 1
+        for release, index in self.releases.calendar:
+            period = self.tasks[index].end_dln
+            hyperperiod = hyperperiod * period // gcd(hyperperiod, period)
+            if hyperperiod > self.end:
+                return None
+        return hyperperiod
+
+    def finished(self, clk: int) -> bool:
+        # without an ending time, once nothing is left to release or run
+        if self.end is None:
+            return self.all_done() and self.releases.upcoming() is None
+        return clk > self.end
+
+    def adopt(self, template: RealtimeTask, clk: int) -> None:
+        # a template handed over mid-run, see Releases.add()
+        self.tasks.append(template)
+        self.releases.add(template, clk)
+
+    def spawn(self, clk: int) -> None:
+        for release, template, serial in self.releases.due(clk):
+            this_task = self.tasks[template]
+            index = self.jobs.append(job_name(this_task.name, serial),
+                                     this_task.arrival,
+                                     this_task.estimated,
+                                     this_task.priority,
+                                     this_task.start_dln,
+                                     this_task.end_dln * serial)
+            new_task = self.jobs.task(index)
+            if self.hyperperiod is not None:
+                self.births[new_task.name] = (template, serial)
+            self.ready.push(new_task)
+            self.watch(new_task)
+            if new_task.estimated > 0:
+                self.outstanding += 1
+
+    def lapse(self, task: RealtimeTask) -> None:
+        super(PeriodicSimulator, self).lapse(task)
+        self.lapsed.append(task.name)
+
+    def queued(self, task: RealtimeTask) -> bool:
+        # preempted jobs go back in the queue
+        return task in self.ready
+
+    def events(self, clk: int) -> Iterable[Optional[int]]:
+        yield self.releases.upcoming()
+        if self.running is not None:
+            yield clk + self.running.remaining
+            # a zero length job can hand over to whatever was queued last,
+            # which the next tick preempts if anything ranks above it
+            if len(self.ready) and self.ready.key(self.running) > self.ready.least():
+                yield clk + 1
+        yield self.next_miss()
+        if self.hyperperiod is not None:
+            yield (clk // self.hyperperiod + 1) * self.hyperperiod
+        if self.end is not None:
+            yield self.end + 1
+
+    def advance(self, clk: int) -> int:
+        clk = super(PeriodicSimulator, self).advance(clk)
+        if self.hyperperiod is not None and clk % self.hyperperiod == 0:
+            clk = self.recur(clk)
+        return clk
+
+    def drain(self) -> List[Segment]:
+        # segments a pending recurrence may still replicate are kept
+        keep = min([segments for clk, segments, lapsed in self.seen.values()], default=len(self.result.segments))
+        drained = self.result.segments[:keep]
+        del self.result.segments[:keep]
+        for state, (clk, segments, lapsed) in self.seen.items():
+            self.seen[state] = (clk, segments - keep, lapsed)
+        return drained
+
+    def snapshot(self, clk: int) -> tuple:
+        # everything the rest of the run depends on, relative to clk
+        def job(this_task: RealtimeTask) -> tuple:
+            template, serial = self.births[this_task.name]
+            return (template,
+                    serial - self.releases.serials[self.tasks[template].name],
+                    this_task.remaining,
+                    this_task.end_dln - clk,
+                    this_task.missed)
+        running = None
+        if self.running is not None:
+            running = job(self.running) + (self.running.started - clk,)
+        return (running,
+                tuple(job(this_task) for this_task in self.ready.listing()),
+                tuple(job(this_task) for this_task in self.missed),
+                self.outstanding)
+
+    def recur(self, clk: int) -> int:
+        # At a hyperperiod boundary the releases ahead look exactly like
+        # those one hyperperiod earlier, so once the rest of the state
+        # repeats as well the schedule in between repeats until the end.
+        state = self.snapshot(clk)
+        if state in self.seen:
+            before, segments, lapsed = self.seen.pop(state)
+            span = clk - before
+            cycles = (self.end + 1 - clk) // span
+            if cycles > 0:
+                self.replicate(span, cycles, self.result.segments[segments:], self.lapsed[lapsed:])
+                self.seen.clear()
+                return clk + span * cycles
+        if len(self.seen) >= 16:
+            self.seen.clear()
+        self.seen[state] = (clk, len(self.result.segments), len(self.lapsed))
+        return clk
+
+    def replicate(self, span: int, cycles: int, segments: List[Segment], lapsed: List[str]) -> None:
+        steps = [span // this_task.end_dln for this_task in self.tasks]
+
+        def rename(name: str, cycle: int) -> str:
+            template, serial = self.births[name]
+            return job_name(self.tasks[template].name, serial + steps[template] * cycle)
+
+        for cycle in range(1, cycles + 1):
+            offset = span * cycle
+            for segment in segments:
+                if segment.kind == MISSED:
+                    self.result.miss(rename(segment.task, cycle))
+                else:
+                    self.result.add(rename(segment.task, cycle),
+                                    segment.start + offset,
+                                    segment.stop + offset,
+                                    segment.kind)
+            for name in lapsed:
+                self.result.missed.add(rename(name, cycle))
+
+        # move the live jobs, the calendar and the job numbering forward
+        offset = span * cycles
+        listing = self.ready.listing()
+        live = listing + list(self.missed)
+        if self.running is not None:
+            live.append(self.running)
+        for this_task in live:
+            template, serial = self.births[this_task.name]
+            this_task.name = rename(this_task.name, cycles)
+            self.births[this_task.name] = (template, serial + steps[template] * cycles)
+            this_task.end_dln += offset
+            if this_task.started is not None:
+                this_task.started += offset
+            if this_task.stopped is not None:
+                this_task.stopped += offset
+        self.releases.skip(offset)
+        # the queue caches keys, so refill it in its current order
+        self.ready.clear()
+        self.deadlines.clear()
+        for this_task in listing:
+            self.ready.push(this_task)
+            self.watch(this_task)
+
+
+class FP(PeriodicSimulator):
+    label = "FP:"
+
+    def __init__(self, tasks: Iterable[RealtimeTask], end: Optional[int] = 100):
+        super(FP, self).__init__(tasks, end)
         for this_task in self.tasks:
             this_task.priority = self.tasks.index(this_task)
-        self.task_indexes: Dict[str, int] = dict()
-        for this_task in self.tasks:
-            self.task_indexes[this_task.name] = 1
-        self.ready: List[RealtimeTask] = list()
-        self.running: Optional[RealtimeTask] = None
-        self.missed: List[RealtimeTask] = list()
-
-    def run(self):
-        print("FP:")
-        clk = 0
-        while not clk > self.end:
-            #spawn new task
-            for this_task in self.tasks:
-                if clk % this_task.end_dln == this_task.arrival:
-                    new_task = deepcopy(this_task)
-                    new_task.name = this_task.name + "({})".format(self.task_indexes[this_task.name])
-                    new_task.end_dln = this_task.end_dln * self.task_indexes[this_task.name]
-                    self.task_indexes[this_task.name] += 1
-                    self.ready.append(new_task)
-            for this_task in self.ready:
-                this_task.miss_check(clk)
-                if this_task.missed:
-                    # print("{}:Missed".format(this_task.name))
-                    self.missed.append(this_task)
-                    self.ready.remove(this_task)
-            self.ready.sort(key=lambda x: x.priority, reverse=True)
-            if self.running is None and len(self.ready):
-                self.running = self.ready.pop()
-                self.running.started = clk
-            elif self.running is not None:
-                self.running.service(1)
+        self.ready: ReadyQueue = ReadyQueue(key=attrgetter("priority"))
+
+    def adopt(self, template: RealtimeTask, clk: int) -> None:
+        # ranks below every template already there
+        template.priority = len(self.tasks)
+        super(FP, self).adopt(template, clk)
+
+    def tick(self, clk: int) -> None:
+        #spawn new task
+        self.spawn(clk)
+        self.expire(clk)
+        self.ready.settle()
+        if self.running is None and len(self.ready):
+            self.running = self.ready.pop()
+            self.running.started = clk
+        elif self.running is not None:
+            self.running.service(1)
+            if len(self.ready):
+                if self.running.priority > self.ready.peek().priority:
+                    self.running.stopped = clk
+                    self.result.add(self.running.name,
+                                    self.running.started,
+                                    self.running.stopped,
+                                    PREEMPTED)
+                    while len(self.missed):
+                        self.result.miss(self.missed.pop().name)
+                    temp = self.ready.pop()
+                    self.ready.push(self.running)
+                    self.watch(self.running)
+                    self.running = temp
+                    self.running.started = clk
+            if self.running.is_done():
+                self.running.completed = clk
+                self.retire(self.running)
+                self.result.add(self.running.name,
+                                self.running.started,
+                                self.running.completed,
+                                COMPLETED)
+                while len(self.missed):
+                    self.result.miss(self.missed.pop().name)
+                if len(self.ready):
+                    self.running = self.ready.pop()
+                    self.running.started = clk
+                else:
+                    self.running = None
+
+    def skip(self, ticks: int) -> None:
+        super(FP, self).skip(ticks)
+        # a preempted task is queued unsorted until the next tick
+        self.ready.settle()
+
+
+class EDCD(PeriodicSimulator):
+    label = "EDCD:"
+
+    def __init__(self, tasks: Iterable[RealtimeTask], end: Optional[int]):
+        super(EDCD, self).__init__(tasks, end)
+        self.ready: ReadyQueue = ReadyQueue(key=attrgetter("end_dln"))
+
+    def tick(self, clk: int) -> None:
+        #spawn new tasks
+        self.spawn(clk)
+        #check for misses
+        self.expire(clk)
+        # sort ready que by end dealine
+        self.ready.settle()
+        # if not running and ready queue, get a task
+        if self.running is None and len(self.ready):
+            self.running = self.ready.pop()
+            self.running.started = clk
+        # if is runnung, service it (from last clk tick)
+        elif self.running is not None:
+            self.running.service(1)
+            # if done, print
+            if self.running.is_done():
+                self.running.completed = clk
+                self.retire(self.running)
+                self.result.add(self.running.name,
+                                self.running.started,
+                                self.running.completed,
+                                COMPLETED)
+                # print any misses
+                while len(self.missed):
+                    self.result.miss(self.missed.pop().name)
+                # more in the ready queue? add it
+                if len(self.ready):
+                    self.running = self.ready.pop()
+                    self.running.started = clk
+                else:
+                    self.running = None
+            # not done, check the deadline
+            else:
                 if len(self.ready):
-                    if self.running.priority > self.ready[-1].priority:
+                    if self.running.end_dln > self.ready.peek().end_dln:
                         self.running.stopped = clk
-                        print("{}:{}->{}".format(self.running.name,
-                                                 self.running.started,
-                                                 self.running.stopped))
+                        self.result.add(self.running.name,
+                                        self.running.started,
+                                        self.running.stopped,
+                                        PREEMPTED)
                         while len(self.missed):
-                            print("{}:Missed".format(self.missed.pop().name))
+                            self.result.miss(self.missed.pop().name)
                         temp = self.ready.pop()
-                        self.ready.append(self.running)
+                        self.ready.push(self.running)
+                        self.watch(self.running)
                         self.running = temp
                         self.running.started = clk
-                if self.running.is_done():
-                    self.running.completed = clk
-                    print("{}:{}->{}".format(self.running.name,
-                                             self.running.started,
-                                             self.running.completed))
-                    while len(self.missed):
-                        print("{}:Missed".format(self.missed.pop().name))
-                    if len(self.ready):
-                        self.running = self.ready.pop()
-                        self.running.started = clk
-                    else:
-                        self.running = None
-            clk += 1
-
 
-class EDCD(Simulator):
-    def __init__(self, tasks: List[RealtimeTask], end: int):
-        self.tasks: List[RealtimeTask] = tasks
-        self.end: int = end
-        self.task_indexes: Dict[str, int] = dict()
-        for this_task in self.tasks:
-            self.task_indexes[this_task.name] = 1
-        self.ready: List[RealtimeTask] = list()
-        self.running: Optional[RealtimeTask] = None
-        self.missed: List[RealtimeTask] = list()
-
-    def run(self):
-        print("EDCD:")
-        clk = 0
-        while not clk > self.end:
-            #spawn new tasks
-            for this_task in self.tasks:
-                if clk % this_task.end_dln == this_task.arrival:
-                    new_task = deepcopy(this_task)
-                    new_task.name = this_task.name + "({})".format(self.task_indexes[this_task.name])
-                    new_task.end_dln = this_task.end_dln * self.task_indexes[this_task.name]
-                    self.task_indexes[this_task.name] += 1
-                    self.ready.append(new_task)
-            #check for misses
-            for this_task in self.ready:
-                this_task.miss_check(clk)
-                if this_task.missed:
-                    # print("{}:Missed".format(this_task.name))
-                    self.missed.append(this_task)
-                    self.ready.remove(this_task)
-            # sort ready que by end dealine
-            self.ready.sort(key=lambda x: x.end_dln, reverse=True)
-            # if not running and ready queue, get a task
-            if self.running is None and len(self.ready):
-                self.running = self.ready.pop()
-                self.running.started = clk
-            # if is runnung, service it (from last clk tick)
-            elif self.running is not None:
-                self.running.service(1)
-                # if done, print
-                if self.running.is_done():
-                    self.running.completed = clk
-                    print("{}:{}->{}".format(self.running.name,
-                                             self.running.started,
-                                             self.running.completed))
-                    # print any misses
-                    while len(self.missed):
-                        print("{}:Missed".format(self.missed.pop().name))
-                    # more in the ready queue? add it
-                    if len(self.ready):
-                        self.running = self.ready.pop()
-                        self.running.started = clk
-                    else:
-                        self.running = None
-                # not done, check the deadline
-                else:
-                    if len(self.ready):
-                        if self.running.end_dln > self.ready[-1].end_dln:
-                            self.running.stopped = clk
-                            print("{}:{}->{}".format(self.running.name,
-                                                     self.running.started,
-                                                     self.running.stopped))
-                            while len(self.missed):
-                                print("{}:Missed".format(self.missed.pop().name))
-                            temp = self.ready.pop()
-                            self.ready.append(self.running)
-                            self.running = temp
-                            self.running.started = clk
-            clk += 1
+    def skip(self, ticks: int) -> None:
+        super(EDCD, self).skip(ticks)
+        # a preempted task is queued unsorted until the next tick
+        self.ready.settle()
+
+
+# algorithms run for each kind of task file, in output order
+SUITES: Dict[str, Tuple[str, ...]] = {
+    "U": ("FCFS", "RR", "SPN", "SRT", "HRRN"),
+    "RA": ("ED", "EDUI", "RFCSC"),
+    "RP": ("FP", "EDCD"),
+}
+
+
+def build(algorithm: str, tasks: Iterable[Task], param: Optional[int] = None) -> Simulator:
+    # param is the RR quantum, the EDUI idle allowance or the FP/EDCD
+    # ending time; EDUI keeps its default allowance when it is None
+    if algorithm == "FCFS":
+        return FCFS(tasks)
+    elif algorithm == "RR":
+        return RR(tasks, param)
+    elif algorithm == "SPN":
+        return SPN(tasks)
+    elif algorithm == "SRT":
+        return SRT(tasks)
+    elif algorithm == "HRRN":
+        return HRRN(tasks)
+    elif algorithm == "ED":
+        return ED(tasks)
+    elif algorithm == "EDUI":
+        return EDUI(tasks) if param is None else EDUI(tasks, param)
+    elif algorithm == "RFCSC":
+        return RFCSC(tasks)
+    elif algorithm == "FP":
+        return FP(tasks, param)
+    elif algorithm == "EDCD":
+        return EDCD(tasks, param)
+    raise ValueError("unknown algorithm {}".format(algorithm))
+
+
+def run_simulator(simulator: Simulator,
+                  profile: bool = False,
+                  sink: Optional[Callable[[int, List[Segment]], None]] = None,
+                  every: int = 1) -> Result:
+    # profiling instruments this one simulator; without it nothing changes
+    if not profile:
+        return simulator.run(sink=sink, every=every)
+    probe = Probe()
+    probe.attach(simulator)
+    result = simulator.run(sink=None if sink is None else probe.watch(sink), every=every)
+    result.profile = probe.report(result)
+    return result
+
+
+def simulate(algorithm: str, tasks: TaskTable, param: Optional[int] = None, profile: bool = False) -> Result:
+    # profiled runs go through the simulator, its counters need the ticks
+    if algorithm in NONPREEMPTIVE and not profile and eligible(algorithm, tasks):
+        return simulate_nonpreemptive(algorithm, tasks)
+    rows = tasks.replay() if tasks.ordered else tasks.fresh()
+    return run_simulator(build(algorithm, rows, param), profile)
+
+
+# segments a streamed run hands on at a time
+STREAM_BLOCK: int = 1024
+
+
+def simulate_stream(algorithm: str,
+                    filepath: str,
+                    sink: Callable[[int, List[Segment]], None],
+                    profile: bool = False) -> Result:
+    # Reads the task file lazily instead of holding all of it, and hands
+    # the segments to sink as they come, so neither is ever whole. The
+    # Result returned keeps everything but the segments.
+    header = stream_header(filepath)
+    return run_simulator(build(algorithm, stream_tasks(filepath), header.param), profile, sink, STREAM_BLOCK)
+
+
+# the multiprocessor variants build on Simulator and build() above
+from .multi import PLACEMENTS, GlobalSimulator, partition, simulate_multi
+from .online import ONLINE, OnlineSimulator
+from .nonpreemptive import NONPREEMPTIVE, eligible, fcfs_times, simulate_nonpreemptive, spn_times
+from .lockstep import LANES, LOCKSTEP, lockstep_eligible, simulate_lockstep
@@ -0,0 +1,156 @@
+from typing import *
+from fractions import Fraction
+from .tasks import RealtimeTask, releasing
+
+# Analytic answers for RP task sets that do not depend on the ending time.
+# A template with offset a and period T releases at a, a+T, ... and job k
+# is due at k*T, so its relative deadline is T - a. Offsets are otherwise
+# ignored (every task is assumed released together), which can only make
+# the verdicts pessimistic. Zero cost templates are not modelled: the
+# simulator runs their jobs for a tick, which FP can preempt before they
+# count as done, so a set with one is reported unschedulable.
+
+
+class Periodic(NamedTuple):
+    name: str
+    cost: int
+    period: int
+    deadline: int
+
+
+class Analysis(NamedTuple):
+    algorithm: str
+    schedulable: bool
+    utilization: Fraction
+    # Liu and Layland bound, FP with implicit deadlines only
+    bound: Optional[float]
+    # worst-case response time per task for FP, None once past the deadline
+    response_times: Dict[str, Optional[int]]
+    # EDCD: an interval length whose demand exceeds it
+    overload: Optional[int]
+    # templates with nothing to run, which decide the verdict on their own
+    zero_cost: Tuple[str, ...] = ()
+
+
+def periodic_tasks(tasks: Iterable[RealtimeTask]) -> List[Periodic]:
+    # templates that never release (offset not below the period) drop out
+    return [Periodic(this_task.name, max(this_task.estimated, 0), this_task.end_dln,
+                     this_task.end_dln - this_task.arrival)
+            for this_task in tasks
+            if releasing(this_task)]
+
+
+def zero_cost(tasks: List[Periodic]) -> Tuple[str, ...]:
+    return tuple(this_task.name for this_task in tasks if this_task.cost == 0)
+
+
+def utilization(tasks: List[Periodic]) -> Fraction:
+    return sum((Fraction(this_task.cost, this_task.period) for this_task in tasks), Fraction(0))
+
+
+def response_time(tasks: List[Periodic], index: int) -> Optional[int]:
+    # smallest R = C_i + sum over higher priorities of ceil(R/T_j)*(C_j+1);
+    # the extra tick per release covers FP preempting a job on the tick it
+    # finishes, which then takes another tick to complete once resumed
+    this_task = tasks[index]
+    higher = tasks[:index]
+    response = this_task.cost + sum(other.cost for other in higher)
+    while response <= this_task.deadline:
+        demand = this_task.cost + sum(-(-response // other.period) * (other.cost + 1) for other in higher)
+        if demand == response:
+            return response
+        response = demand
+    return None
+
+
+def analyze_fp(tasks: Iterable[RealtimeTask]) -> Analysis:
+    # priorities follow file order, the first task ranks highest
+    periodic = periodic_tasks(tasks)
+    load = utilization(periodic)
+    bound = None
+    if all(this_task.deadline == this_task.period for this_task in periodic) and periodic:
+        bound = len(periodic) * (2 ** (1 / len(periodic)) - 1)
+    responses = dict()
+    for index, this_task in enumerate(periodic):
+        responses[this_task.name] = response_time(periodic, index) if this_task.cost > 0 else None
+    schedulable = None not in responses.values()
+    return Analysis("FP", schedulable, load, bound, responses, None, zero_cost(periodic))
+
+
+def demand(tasks: List[Periodic], length: int) -> int:
+    # work released and due within any interval of this length
+    total = 0
+    for this_task in tasks:
+        if length >= this_task.deadline:
+            total += ((length - this_task.deadline) // this_task.period + 1) * this_task.cost
+    return total
+
+
+def last_deadline(tasks: List[Periodic], before: int) -> int:
+    # the latest absolute deadline strictly before the given time
+    latest = 0
+    for this_task in tasks:
+        if before > this_task.deadline:
+            jobs = (before - this_task.deadline - 1) // this_task.period
+            latest = max(latest, jobs * this_task.period + this_task.deadline)
+    return latest
+
+
+def busy_period(tasks: List[Periodic]) -> int:
+    length = sum(this_task.cost for this_task in tasks)
+    while True:
+        work = sum(-(-length // this_task.period) * this_task.cost for this_task in tasks)
+        if work == length:
+            return length
+        length = work
+
+
+def analyze_edcd(tasks: Iterable[RealtimeTask]) -> Analysis:
+    periodic = periodic_tasks(tasks)
+    load = utilization(periodic)
+    if zero_cost(periodic):
+        return Analysis("EDCD", False, load, None, dict(), None, zero_cost(periodic))
+    if load > 1:
+        return Analysis("EDCD", False, load, None, dict(), None)
+    if all(this_task.deadline == this_task.period for this_task in periodic):
+        return Analysis("EDCD", True, load, None, dict(), None)
+    # only deadlines inside the first busy period (or the tighter bound that
+    # holds below full load) need checking, walked backwards as in QPA
+    horizon = busy_period(periodic)
+    if load < 1:
+        slack = sum((this_task.period - this_task.deadline) * Fraction(this_task.cost, this_task.period)
+                    for this_task in periodic)
+        horizon = min(horizon, max(max(this_task.deadline for this_task in periodic),
+                                   int(slack / (1 - load))))
+    shortest = min(this_task.deadline for this_task in periodic)
+    length = last_deadline(periodic, horizon + 1)
+    work = demand(periodic, length)
+    while shortest < work <= length:
+        length = work if work < length else last_deadline(periodic, length)
+        work = demand(periodic, length)
+    if work > length:
+        return Analysis("EDCD", False, load, None, dict(), length)
+    return Analysis("EDCD", True, load, None, dict(), None)
+
+
+def analyze(algorithm: str, tasks: Iterable[RealtimeTask]) -> Analysis:
+    if algorithm == "FP":
+        return analyze_fp(tasks)
+    elif algorithm == "EDCD":
+        return analyze_edcd(tasks)
+    raise ValueError("no analysis for {}".format(algorithm))
+
+
+def render_analysis(analysis: Analysis) -> str:
+    verdict = "schedulable" if analysis.schedulable else "unschedulable"
+    head = "{}:{} utilization={:.4f}".format(analysis.algorithm, verdict, float(analysis.utilization))
+    if analysis.bound is not None:
+        head += " bound={:.4f}".format(analysis.bound)
+    if analysis.overload is not None:
+        head += " overload={}".format(analysis.overload)
+    if analysis.zero_cost:
+        head += " zero-cost={}".format(",".join(analysis.zero_cost))
+    lines = [head]
+    for name, response in analysis.response_times.items():
+        lines.append("{}:{}".format(name, "-" if response is None else response))
+    return "\n".join(lines)
@@ -0,0 +1,85 @@
+from typing import *
+from concurrent.futures import ProcessPoolExecutor
+import os
+from .tasks import TaskTable
+from .results import Result
+from .parsing import Header, parse_header, parse_rows, tabulate
+from .metrics import Metrics, job_set, measure
+
+# task sets a worker was handed once at start-up, and what to run on them
+shared: List[Tuple[Header, TaskTable]] = list()
+wanted: Optional[Tuple[str, ...]] = None
+measured: bool = False
+
+
+def load_batch(filepath: str) -> List[Tuple[Header, TaskTable]]:
+    # Task files written back to back: each header is followed by as many
+    # rows as it has processes, blank lines aside.
+    sets = list()
+    with open(filepath, "r") as f:
+        lines = (line for line in f if line.strip())
+        for line in lines:
+            header = parse_header(line)
+            rows = [next(lines, "") for _ in range(header.processes)]
+            if not all(rows):
+                raise ValueError("task set {} ends after fewer than {} rows".format(len(sets) + 1, header.processes))
+            sets.append((header, tabulate(header.kind, parse_rows(rows, header.kind))))
+    return sets
+
+
+def share(sets: List[Tuple[Header, TaskTable]], algorithms: Optional[Tuple[str, ...]], metrics: bool) -> None:
+    global wanted, measured
+    shared[:] = sets
+    wanted = algorithms
+    measured = metrics
+
+
+def run_sets(indexes: range) -> List[List[Union[Result, Metrics]]]:
+    # RR, SRT and ED step every eligible set of the chunk together, the
+    # rest run set by set
+    from . import LOCKSTEP, SUITES, lockstep_eligible, simulate, simulate_lockstep
+    stepped: Dict[Tuple[int, str], Result] = dict()
+    for algorithm in LOCKSTEP:
+        if wanted is not None and algorithm not in wanted:
+            continue
+        chosen = [index for index in indexes
+                  if algorithm in SUITES[shared[index][0].kind] and lockstep_eligible(algorithm, shared[index][1])]
+        results = simulate_lockstep(algorithm, [shared[index][1] for index in chosen],
+                                    [shared[index][0].param for index in chosen])
+        stepped.update(zip([(index, algorithm) for index in chosen], results))
+    outcomes = list()
+    for index in indexes:
+        header, tasks = shared[index]
+        jobs = job_set(header.kind, tasks.replay(), header.param) if measured else None
+        outcome = list()
+        for algorithm in SUITES[header.kind]:
+            if wanted is not None and algorithm not in wanted:
+                continue
+            result = stepped.pop((index, algorithm), None)
+            if result is None:
+                result = simulate(algorithm, tasks, header.param)
+            # a worker sends back a handful of figures rather than the schedule
+            outcome.append(measure(result, jobs) if jobs is not None else result)
+        outcomes.append(outcome)
+    return outcomes
+
+
+def simulate_batch(sets: List[Tuple[Header, TaskTable]],
+                   algorithms: Optional[Iterable[str]] = None,
+                   jobs: int = 1,
+                   metrics: bool = False) -> List[List[Union[Result, Metrics]]]:
+    # One list per set with a Result per algorithm of its kind's suite (or
+    # of algorithms), Metrics instead with metrics. The sets go to each
+    # worker once and are handed out in chunks of at most a lockstep
+    # group, so a small set costs a row of a tick step rather than a task
+    # submission.
+    from . import LANES
+    algorithms = tuple(algorithms) if algorithms is not None else None
+    workers = 1 if jobs == 1 else jobs if jobs > 0 else os.cpu_count() or 1
+    size = LANES if workers == 1 else max(1, min(LANES, len(sets) // (workers * 4)))
+    chunks = [range(low, min(low + size, len(sets))) for low in range(0, len(sets), size)]
+    if workers == 1:
+        share(sets, algorithms, metrics)
+        return [outcome for chunk in chunks for outcome in run_sets(chunk)]
+    with ProcessPoolExecutor(workers, initializer=share, initargs=(sets, algorithms, metrics)) as pool:
+        return [outcome for outcomes in pool.map(run_sets, chunks) for outcome in outcomes]
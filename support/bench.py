@@ -0,0 +1,180 @@
+from typing import *
+import json
+import platform
+import random
+import time
+from .tasks import Task, RealtimeTask, TaskTable
+from .parsing import Header
+from .results import render_table
+
+ARRIVALS: Tuple[str, ...] = ("poisson", "bursty")
+SERVICES: Tuple[str, ...] = ("exponential", "pareto")
+SIZES: Tuple[int, ...] = (10, 100, 1000, 10 ** 4, 10 ** 5, 10 ** 6)
+REPORT_VERSION: int = 1
+
+
+class Workload(NamedTuple):
+    kind: str
+    size: int
+    arrivals: str = "poisson"
+    service: str = "exponential"
+    utilization: float = 0.9
+    # mean service time, in ticks
+    mean: int = 10
+    seed: int = 0
+
+
+def service_time(rng: random.Random, service: str, mean: float) -> int:
+    if service == "exponential":
+        value = rng.expovariate(1 / mean)
+    elif service == "pareto":
+        # shape 1.5 keeps the mean finite but not the variance
+        value = rng.paretovariate(1.5) * mean / 3
+    else:
+        raise ValueError("unknown service distribution {}".format(service))
+    return max(1, round(value))
+
+
+def arrival_times(rng: random.Random, arrivals: str, size: int, gap: float) -> Iterator[int]:
+    # gap is the mean time between single arrivals
+    clk = 0.0
+    if arrivals == "poisson":
+        for _ in range(size):
+            clk += rng.expovariate(1 / gap)
+            yield int(clk)
+    elif arrivals == "bursty":
+        # geometric bursts of mean 8 landing together, same long run rate
+        left = size
+        while left:
+            clk += rng.expovariate(1 / (gap * 8))
+            burst = 1
+            while burst < left and rng.random() > 1 / 8:
+                burst += 1
+            for _ in range(burst):
+                yield int(clk)
+            left -= burst
+    else:
+        raise ValueError("unknown arrival process {}".format(arrivals))
+
+
+def uunifast(rng: random.Random, size: int, utilization: float) -> List[float]:
+    # unbiased split of a total utilization over size tasks (Bini & Buttazzo)
+    shares = list()
+    left = utilization
+    for index in range(1, size):
+        following = left * rng.random() ** (1 / (size - index))
+        shares.append(left - following)
+        left = following
+    shares.append(left)
+    return shares
+
+
+def generate(workload: Workload) -> Tuple[Header, TaskTable]:
+    rng = random.Random(workload.seed)
+    if workload.kind == "RP":
+        # Log-uniform periods over two decades, costs from the utilization.
+        # Periods grow with the set so that one tick of cost stays a small
+        # share; the run covers two of the longest periods.
+        tasks = TaskTable(RealtimeTask)
+        scale = -(-workload.size // 10)
+        periods = list()
+        for index, share in enumerate(uunifast(rng, workload.size, workload.utilization)):
+            period = int(scale * 10 ** rng.uniform(1, 3))
+            periods.append(period)
+            tasks.append("T{}".format(index), 0, max(1, round(share * period)), end_dln=period)
+        return Header("RP", workload.size, 2 * max(periods)), tasks
+    tasks = TaskTable(Task if workload.kind == "U" else RealtimeTask)
+    gap = workload.mean / workload.utilization
+    for index, arrival in enumerate(arrival_times(rng, workload.arrivals, workload.size, gap)):
+        estimated = service_time(rng, workload.service, workload.mean)
+        if workload.kind == "U":
+            tasks.append("T{}".format(index), arrival, estimated)
+        else:
+            slack = int(rng.uniform(0, 4 * workload.mean))
+            tasks.append("T{}".format(index), arrival, estimated, start_dln=arrival + slack)
+    return Header(workload.kind, workload.size, 4 if workload.kind == "U" else None), tasks
+
+
+def write_tasks(filepath: str, header: Header, tasks: TaskTable) -> None:
+    # the text format schedule.py reads, for keeping a generated workload
+    with open(filepath, "w") as f:
+        if header.param is None:
+            f.write("{},{}\n".format(header.kind, len(tasks)))
+        else:
+            f.write("{},{},{}\n".format(header.kind, len(tasks), header.param))
+        for index in range(len(tasks)):
+            row = [tasks.names[index], tasks.arrival[index], tasks.estimated[index]]
+            if header.kind == "RA":
+                row.append(tasks.start_dln[index])
+            elif header.kind == "RP":
+                row.append(tasks.end_dln[index])
+            f.write(",".join(str(cell) for cell in row) + "\n")
+
+
+def benchmark(workloads: Iterable[Workload],
+              algorithms: Dict[str, Iterable[str]],
+              repeat: int = 1,
+              budget: float = 60.0,
+              log: Optional[Callable[[str], None]] = None) -> dict:
+    # Best of repeat wall times per (workload, algorithm). Once a policy
+    # takes longer than budget seconds on a kind, bigger sizes are skipped.
+    from . import simulate
+    entries = list()
+    slow: Dict[Tuple[str, str], int] = dict()
+    for workload in sorted(workloads, key=lambda x: x.size):
+        header, tasks = generate(workload)
+        for algorithm in algorithms[workload.kind]:
+            entry = dict(workload._asdict(), algorithm=algorithm)
+            if (workload.kind, algorithm) in slow:
+                entry.update(skipped=True, seconds=None, segments=None)
+                entries.append(entry)
+                continue
+            best = None
+            for _ in range(repeat):
+                start = time.perf_counter()
+                result = simulate(algorithm, tasks, header.param)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            entry.update(skipped=False, seconds=best, segments=len(result.segments))
+            entries.append(entry)
+            if log is not None:
+                log("{} {} n={} {:.4f}s".format(workload.kind, algorithm, workload.size, best))
+            if best > budget:
+                slow[(workload.kind, algorithm)] = workload.size
+    return {
+        "version": REPORT_VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "entries": entries,
+    }
+
+
+def entry_key(entry: dict) -> tuple:
+    return tuple(entry[field] for field in Workload._fields) + (entry["algorithm"],)
+
+
+def compare(old: dict, new: dict) -> str:
+    # new/old time ratio per entry both reports measured
+    before = dict((entry_key(entry), entry) for entry in old["entries"])
+    rows = [("kind", "algorithm", "size", "old s", "new s", "ratio")]
+    for entry in new["entries"]:
+        previous = before.get(entry_key(entry))
+        if previous is None or previous["seconds"] is None or entry["seconds"] is None:
+            continue
+        ratio = entry["seconds"] / previous["seconds"] if previous["seconds"] else float("inf")
+        rows.append((entry["kind"], entry["algorithm"], str(entry["size"]),
+                     "{:.4f}".format(previous["seconds"]), "{:.4f}".format(entry["seconds"]),
+                     "{:.2f}".format(ratio)))
+    return render_table(rows)
+
+
+def save_report(report: dict, filepath: str) -> None:
+    with open(filepath, "w") as f:
+        json.dump(report, f, indent=1)
+        f.write("\n")
+
+
+def load_report(filepath: str) -> dict:
+    with open(filepath, "r") as f:
+        return json.load(f)
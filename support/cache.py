@@ -0,0 +1,134 @@
+from typing import *
+import hashlib
+import json
+import os
+import tempfile
+from .results import Result, Segment
+
+# Bump whenever a simulator change can alter its output, so that results
+# stored by an older version are never handed back.
+SIMULATOR_VERSION: int = 2
+LIMIT: int = 256 << 20
+# eviction goes down to this share of the limit, so that a full cache is
+# not scanned again on the very next store
+LOW_WATER: float = 0.9
+
+
+def default_directory() -> str:
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "schedule")
+
+
+def digest_file(filepath: str) -> str:
+    # the task set as it is on disk, text or compiled
+    content = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            content.update(block)
+    return content.hexdigest()
+
+
+def cache_key(digest: str,
+              algorithm: str,
+              param: Optional[int],
+              cpus: int = 1,
+              placement: Optional[str] = None) -> str:
+    # param is the RR quantum, the EDUI idle allowance or the RP ending time
+    fields = [SIMULATOR_VERSION, digest, algorithm, param, cpus, placement if cpus > 1 else None]
+    return hashlib.sha256(json.dumps(fields).encode("utf-8")).hexdigest()
+
+
+def dump_result(result: Result) -> dict:
+    return {
+        "algorithm": result.algorithm,
+        "label": result.label,
+        "cpus": result.cpus,
+        "segments": [list(segment) for segment in result.segments],
+        "missed": sorted(result.missed),
+    }
+
+
+def load_result(state: dict) -> Result:
+    result = Result(state["algorithm"], state["label"], state["cpus"])
+    result.segments = list(map(Segment._make, state["segments"]))
+    result.missed = set(state["missed"])
+    return result
+
+
+class ResultCache:
+    # One JSON file per result in a directory. A hit refreshes the file's
+    # modification time, and a store that takes the directory over limit
+    # bytes evicts the least recently used files down to LOW_WATER. The
+    # size is kept as a running total, from one scan of the directory on
+    # the first store and again at each eviction, so other writers to the
+    # same directory are caught up with then.
+    def __init__(self, directory: Optional[str] = None, limit: int = LIMIT):
+        self.directory: str = directory if directory is not None else default_directory()
+        self.limit: int = limit
+        self.total: Optional[int] = None
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".json")
+
+    def get(self, key: str) -> Optional[Result]:
+        filepath = self.path(key)
+        try:
+            with open(filepath, "r") as f:
+                state = json.load(f)
+            os.utime(filepath)
+        except (OSError, ValueError):
+            return None
+        if state.get("version") != SIMULATOR_VERSION or state.get("key") != key:
+            return None
+        return load_result(state["result"])
+
+    def put(self, key: str, result: Result) -> None:
+        # written aside and renamed so readers never see half a file; a
+        # cache that cannot be written is just not used
+        state = {"version": SIMULATOR_VERSION, "key": key, "result": dump_result(result)}
+        filepath = self.path(key)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            if self.total is None:
+                self.total = sum(size for _, size, _ in self.entries())
+            data = json.dumps(state, separators=(",", ":")).encode("utf-8")
+            size = len(data)
+            handle, temporary = tempfile.mkstemp(".tmp", key, self.directory)
+            with os.fdopen(handle, "wb") as f:
+                f.write(data)
+            try:
+                # the entry this one replaces
+                size -= os.stat(filepath).st_size
+            except OSError:
+                pass
+            os.replace(temporary, filepath)
+            self.total += size
+            if self.total > self.limit:
+                self.evict()
+        except OSError:
+            pass
+
+    def entries(self) -> List[Tuple[float, int, str]]:
+        # (modification time, size, path) of every stored result
+        entries = list()
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".json"):
+                try:
+                    status = entry.stat()
+                except OSError:
+                    continue
+                entries.append((status.st_mtime, status.st_size, entry.path))
+        return entries
+
+    def evict(self) -> None:
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, filepath in sorted(entries):
+            if total <= self.limit * LOW_WATER:
+                break
+            try:
+                os.remove(filepath)
+            except OSError:
+                pass
+            total -= size
+        self.total = total
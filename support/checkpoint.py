@@ -0,0 +1,210 @@
+from typing import *
+from array import array
+import io
+import os
+import pickle
+import time
+from .tasks import RECORDS, Task, TaskTable, NONE
+from .results import Segment, render_segment
+
+# Snapshot file: MAGIC, then a pickled Snapshot. The simulator inside is
+# pickled on its own with task tables and task views swapped for
+# references, and only the rows those views point at are kept, so the size
+# follows the live state rather than the trace. The input table itself is
+# read again from the trace on resume.
+MAGIC: bytes = b"SCHK"
+SNAPSHOT_VERSION: int = 2
+# every column, since some simulators set up the input ones too (FP ranks
+# its templates through priority)
+COLUMNS: Tuple[str, ...] = ("arrival", "estimated", "priority", "start_dln", "end_dln", "remaining",
+                            "started", "stopped", "completed", "serviced", "waited", "missed")
+# segments between looks at the wall clock
+LOOK: int = 1024
+
+
+class Snapshot(NamedTuple):
+    version: int
+    # whatever identifies the run, compared on resume
+    config: Any
+    # reports finished, and the output written for them and the one going
+    work: int
+    offset: int
+    # the report in progress, if any: the clock its simulator stopped at,
+    # the pickled simulator and its rows by table
+    clk: Optional[int]
+    state: Optional[bytes]
+    tables: Dict[str, tuple]
+
+
+class Rows:
+    # The rows of a table in arrival order, one view at a time, for a
+    # simulator to stream from. Like replay() it starts from reset state;
+    # it pickles as its position only.
+    def __init__(self, table: TaskTable):
+        table.reset()
+        self.table: TaskTable = table
+        self.position: int = 0
+        self.order: Optional[List[int]] = None
+
+    def __iter__(self) -> "Rows":
+        return self
+
+    def __next__(self) -> Task:
+        if self.order is None:
+            self.order = sorted(range(len(self.table)), key=self.table.arrival.__getitem__)
+        if self.position >= len(self.order):
+            raise StopIteration
+        self.position += 1
+        return self.table.view(self.order[self.position - 1])
+
+    def __getstate__(self) -> dict:
+        return {"table": self.table, "position": self.position}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.order = None
+
+
+class Freezer(pickle.Pickler):
+    def __init__(self, file: BinaryIO, inputs: TaskTable):
+        super(Freezer, self).__init__(file, pickle.HIGHEST_PROTOCOL)
+        self.keys: Dict[int, str] = {id(inputs): "input"}
+        self.tables: Dict[str, TaskTable] = {"input": inputs}
+        self.rows: Dict[str, Set[int]] = {"input": set()}
+
+    def key(self, table: TaskTable) -> str:
+        key = self.keys.get(id(table))
+        if key is None:
+            key = "t{}".format(len(self.keys))
+            self.keys[id(table)] = key
+            self.tables[key] = table
+            self.rows[key] = set()
+        return key
+
+    def persistent_id(self, obj: Any) -> Optional[tuple]:
+        # standalone tasks hold their own fields and are pickled whole
+        if isinstance(obj, Task) and type(obj) not in RECORDS.values():
+            key = self.key(obj.table)
+            self.rows[key].add(obj.index)
+            return ("task", key, obj.index)
+        if isinstance(obj, TaskTable):
+            return ("table", self.key(obj))
+        return None
+
+
+class Thawer(pickle.Unpickler):
+    def __init__(self, file: BinaryIO, tables: Dict[str, TaskTable]):
+        super(Thawer, self).__init__(file)
+        self.tables: Dict[str, TaskTable] = tables
+        # one view per row, as the frozen simulator had
+        self.views: Dict[Tuple[str, int], Task] = dict()
+
+    def persistent_load(self, pid: tuple) -> Any:
+        if pid[0] == "table":
+            return self.tables[pid[1]]
+        _, key, index = pid
+        view = self.views.get((key, index))
+        if view is None:
+            view = self.views[(key, index)] = self.tables[key].view(index)
+        return view
+
+
+def freeze(simulator: Any, inputs: TaskTable) -> Tuple[bytes, Dict[str, tuple]]:
+    # (pickled simulator, {table key: (kind, length, rows)})
+    out = io.BytesIO()
+    freezer = Freezer(out, inputs)
+    freezer.dump(simulator)
+    tables = dict()
+    for key, table in freezer.tables.items():
+        rows = [(index, table.names[index]) + tuple(getattr(table, name)[index] for name in COLUMNS)
+                for index in sorted(freezer.rows[key])]
+        tables[key] = (table.kind, len(table), rows)
+    return out.getvalue(), tables
+
+
+def thaw(state: bytes, tables: Dict[str, tuple], inputs: TaskTable) -> Any:
+    # inputs is the task table read again from the same trace
+    live = {"input": inputs}
+    for key, (kind, size, rows) in tables.items():
+        if key == "input":
+            table = inputs
+            table.reset()
+        else:
+            # rows nothing pointed at are never read again
+            table = TaskTable(kind)
+            table.names = [""] * size
+            for name in COLUMNS:
+                column = getattr(table, name)
+                setattr(table, name, array(column.typecode, [0 if name == "missed" else NONE]) * size)
+            live[key] = table
+        for row in rows:
+            index, name = row[:2]
+            if key != "input":
+                table.names[index] = name
+            for column, value in zip(COLUMNS, row[2:]):
+                getattr(table, column)[index] = value
+    return Thawer(io.BytesIO(state), live).load()
+
+
+def save_snapshot(filepath: str, snapshot: Snapshot) -> None:
+    # written aside, synced and renamed, so a crash leaves the old one
+    temporary = filepath + ".tmp"
+    with open(temporary, "wb") as f:
+        f.write(MAGIC)
+        pickle.dump(snapshot, f, pickle.HIGHEST_PROTOCOL)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, filepath)
+
+
+def load_snapshot(filepath: str) -> Snapshot:
+    with open(filepath, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError("{} is not a snapshot".format(filepath))
+        snapshot = pickle.load(f)
+    if snapshot.version != SNAPSHOT_VERSION:
+        raise ValueError("{} is a version {} snapshot, this is version {}"
+                         .format(filepath, snapshot.version, SNAPSHOT_VERSION))
+    return snapshot
+
+
+class Output:
+    # the report text as it is produced, and how many bytes of it are out
+    def __init__(self, file: BinaryIO):
+        self.file: BinaryIO = file
+        self.offset: int = file.tell()
+
+    def write(self, text: str) -> None:
+        data = text.encode("utf-8")
+        self.file.write(data)
+        self.offset += len(data)
+
+    def sync(self) -> None:
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+
+def run_checkpointed(simulator: Any,
+                     clk: int,
+                     output: Output,
+                     save: Callable[[int], None],
+                     events: Optional[int] = None,
+                     seconds: Optional[float] = None) -> None:
+    # Simulator.run() writing segments out as it goes. Every events
+    # segments or seconds of wall time the output is synced and save(clk)
+    # records where the run is, the simulator state included.
+    written = 0
+    since = time.monotonic()
+
+    def sink(clk: int, segments: List[Segment]) -> None:
+        nonlocal written, since
+        for segment in segments:
+            output.write(render_segment(segment) + "\n")
+        written += len(segments)
+        if (events is not None and written >= events) or \
+                (seconds is not None and time.monotonic() - since >= seconds):
+            output.sync()
+            save(clk)
+            written = 0
+            since = time.monotonic()
+    simulator.run(clk, sink=sink, every=LOOK if events is None else min(events, LOOK))
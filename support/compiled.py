@@ -0,0 +1,110 @@
+from typing import *
+from array import array
+import mmap
+import struct
+import sys
+from .tasks import Task, RealtimeTask, TaskTable, NONE
+from .parsing import Header, load_tasks
+
+# Compiled trace layout, all little-endian:
+#   header   magic, version, kind, processes, param, row count, name width
+#   names    row count fixed-width utf-8 names, NUL padded to 8 bytes
+#   columns  arrival, estimated, priority, start_dln, end_dln as int64
+# U and RA rows are stored in arrival order so they can be replayed lazily.
+MAGIC: bytes = b"SCHT"
+VERSION: int = 1
+HEADER = struct.Struct("<4sHcxqqqq")
+COLUMNS: Tuple[str, ...] = ("arrival", "estimated", "priority", "start_dln", "end_dln")
+KINDS: Dict[str, bytes] = {"U": b"U", "RA": b"A", "RP": b"P"}
+
+
+def padded(size: int) -> int:
+    return (size + 7) & ~7
+
+
+def is_compiled(filepath: str) -> bool:
+    with open(filepath, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def compile_trace(source: str, target: str) -> Header:
+    header, tasks = load_tasks(source)
+    if header.kind == "RP":
+        # the template order is the FP priority order
+        order = list(range(len(tasks)))
+    else:
+        order = sorted(range(len(tasks)), key=tasks.arrival.__getitem__)
+    names = [tasks.names[index].encode("utf-8") for index in order]
+    width = max([len(name) for name in names] + [1])
+    block = b"".join(name.ljust(width, b"\0") for name in names)
+    with open(target, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, KINDS[header.kind],
+                            header.processes,
+                            NONE if header.param is None else header.param,
+                            len(order), width))
+        f.write(block.ljust(padded(len(block)), b"\0"))
+        for name in COLUMNS:
+            cells = getattr(tasks, name)
+            packed = array("q", [cells[index] for index in order])
+            if sys.byteorder != "little":
+                packed.byteswap()
+            f.write(packed.tobytes())
+    return header
+
+
+class PackedNames(Sequence):
+    # names decoded on access straight out of the mapped block
+    def __init__(self, block: memoryview, width: int, count: int):
+        self.block: memoryview = block
+        self.width: int = width
+        self.count: int = count
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index: int) -> str:
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        start = index * self.width
+        return bytes(self.block[start:start + self.width]).rstrip(b"\0").decode("utf-8")
+
+
+class MappedTaskTable(TaskTable):
+    # A TaskTable whose fixed columns are views into a copy-on-write mapping
+    # of a compiled trace; only the simulator state columns are allocated.
+    def __init__(self, filepath: str):
+        super(MappedTaskTable, self).__init__()
+        self.filepath: str = filepath
+        with open(filepath, "rb") as f:
+            self.map: mmap.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        magic, version, kind, processes, param, count, width = HEADER.unpack_from(self.map)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("{} is not a version {} compiled trace".format(filepath, VERSION))
+        if sys.byteorder != "little":
+            raise ValueError("compiled traces can only be mapped on little-endian hosts")
+        kind = [name for name, code in KINDS.items() if code == kind][0]
+        self.header: Header = Header(kind, processes, None if param == NONE else param)
+        self.kind = Task if kind == "U" else RealtimeTask
+        self.ordered = kind != "RP"
+        whole = memoryview(self.map)
+        offset = HEADER.size
+        self.names = PackedNames(whole[offset:offset + count * width], width, count)
+        offset += padded(count * width)
+        for name in COLUMNS:
+            setattr(self, name, whole[offset:offset + count * 8].cast("q"))
+            offset += count * 8
+        self.reset()
+
+    def append(self, *args, **kwargs) -> int:
+        raise TypeError("compiled traces are read-only")
+
+    def __reduce__(self):
+        # workers map the file again instead of receiving a copy of it
+        return MappedTaskTable, (self.filepath,)
+
+
+def load_compiled(filepath: str) -> Tuple[Header, TaskTable]:
+    tasks = MappedTaskTable(filepath)
+    return tasks.header, tasks
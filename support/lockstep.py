@@ -0,0 +1,518 @@
+from typing import *
+from collections import deque
+from functools import partial
+from .tasks import TaskTable, NONE
+from .results import Result, Segment, COMPLETED, PREEMPTED, MISSED
+from .nonpreemptive import collector_paused
+from . import RR, SRT, ED
+
+# numpy steps a whole group of sets a tick at a time, each set a row of
+# padded 2-D arrays; without it every set runs the same tick loop on its
+# own over plain lists
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# policies batches of small sets are stepped together for
+LOCKSTEP: Tuple[str, ...] = ("RR", "SRT", "ED")
+LABELS: Dict[str, str] = {"RR": RR.label, "SRT": SRT.label, "ED": ED.label}
+# sets stepped together, and the most tasks a set may have and still be
+# padded to its group's widest rather than go through the classes
+LANES: int = 4096
+WIDTH: int = 256
+# an arrival that never comes, padding the arrival rows
+NEVER: int = (1 << 62)
+
+# (column, start, stop, kind) as the simulator reports them, misses with
+# no start or stop
+Event = Tuple[int, Optional[int], Optional[int], str]
+
+
+class Lane(NamedTuple):
+    # one set's tasks in arrival order, ties in input order
+    names: List[str]
+    arrival: List[int]
+    estimated: List[int]
+    deadline: List[int]
+    # the RR quantum, 0 for none
+    quantum: int
+
+
+def lockstep_eligible(algorithm: str, tasks: TaskTable) -> bool:
+    # The tick loops below leave out what the classes do with tasks that
+    # arrive before 0 or take no time, and ED tasks without a start
+    # deadline; sets with any of those, or too big to pad, go through the
+    # classes instead.
+    if algorithm not in LOCKSTEP or len(tasks) > WIDTH:
+        return False
+    if not len(tasks):
+        return True
+    if min(tasks.arrival) < 0 or min(tasks.estimated) <= 0:
+        return False
+    return algorithm != "ED" or NONE not in tasks.start_dln
+
+
+def make_lane(tasks: TaskTable, param: Optional[int]) -> Lane:
+    # a sort per set is cheaper in plain Python than a numpy call at these
+    # sizes
+    order = sorted(range(len(tasks)), key=tasks.arrival.__getitem__)
+    return Lane([tasks.names[index] for index in order],
+                [tasks.arrival[index] for index in order],
+                [tasks.estimated[index] for index in order],
+                [tasks.start_dln[index] for index in order],
+                param if param is not None and param > 0 else 0)
+
+
+def rr_lane(lane: Lane) -> Tuple[List[Event], List[int]]:
+    # RR.tick() over plain lists, from 0 to the end: (events, lapsed)
+    arrival = lane.arrival
+    count = len(arrival)
+    remaining = list(lane.estimated)
+    ready: Deque[int] = deque()
+    events = list()
+    upcoming = 0
+    running = -1
+    started = 0
+    used = 0
+    left = count
+    clk = 0
+    while left:
+        while upcoming < count and arrival[upcoming] == clk:
+            ready.append(upcoming)
+            upcoming += 1
+        if running < 0:
+            if not ready:
+                # idle until the next arrival
+                clk = arrival[upcoming]
+                continue
+            running = ready.popleft()
+            started = clk
+        else:
+            remaining[running] -= 1
+            used += 1
+            if remaining[running] <= 0:
+                events.append((running, started, clk, COMPLETED))
+                left -= 1
+                running = ready.popleft() if ready else -1
+                started = clk
+                used = 0
+            elif used == lane.quantum:
+                events.append((running, started, clk, PREEMPTED))
+                ready.append(running)
+                running = ready.popleft()
+                started = clk
+                used = 0
+        clk += 1
+    return events, list()
+
+
+def srt_lane(lane: Lane) -> Tuple[List[Event], List[int]]:
+    # SRT.tick() over plain lists. The ready queue's order is (key, tie):
+    # key is the remaining time as of the last sort, which for the running
+    # task is a tick old; arrivals tie newest first, and a task sorted again
+    # after service goes behind everything it then ties with.
+    arrival = lane.arrival
+    count = len(arrival)
+    remaining = list(lane.estimated)
+    key = list(lane.estimated)
+    tie = [0] * count
+    queued: List[int] = list()
+    events = list()
+    reseats = 0
+    served = -1
+    upcoming = 0
+    running = -1
+    started = 0
+    left = count
+    clk = 0
+
+    def lead() -> int:
+        return min(queued, key=lambda column: (key[column], tie[column]))
+    while left:
+        while upcoming < count and arrival[upcoming] == clk:
+            queued.append(upcoming)
+            tie[upcoming] = -1 - upcoming
+            upcoming += 1
+        if served >= 0:
+            reseats += 1
+            key[served] = remaining[served]
+            tie[served] = reseats
+            served = -1
+        if running < 0:
+            if not queued:
+                clk = arrival[upcoming]
+                continue
+            running = lead()
+            started = clk
+        else:
+            remaining[running] -= 1
+            if remaining[running] <= 0:
+                events.append((running, started, clk, COMPLETED))
+                left -= 1
+                queued.remove(running)
+                running = lead() if queued else -1
+                started = clk
+            else:
+                served = running
+                head = lead()
+                if head != running:
+                    events.append((running, started, clk, PREEMPTED))
+                    running = head
+                    started = clk
+        clk += 1
+    return events, list()
+
+
+def ed_lane(lane: Lane) -> Tuple[List[Event], List[int]]:
+    # ED.tick() over plain lists. A queued task lapses once the clock is
+    # past its start deadline; the lapses of a tick are taken in ready list
+    # order (latest deadline first, then arrival, then this tick's
+    # arrivals) and reported after the next completion, the latest first.
+    arrival = lane.arrival
+    deadline = lane.deadline
+    count = len(arrival)
+    remaining = list(lane.estimated)
+    queued: List[int] = list()
+    pending: List[int] = list()
+    lapsed: List[int] = list()
+    events = list()
+    upcoming = 0
+    running = -1
+    started = 0
+    left = count
+    clk = 0
+
+    def earliest() -> int:
+        # the earliest start deadline, the latest arrival of those tied
+        column = max(queued, key=lambda column: (-deadline[column], column))
+        queued.remove(column)
+        return column
+    while left:
+        fresh = list()
+        while upcoming < count and arrival[upcoming] == clk:
+            fresh.append(upcoming)
+            upcoming += 1
+        late = sorted((column for column in queued if deadline[column] < clk),
+                      key=lambda column: (-deadline[column], column))
+        late += [column for column in fresh if deadline[column] < clk]
+        if late:
+            gone = set(late)
+            queued = [column for column in queued if column not in gone]
+            fresh = [column for column in fresh if column not in gone]
+            pending.extend(late)
+            lapsed.extend(late)
+            left -= len(late)
+        queued.extend(fresh)
+        if running < 0:
+            if not queued:
+                clk = arrival[upcoming] if upcoming < count else clk + 1
+                continue
+            running = earliest()
+            started = clk
+        else:
+            remaining[running] -= 1
+            if remaining[running] <= 0:
+                events.append((running, started, clk, COMPLETED))
+                while pending:
+                    events.append((pending.pop(), None, None, MISSED))
+                left -= 1
+                running = earliest() if queued else -1
+                started = clk
+        clk += 1
+    return events, lapsed
+
+
+class Lanes:
+    # A group of sets as rows of padded arrays, stepped together. Rows of
+    # sets that have finished are dropped once they are half the group.
+    def __init__(self, lanes: List[Lane]):
+        count = len(lanes)
+        width = max([1] + [len(lane.arrival) for lane in lanes])
+        self.lane = numpy.arange(count)
+        self.rows = numpy.arange(count)
+        self.columns = numpy.arange(width)
+        # one more arrival column than tasks, so the next one is always there
+        self.arrival = numpy.full((count, width + 1), NEVER, dtype=numpy.int64)
+        self.remaining = numpy.ones((count, width), dtype=numpy.int64)
+        self.deadline = numpy.zeros((count, width), dtype=numpy.int64)
+        self.quantum = numpy.zeros(count, dtype=numpy.int64)
+        self.left = numpy.zeros(count, dtype=numpy.int64)
+        for row, lane in enumerate(lanes):
+            size = len(lane.arrival)
+            self.arrival[row, :size] = lane.arrival
+            self.remaining[row, :size] = lane.estimated
+            self.deadline[row, :size] = lane.deadline
+            self.quantum[row] = lane.quantum
+            self.left[row] = size
+        self.upcoming = numpy.zeros(count, dtype=numpy.int64)
+        self.running = numpy.full(count, -1, dtype=numpy.int64)
+        self.started = numpy.zeros(count, dtype=numpy.int64)
+        # tasks queued per row
+        self.size = numpy.zeros(count, dtype=numpy.int64)
+        self.events: List[List[Event]] = [list() for _ in range(count)]
+        self.lapsed: List[List[int]] = [list() for _ in range(count)]
+
+    def compact(self) -> None:
+        keep = self.left > 0
+        if 2 * int(keep.sum()) > len(keep):
+            return
+        for name, value in list(vars(self).items()):
+            if isinstance(value, numpy.ndarray) and name != "columns":
+                setattr(self, name, value[keep])
+        self.rows = numpy.arange(len(self.lane))
+
+    def idle(self) -> bool:
+        return not (self.running >= 0).any() and not (self.size > 0).any()
+
+    def arrivals(self, clk: int) -> Iterator[Tuple[Any, Any]]:
+        # (rows, columns) of the tasks arriving at clk, one per row at a time
+        while True:
+            rows = numpy.flatnonzero(self.arrival[self.rows, self.upcoming] == clk)
+            if not len(rows):
+                return
+            columns = self.upcoming[rows]
+            self.upcoming[rows] += 1
+            yield rows, columns
+
+    def record(self, rows: Any, clk: int, kind: str) -> None:
+        for lane, column, start in zip(self.lane[rows].tolist(),
+                                       self.running[rows].tolist(),
+                                       self.started[rows].tolist()):
+            self.events[lane].append((column, start, clk, kind))
+
+    def run(self, step: Callable[["Lanes", int], None]) -> None:
+        clk = 0
+        while self.left.any():
+            if self.idle():
+                clk = int(self.arrival[self.rows, self.upcoming].min())
+            step(self, clk)
+            clk += 1
+            self.compact()
+
+
+def rr_setup(lanes: Lanes) -> None:
+    # ready deques as rings
+    count, width = lanes.remaining.shape
+    lanes.queue = numpy.zeros((count, width), dtype=numpy.int64)
+    lanes.head = numpy.zeros(count, dtype=numpy.int64)
+    lanes.used = numpy.zeros(count, dtype=numpy.int64)
+
+
+def rr_push(lanes: Lanes, rows: Any, columns: Any) -> None:
+    width = lanes.queue.shape[1]
+    lanes.queue[rows, (lanes.head[rows] + lanes.size[rows]) % width] = columns
+    lanes.size[rows] += 1
+
+
+def rr_pop(lanes: Lanes, rows: Any) -> Any:
+    columns = lanes.queue[rows, lanes.head[rows]]
+    lanes.head[rows] = (lanes.head[rows] + 1) % lanes.queue.shape[1]
+    lanes.size[rows] -= 1
+    return columns
+
+
+def rr_step(lanes: Lanes, clk: int) -> None:
+    for rows, columns in lanes.arrivals(clk):
+        rr_push(lanes, rows, columns)
+    busy = lanes.running >= 0
+    starting = numpy.flatnonzero(~busy & (lanes.size > 0))
+    if len(starting):
+        lanes.running[starting] = rr_pop(lanes, starting)
+        lanes.started[starting] = clk
+    serving = numpy.flatnonzero(busy)
+    if not len(serving):
+        return
+    columns = lanes.running[serving]
+    lanes.remaining[serving, columns] -= 1
+    lanes.used[serving] += 1
+    done = lanes.remaining[serving, columns] <= 0
+    ended = serving[done]
+    if len(ended):
+        lanes.record(ended, clk, COMPLETED)
+        lanes.left[ended] -= 1
+        lanes.used[ended] = 0
+        lanes.started[ended] = clk
+        lanes.running[ended] = -1
+        following = ended[lanes.size[ended] > 0]
+        lanes.running[following] = rr_pop(lanes, following)
+    going = serving[~done]
+    cut = going[lanes.used[going] == lanes.quantum[going]]
+    if len(cut):
+        lanes.record(cut, clk, PREEMPTED)
+        rr_push(lanes, cut, lanes.running[cut])
+        lanes.running[cut] = rr_pop(lanes, cut)
+        lanes.started[cut] = clk
+        lanes.used[cut] = 0
+
+
+def srt_setup(lanes: Lanes) -> None:
+    # (key, tie) as in srt_lane()
+    lanes.key = lanes.remaining.copy()
+    lanes.tie = numpy.zeros(lanes.remaining.shape, dtype=numpy.int64)
+    lanes.queued = numpy.zeros(lanes.remaining.shape, dtype=bool)
+    lanes.reseats = numpy.zeros(len(lanes.lane), dtype=numpy.int64)
+    lanes.served = numpy.full(len(lanes.lane), -1, dtype=numpy.int64)
+
+
+def srt_lead(lanes: Lanes, rows: Any) -> Any:
+    # the queued column each row would dispatch, -1 for none
+    queued = lanes.queued[rows]
+    key = numpy.where(queued, lanes.key[rows], NEVER)
+    least = key.min(axis=1)
+    tie = numpy.where(key == least[:, None], lanes.tie[rows], NEVER)
+    return numpy.where(least < NEVER, tie.argmin(axis=1), -1)
+
+
+def srt_step(lanes: Lanes, clk: int) -> None:
+    for rows, columns in lanes.arrivals(clk):
+        lanes.queued[rows, columns] = True
+        lanes.tie[rows, columns] = -1 - columns
+        lanes.size[rows] += 1
+    served = numpy.flatnonzero(lanes.served >= 0)
+    if len(served):
+        columns = lanes.served[served]
+        lanes.reseats[served] += 1
+        lanes.key[served, columns] = lanes.remaining[served, columns]
+        lanes.tie[served, columns] = lanes.reseats[served]
+        lanes.served[served] = -1
+    lead = srt_lead(lanes, lanes.rows)
+    busy = lanes.running >= 0
+    starting = numpy.flatnonzero(~busy & (lanes.size > 0))
+    if len(starting):
+        lanes.running[starting] = lead[starting]
+        lanes.started[starting] = clk
+    serving = numpy.flatnonzero(busy)
+    if not len(serving):
+        return
+    columns = lanes.running[serving]
+    lanes.remaining[serving, columns] -= 1
+    done = lanes.remaining[serving, columns] <= 0
+    ended = serving[done]
+    if len(ended):
+        lanes.record(ended, clk, COMPLETED)
+        lanes.left[ended] -= 1
+        lanes.queued[ended, columns[done]] = False
+        lanes.size[ended] -= 1
+        lanes.running[ended] = srt_lead(lanes, ended)
+        lanes.started[ended] = clk
+    going = serving[~done]
+    lanes.served[going] = lanes.running[going]
+    cut = going[lead[going] != lanes.running[going]]
+    if len(cut):
+        lanes.record(cut, clk, PREEMPTED)
+        lanes.running[cut] = lead[cut]
+        lanes.started[cut] = clk
+
+
+def ed_setup(lanes: Lanes) -> None:
+    lanes.queued = numpy.zeros(lanes.remaining.shape, dtype=bool)
+    lanes.fresh = numpy.zeros(lanes.remaining.shape, dtype=bool)
+    # lapses not reported yet, by lane
+    lanes.pending = [list() for _ in lanes.events]
+
+
+def ed_take(lanes: Lanes, rows: Any) -> Any:
+    # the earliest start deadline per row, the latest arrival of those
+    # tied, off the queue
+    queued = lanes.queued[rows]
+    deadline = numpy.where(queued, lanes.deadline[rows], NEVER)
+    least = deadline.min(axis=1)
+    columns = numpy.where(queued & (deadline == least[:, None]), lanes.columns, -1).max(axis=1)
+    lanes.queued[rows, columns] = False
+    lanes.size[rows] -= 1
+    return columns
+
+
+def ed_step(lanes: Lanes, clk: int) -> None:
+    arrived = list(lanes.arrivals(clk))
+    for rows, columns in arrived:
+        lanes.queued[rows, columns] = True
+        lanes.fresh[rows, columns] = True
+        lanes.size[rows] += 1
+    rows, columns = numpy.nonzero(lanes.queued & (lanes.deadline < clk))
+    if len(rows):
+        # per row in ed_lane()'s order: queued before this tick by latest
+        # deadline then arrival, then this tick's arrivals
+        fresh = lanes.fresh[rows, columns]
+        order = numpy.lexsort((columns, numpy.where(fresh, 0, -lanes.deadline[rows, columns]), fresh, rows))
+        for lane, column in zip(lanes.lane[rows[order]].tolist(), columns[order].tolist()):
+            lanes.pending[lane].append(column)
+            lanes.lapsed[lane].append(column)
+        lanes.queued[rows, columns] = False
+        counts = numpy.bincount(rows, minlength=len(lanes.lane))
+        lanes.size -= counts
+        lanes.left -= counts
+    for rows, columns in arrived:
+        lanes.fresh[rows, columns] = False
+    busy = lanes.running >= 0
+    starting = numpy.flatnonzero(~busy & (lanes.size > 0))
+    if len(starting):
+        lanes.running[starting] = ed_take(lanes, starting)
+        lanes.started[starting] = clk
+    serving = numpy.flatnonzero(busy)
+    if not len(serving):
+        return
+    columns = lanes.running[serving]
+    lanes.remaining[serving, columns] -= 1
+    ended = serving[lanes.remaining[serving, columns] <= 0]
+    if len(ended):
+        lanes.record(ended, clk, COMPLETED)
+        for lane in lanes.lane[ended].tolist():
+            pending = lanes.pending[lane]
+            while pending:
+                lanes.events[lane].append((pending.pop(), None, None, MISSED))
+        lanes.left[ended] -= 1
+        lanes.started[ended] = clk
+        lanes.running[ended] = -1
+        following = ended[lanes.size[ended] > 0]
+        lanes.running[following] = ed_take(lanes, following)
+
+
+STEPS: Dict[str, Tuple[Callable[[Lanes], None], Callable[[Lanes, int], None]]] = {
+    "RR": (rr_setup, rr_step),
+    "SRT": (srt_setup, srt_step),
+    "ED": (ed_setup, ed_step),
+}
+LANE_LOOPS: Dict[str, Callable[[Lane], Tuple[List[Event], List[int]]]] = {
+    "RR": rr_lane,
+    "SRT": srt_lane,
+    "ED": ed_lane,
+}
+
+
+def finish(algorithm: str, lane: Lane, events: List[Event], lapsed: List[int]) -> Result:
+    result = Result(algorithm, LABELS[algorithm])
+    names = lane.names
+    # straight from the fields, as simulate_nonpreemptive() fills them
+    fields = ((names[column], start, stop, kind, 0) for column, start, stop, kind in events)
+    result.segments = list(map(partial(tuple.__new__, Segment), fields))
+    result.missed = set(names[column] for column in lapsed)
+    return result
+
+
+def simulate_lockstep(algorithm: str,
+                      tables: Sequence[TaskTable],
+                      params: Sequence[Optional[int]]) -> List[Result]:
+    # The Result simulate() gives for each table and param, for tables
+    # that are all lockstep_eligible(). Sets are grouped by size so that
+    # little padding is stepped through.
+    if algorithm not in LOCKSTEP:
+        raise ValueError("{} is not a lockstep policy".format(algorithm))
+    results: List[Optional[Result]] = [None] * len(tables)
+    order = sorted(range(len(tables)), key=lambda index: len(tables[index]))
+    with collector_paused():
+        for low in range(0, len(order), LANES):
+            group = order[low:low + LANES]
+            lanes = [make_lane(tables[index], params[index]) for index in group]
+            if numpy is not None:
+                setup, step = STEPS[algorithm]
+                stepped = Lanes(lanes)
+                setup(stepped)
+                stepped.run(step)
+                traces = zip(stepped.events, stepped.lapsed)
+            else:
+                traces = map(LANE_LOOPS[algorithm], lanes)
+            for index, lane, (events, lapsed) in zip(group, lanes, traces):
+                results[index] = finish(algorithm, lane, events, lapsed)
+    return results
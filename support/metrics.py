@@ -0,0 +1,300 @@
+from typing import *
+from array import array
+from collections import Counter
+from itertools import compress, repeat
+from math import ceil
+from operator import ne, sub, truediv
+import csv
+import io
+import json
+from .tasks import NONE, Releases, Task, job_name
+from .results import Result, Segment, COMPLETED, MISSED, render_table
+
+QUANTILES: Tuple[float, ...] = (0.5, 0.9, 0.99)
+# jobs folded into the histograms at a time
+CHUNK: int = 1 << 16
+
+
+class JobSet(NamedTuple):
+    # every job a run can report, by the name the simulator gives it
+    names: List[str]
+    arrival: array
+    service: array
+
+
+class Distribution(NamedTuple):
+    count: int
+    mean: Optional[float]
+    p50: Optional[float]
+    p90: Optional[float]
+    p99: Optional[float]
+
+
+class Metrics(NamedTuple):
+    algorithm: str
+    jobs: int
+    completed: int
+    missed: int
+    miss_ratio: Optional[float]
+    # completions per tick and busy share of the processors, both over the
+    # time from the first arrival to the last segment
+    throughput: Optional[float]
+    utilization: Optional[float]
+    turnaround: Distribution
+    normalized: Distribution
+    response: Distribution
+    waiting: Distribution
+
+
+class TaskMetrics(NamedTuple):
+    name: str
+    arrival: int
+    service: int
+    start: Optional[int]
+    finish: Optional[int]
+    turnaround: Optional[int]
+    normalized: Optional[float]
+    response: Optional[int]
+    waiting: Optional[int]
+    missed: bool
+
+
+class Histogram:
+    # Counts per distinct value. Simulator times are whole ticks, so the
+    # quantiles are exact and the size follows the spread of the values
+    # rather than their number; Tr/Ts is kept to three decimals.
+    def __init__(self, precision: Optional[int] = None):
+        self.precision: Optional[int] = precision
+        self.counts: Counter = Counter()
+        self.count: int = 0
+        self.total: float = 0
+
+    def update(self, values: List[Any]) -> None:
+        self.count += len(values)
+        self.total += sum(values)
+        if self.precision is None:
+            self.counts.update(values)
+        else:
+            self.counts.update(map(round, values, repeat(self.precision)))
+
+    def quantile(self, fraction: float) -> Optional[float]:
+        # nearest rank
+        if not self.count:
+            return None
+        rank = max(1, ceil(fraction * self.count))
+        seen = 0
+        for value in sorted(self.counts):
+            seen += self.counts[value]
+            if seen >= rank:
+                return value
+        return None
+
+    def distribution(self) -> Distribution:
+        mean = self.total / self.count if self.count else None
+        return Distribution(self.count, mean, *(self.quantile(fraction) for fraction in QUANTILES))
+
+
+def job_set(kind: str, tasks: Iterable[Task], end: Optional[int] = None) -> JobSet:
+    # U and RA tasks are their own jobs; RP templates are replayed up to
+    # the ending time, named and numbered the way PeriodicSimulator does
+    jobs = JobSet(list(), array("q"), array("q"))
+    if kind != "RP":
+        for this_task in tasks:
+            jobs.names.append(this_task.name)
+            jobs.arrival.append(this_task.arrival)
+            jobs.service.append(this_task.estimated)
+        return jobs
+    templates = list(tasks)
+    for release, index, serial in Releases(templates).until(end):
+        jobs.names.append(job_name(templates[index].name, serial))
+        jobs.arrival.append(release)
+        jobs.service.append(templates[index].estimated)
+    return jobs
+
+
+class Trace:
+    # First start and completion per job, busy time and the last stop,
+    # taken from segments a batch at a time, so a schedule handed on as it
+    # is produced can be measured without being kept.
+    def __init__(self, jobs: JobSet):
+        self.rows: Dict[str, int] = dict()
+        for index, name in enumerate(jobs.names):
+            self.rows.setdefault(name, index)
+        self.first: array = array("q", [NONE]) * len(jobs.names)
+        self.finish: array = array("q", [NONE]) * len(jobs.names)
+        self.busy: int = 0
+        self.last: int = 0
+
+    def add(self, segments: Iterable[Segment]) -> None:
+        rows, first, finish = self.rows, self.first, self.finish
+        for segment in segments:
+            if segment.kind == MISSED:
+                continue
+            self.busy += segment.stop - segment.start
+            self.last = max(self.last, segment.stop)
+            index = rows.get(segment.task)
+            if index is None:
+                continue
+            if first[index] == NONE or segment.start < first[index]:
+                first[index] = segment.start
+            if segment.kind == COMPLETED:
+                finish[index] = segment.stop
+
+
+def trace(result: Result, jobs: JobSet, traced: Optional[Trace] = None) -> Trace:
+    # traced holds what a sink already took of the run, result the rest
+    if traced is None:
+        traced = Trace(jobs)
+    traced.add(result.segments)
+    return traced
+
+
+def measure(result: Result, jobs: JobSet, traced: Optional[Trace] = None) -> Metrics:
+    # one pass over the segments, then the job columns a chunk at a time
+    # with the arithmetic done by map() over whole slices
+    traced = trace(result, jobs, traced)
+    first, finish, busy, last = traced.first, traced.finish, traced.busy, traced.last
+    turnaround = Histogram()
+    normalized = Histogram(3)
+    response = Histogram()
+    waiting = Histogram()
+    for low in range(0, len(jobs.names), CHUNK):
+        high = low + CHUNK
+        arrival = jobs.arrival[low:high]
+        service = jobs.service[low:high]
+        started = list(map(ne, first[low:high], repeat(NONE)))
+        done = list(map(ne, finish[low:high], repeat(NONE)))
+        response.update(list(map(sub, compress(first[low:high], started), compress(arrival, started))))
+        times = list(map(sub, compress(finish[low:high], done), compress(arrival, done)))
+        costs = list(compress(service, done))
+        turnaround.update(times)
+        waiting.update(list(map(sub, times, costs)))
+        positive = list(map(bool, costs))
+        normalized.update(list(map(truediv, compress(times, positive), compress(costs, positive))))
+    count = len(jobs.names)
+    missed = len(result.missed)
+    start = min(jobs.arrival) if count else 0
+    span = last - start
+    return Metrics(result.algorithm,
+                   count,
+                   turnaround.count,
+                   missed,
+                   missed / count if count else None,
+                   turnaround.count / span if span > 0 else None,
+                   busy / (span * result.cpus) if span > 0 else None,
+                   turnaround.distribution(),
+                   normalized.distribution(),
+                   response.distribution(),
+                   waiting.distribution())
+
+
+def task_metrics(result: Result, jobs: JobSet, traced: Optional[Trace] = None) -> Iterator[TaskMetrics]:
+    traced = trace(result, jobs, traced)
+    first, finish = traced.first, traced.finish
+    for index, name in enumerate(jobs.names):
+        arrival = jobs.arrival[index]
+        service = jobs.service[index]
+        start = None if first[index] == NONE else first[index]
+        stop = None if finish[index] == NONE else finish[index]
+        turnaround = None if stop is None else stop - arrival
+        yield TaskMetrics(name, arrival, service, start, stop, turnaround,
+                          turnaround / service if turnaround is not None and service > 0 else None,
+                          None if start is None else start - arrival,
+                          None if turnaround is None else turnaround - service,
+                          name in result.missed)
+
+
+def flatten(filepath: str, metrics: Metrics) -> Dict[str, Any]:
+    # one flat row, distributions spread over <name>_<statistic> columns
+    row = {"file": filepath}
+    for field, value in metrics._asdict().items():
+        if isinstance(value, Distribution):
+            for statistic, number in value._asdict().items():
+                row["{}_{}".format(field, statistic)] = number
+        else:
+            row[field] = value
+    return row
+
+
+def metrics_csv(rows: List[Tuple[str, Metrics]]) -> str:
+    flat = [flatten(filepath, metrics) for filepath, metrics in rows]
+    out = io.StringIO()
+    if flat:
+        writer = csv.DictWriter(out, list(flat[0]), lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(flat)
+    return out.getvalue().rstrip("\n")
+
+
+def metrics_entry(metrics: Metrics) -> Dict[str, Any]:
+    # JSON ready, distributions as nested objects
+    entry = dict()
+    for field, value in metrics._asdict().items():
+        entry[field] = value._asdict() if isinstance(value, Distribution) else value
+    return entry
+
+
+def metrics_json(rows: List[Tuple[str, Metrics]]) -> str:
+    return json.dumps([dict(file=filepath, **metrics_entry(metrics)) for filepath, metrics in rows], indent=1)
+
+
+def format_metrics(rows: List[Tuple[str, Metrics]]) -> str:
+    def number(value: Optional[float], spec: str = "{:.2f}") -> str:
+        return "-" if value is None else spec.format(value)
+
+    table = [("file", "algorithm", "jobs", "done", "missed", "throughput", "util",
+              "Tr mean", "Tr p90", "Tr/Ts mean", "Tr/Ts p90", "resp mean", "resp p90", "wait mean", "wait p90")]
+    for filepath, metrics in rows:
+        table.append((filepath, metrics.algorithm, str(metrics.jobs), str(metrics.completed),
+                      number(metrics.miss_ratio, "{:.1%}"), number(metrics.throughput, "{:.4f}"),
+                      number(metrics.utilization, "{:.1%}"),
+                      number(metrics.turnaround.mean), number(metrics.turnaround.p90),
+                      number(metrics.normalized.mean), number(metrics.normalized.p90),
+                      number(metrics.response.mean), number(metrics.response.p90),
+                      number(metrics.waiting.mean), number(metrics.waiting.p90)))
+    return render_table(table, left=2)
+
+
+def task_row(filepath: str, algorithm: str, metrics: TaskMetrics) -> Dict[str, Any]:
+    return dict(file=filepath, algorithm=algorithm, **metrics._asdict())
+
+
+def task_metrics_csv(rows: List[Tuple[str, str, TaskMetrics]]) -> str:
+    out = io.StringIO()
+    writer = csv.DictWriter(out, ("file", "algorithm") + TaskMetrics._fields, lineterminator="\n")
+    writer.writeheader()
+    writer.writerows(task_row(*row) for row in rows)
+    return out.getvalue().rstrip("\n")
+
+
+def task_metrics_json(rows: List[Tuple[str, str, TaskMetrics]]) -> str:
+    return json.dumps([task_row(*row) for row in rows], indent=1)
+
+
+def format_task_metrics(rows: List[Tuple[str, str, TaskMetrics]]) -> str:
+    def number(value: Optional[float]) -> str:
+        return "-" if value is None else "{:.2f}".format(value) if isinstance(value, float) else str(value)
+
+    table = [("file", "algorithm", "task", "arrival", "Ts", "start", "finish", "Tr", "Tr/Ts", "resp", "wait",
+              "missed")]
+    for filepath, algorithm, metrics in rows:
+        table.append((filepath, algorithm, metrics.name, str(metrics.arrival), str(metrics.service),
+                      number(metrics.start), number(metrics.finish), number(metrics.turnaround),
+                      number(metrics.normalized), number(metrics.response), number(metrics.waiting),
+                      "yes" if metrics.missed else "no"))
+    return render_table(table, left=3)
+
+
+class MetricFormat(NamedTuple):
+    # rows of (file, Metrics) per run, and of (file, algorithm, TaskMetrics)
+    # per job with --metrics-per-task
+    policies: Callable[[List[Tuple[str, Metrics]]], str]
+    tasks: Callable[[List[Tuple[str, str, TaskMetrics]]], str]
+
+
+# --metrics choices of schedule.py
+METRIC_FORMATS: Dict[str, MetricFormat] = {
+    "table": MetricFormat(format_metrics, format_task_metrics),
+    "csv": MetricFormat(metrics_csv, task_metrics_csv),
+    "json": MetricFormat(metrics_json, task_metrics_json),
+}
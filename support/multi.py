@@ -0,0 +1,348 @@
+from typing import *
+from fractions import Fraction
+from heapq import heappush, heappop, nsmallest
+from .tasks import Task, RealtimeTask, Releases, TaskTable, job_name, releasing
+from .results import Result, COMPLETED, PREEMPTED
+from . import FCFS, RR, SPN, SRT, HRRN, ED, EDUI, RFCSC, FP, EDCD, Simulator, build, run_simulator
+
+PLACEMENTS: Tuple[str, ...] = ("global", "first-fit", "worst-fit")
+
+# how the global variants rank ready tasks (lowest first) and whether a
+# better ready task takes a processor away from a running one
+POLICIES: Dict[str, Tuple[Callable[[Task, int], Any], bool]] = {
+    "FCFS": (lambda task, clk: task.arrival, False),
+    "RR": (lambda task, clk: 0, False),
+    "SPN": (lambda task, clk: task.estimated, False),
+    "SRT": (lambda task, clk: task.remaining, True),
+    "HRRN": (lambda task, clk: -Fraction(clk - task.arrival + task.estimated, max(task.estimated, 1)), False),
+    "ED": (lambda task, clk: task.start_dln, False),
+    "EDUI": (lambda task, clk: task.start_dln, False),
+    "RFCSC": (lambda task, clk: 0, False),
+    "FP": (lambda task, clk: task.priority, True),
+    "EDCD": (lambda task, clk: task.end_dln, True),
+}
+REALTIME: Tuple[str, ...] = ("ED", "EDUI", "RFCSC", "FP", "EDCD")
+# policies whose single processor ready queue hands out the newest of
+# tasks that rank equal (a ReadyQueue, or HRRN's scan); the rest are
+# first come first served
+NEWEST_FIRST: Tuple[str, ...] = ("SPN", "SRT", "HRRN", "ED", "EDUI", "FP", "EDCD")
+# the single processor simulators, whose labels the runs carry
+SIMULATORS: Dict[str, type] = {"FCFS": FCFS, "RR": RR, "SPN": SPN, "SRT": SRT, "HRRN": HRRN, "ED": ED, "EDUI": EDUI,
+                               "RFCSC": RFCSC, "FP": FP, "EDCD": EDCD}
+
+
+def releases(templates: List[RealtimeTask], end: int) -> Iterator[RealtimeTask]:
+    # every job the RP templates release up to end, in release order
+    jobs = TaskTable(RealtimeTask)
+    for release, index, serial in Releases(templates).until(end):
+        this_task = templates[index]
+        row = jobs.append(job_name(this_task.name, serial),
+                          release,
+                          this_task.estimated,
+                          index,
+                          this_task.start_dln,
+                          this_task.end_dln * serial)
+        yield jobs.view(row)
+
+
+def renumbering(templates: List[RealtimeTask], part: List[RealtimeTask], end: int) -> Dict[str, str]:
+    # names the jobs of part get when it runs on its own -> names they get
+    # in the whole set, which differ only where templates share a name
+    position = dict((id(this_task), index) for index, this_task in enumerate(templates))
+    names = dict(((index, release), job_name(templates[index].name, serial))
+                 for release, index, serial in Releases(templates).until(end))
+    return dict((job_name(part[index].name, serial), names[position[id(part[index])], release])
+                for release, index, serial in Releases(part).until(end))
+
+
+class GlobalSimulator(Simulator):
+    # M processors fed from one ready set; a preempted task may resume on
+    # any of them. Each task runs for whole stretches between events, so
+    # at M=1 the tick-level quirks of SRT, HRRN, FP and EDCD are
+    # not reproduced (see README); the other policies match simulate().
+    def __init__(self,
+                 tasks: Iterable[Task],
+                 algorithm: str,
+                 cpus: int,
+                 param: Optional[int] = None,
+                 end: Optional[int] = None):
+        super(GlobalSimulator, self).__init__(tasks)
+        self.algorithm: str = algorithm
+        self.result = Result(algorithm, SIMULATORS[algorithm].label, cpus)
+        self.key, self.preemptive = POLICIES[algorithm]
+        self.realtime: bool = algorithm in REALTIME
+        self.quantum: Optional[int] = param if algorithm == "RR" else None
+        self.idle_allowed: int = param if algorithm == "EDUI" and param is not None else 20
+        self.end: Optional[int] = end
+        self.slots: List[Optional[Task]] = [None] * cpus
+        # start of the current segment and RR slice used
+        self.since: List[int] = [0] * cpus
+        self.slices: List[int] = [0] * cpus
+        # EDUI: ticks idle with nothing to run, since when that has been
+        # so and when the processor last finished a task
+        self.idle: List[int] = [0] * cpus
+        self.empty: List[Optional[int]] = [0] * cpus
+        self.freed: List[Optional[int]] = [None] * cpus
+        # ties go to the task queued first, or last for NEWEST_FIRST
+        self.ready: Dict[int, Task] = dict()
+        self.order: Dict[int, int] = dict()
+        self.seq: int = 0
+        self.tie: int = -1 if algorithm in NEWEST_FIRST else 1
+        # EDUI's ready list is reversed in place on every tick a processor
+        # waits on a start deadline, which turns its ties around; sign is
+        # -1 while they are turned. holding is the tick a processor was last
+        # left waiting like that, the ticks skipped since turned them too.
+        self.sign: int = 1
+        self.flipped: Optional[int] = None
+        self.holding: Optional[int] = None
+        # (miss time, watch order, task) for queued realtime tasks
+        self.deadlines: List[Tuple[int, int, Task]] = list()
+        self.watched: int = 0
+        # misses not reported yet, as on one processor they go out with
+        # the next segment, the latest first
+        self.missed: List[RealtimeTask] = list()
+
+    def admit(self, task: Task) -> None:
+        self.seq += 1
+        # last in line among its ties, whichever way they are turned
+        self.order[id(task)] = self.sign * self.seq
+        self.requeue(task)
+
+    def requeue(self, task: Task) -> None:
+        self.ready[id(task)] = task
+        if self.realtime:
+            when = task.miss_time()
+            if when is not None:
+                self.watched += 1
+                heappush(self.deadlines, (when, self.watched, task))
+
+    def watching(self, entry: Tuple[int, int, Task]) -> bool:
+        # entries of tasks since started, or requeued with a new miss
+        # time, are stale
+        when, order, this_task = entry
+        return id(this_task) in self.ready and this_task.miss_time() == when
+
+    def next_miss(self) -> Optional[int]:
+        while self.deadlines and not self.watching(self.deadlines[0]):
+            heappop(self.deadlines)
+        return self.deadlines[0][0] if self.deadlines else None
+
+    def rank(self, clk: int) -> Callable[[Task], Any]:
+        return lambda task: (self.key(task, clk), self.tie * self.sign * self.order[id(task)])
+
+    def finished(self, clk: int) -> bool:
+        if self.end is not None:
+            return clk > self.end
+        return self.all_done()
+
+    def stop(self, cpu: int, clk: int, kind: str) -> Task:
+        this_task = self.slots[cpu]
+        self.slots[cpu] = None
+        if kind == COMPLETED:
+            self.freed[cpu] = clk
+        if kind == COMPLETED or clk > self.since[cpu]:
+            self.report(this_task, cpu, clk, kind)
+        return this_task
+
+    def report(self, task: Task, cpu: int, clk: int, kind: str) -> None:
+        self.result.add(task.name, self.since[cpu], clk, kind, cpu)
+        while self.missed:
+            # a queued task misses on no processor in particular
+            self.result.miss(self.missed.pop().name, None)
+
+    def start(self, cpu: int, task: Task, clk: int) -> None:
+        del self.ready[id(task)]
+        self.slots[cpu] = task
+        self.since[cpu] = clk
+        self.slices[cpu] = 0
+        if task.started is None:
+            task.started = clk
+
+    def tick(self, clk: int) -> None:
+        # the ticks skipped while EDUI waited turned its ties before anything
+        # arrives now
+        if self.holding is not None and (clk - self.holding - 1) % 2:
+            self.sign = -self.sign
+        for this_task in self.arrived(clk):
+            self.admit(this_task)
+        # misses due now go out with the segments ending now
+        if self.realtime:
+            self.expire(clk)
+        for cpu, this_task in enumerate(self.slots):
+            if this_task is not None and this_task.remaining <= 0:
+                this_task.completed = clk
+                self.retire(self.stop(cpu, clk, COMPLETED))
+        self.dispatch(clk)
+
+    def expire(self, clk: int) -> None:
+        # only queued tasks miss, a running one is seen through
+        late = list()
+        while self.deadlines and self.deadlines[0][0] <= clk:
+            entry = heappop(self.deadlines)
+            if self.watching(entry):
+                del self.ready[id(entry[2])]
+                late.append(entry[2])
+        if self.algorithm == "EDUI":
+            # in EDUI's ready list order, ties as they are turned now
+            late.sort(key=lambda task: self.sign * self.order[id(task)])
+        for this_task in late:
+            self.lapse(this_task)
+
+    def lapse(self, task: RealtimeTask) -> None:
+        task.missed = True
+        self.result.missed.add(task.name)
+        self.missed.append(task)
+        self.retire(task)
+
+    def dispatch(self, clk: int) -> None:
+        rank = self.rank(clk)
+        if self.quantum is not None:
+            # a used up slice goes to the back of the line if anyone waits,
+            # otherwise the task carries on where it is in a new segment
+            for cpu, this_task in enumerate(self.slots):
+                if this_task is not None and self.slices[cpu] >= self.quantum:
+                    if len(self.ready):
+                        self.admit(self.stop(cpu, clk, PREEMPTED))
+                    else:
+                        self.report(this_task, cpu, clk, PREEMPTED)
+                        self.since[cpu] = clk
+                        self.slices[cpu] = 0
+        if self.preemptive:
+            running = [this_task for this_task in self.slots if this_task is not None]
+            best = nsmallest(len(self.slots), running + list(self.ready.values()), key=rank)
+            keep = set(id(this_task) for this_task in best)
+            for cpu, this_task in enumerate(self.slots):
+                if this_task is not None and id(this_task) not in keep:
+                    self.admit(self.stop(cpu, clk, PREEMPTED))
+            waiting = [this_task for this_task in best if id(this_task) in self.ready]
+        elif self.algorithm == "EDUI":
+            self.dispatch_edui(clk, rank)
+            return
+        else:
+            free = self.slots.count(None)
+            waiting = nsmallest(free, self.ready.values(), key=rank) if free else list()
+        for cpu in range(len(self.slots)):
+            if waiting and self.slots[cpu] is None:
+                self.start(cpu, waiting.pop(0), clk)
+
+    def dispatch_edui(self, clk: int, rank: Callable[[Task], Any]) -> None:
+        # EDUI as on one processor: a processor that has just finished a
+        # task takes the earliest deadline straight away, as does one that
+        # has been idle with nothing to run for more than idle_allowed
+        # ticks; otherwise it only starts a task at its start deadline.
+        # Ticks with something waiting do not count as idle.
+        for cpu in range(len(self.slots)):
+            if self.slots[cpu] is not None:
+                continue
+            if not self.ready:
+                if self.empty[cpu] is None:
+                    self.empty[cpu] = clk + 1 if self.freed[cpu] == clk else clk
+                continue
+            if self.empty[cpu] is not None:
+                self.idle[cpu] += max(clk - self.empty[cpu], 0)
+                self.empty[cpu] = None
+            if self.freed[cpu] == clk or self.idle[cpu] > self.idle_allowed:
+                chosen = min(self.ready.values(), key=rank)
+            else:
+                if self.flipped != clk:
+                    self.sign = -self.sign
+                    self.flipped = clk
+                # the first of the ties once turned, so the last in rank
+                due = [this_task for this_task in self.ready.values() if this_task.start_dln == clk]
+                if not due:
+                    continue
+                chosen = max(due, key=rank)
+            self.idle[cpu] = 0
+            self.start(cpu, chosen, clk)
+        self.holding = clk if None in self.slots and self.ready else None
+
+    def events(self, clk: int) -> Iterable[Optional[int]]:
+        if self.upcoming is not None:
+            yield self.upcoming.arrival
+        for cpu, this_task in enumerate(self.slots):
+            if this_task is not None:
+                yield clk + this_task.remaining
+                if self.quantum is not None:
+                    yield clk + self.quantum - self.slices[cpu]
+        if self.realtime:
+            yield self.next_miss()
+        if self.algorithm == "EDUI" and len(self.ready):
+            for this_task in self.ready.values():
+                if this_task.start_dln > clk:
+                    yield this_task.start_dln
+        if self.end is not None:
+            yield self.end + 1
+
+    def advance(self, clk: int) -> int:
+        nxt = clk + 1
+        later = [when for when in self.events(clk) if when is not None]
+        if later:
+            nxt = max(min(later), clk + 1)
+        for cpu, this_task in enumerate(self.slots):
+            if this_task is not None:
+                this_task.service(nxt - clk)
+                self.slices[cpu] += nxt - clk
+        return nxt
+
+
+def weight(task: Task, periodic: bool) -> Fraction:
+    # share of a processor for periodic templates, plain work otherwise
+    if periodic:
+        if releasing(task):
+            return Fraction(max(task.estimated, 0), task.end_dln)
+        return Fraction(0)
+    return Fraction(max(task.estimated, 0))
+
+
+def partition(tasks: List[Task], cpus: int, placement: str, periodic: bool) -> List[List[Task]]:
+    # Bin packing in input order (arrival order for U/RA). Periodic bins
+    # hold a utilization of 1, others an even share of the total work;
+    # first-fit falls back to the emptiest bin when nothing fits.
+    bins = [list() for _ in range(cpus)]
+    loads = [Fraction(0)] * cpus
+    if periodic:
+        capacity = Fraction(1)
+    else:
+        capacity = sum((weight(this_task, False) for this_task in tasks), Fraction(0)) / cpus
+    for this_task in tasks:
+        share = weight(this_task, periodic)
+        cpu = loads.index(min(loads))
+        if placement == "first-fit":
+            for candidate in range(cpus):
+                if loads[candidate] + share <= capacity:
+                    cpu = candidate
+                    break
+        bins[cpu].append(this_task)
+        loads[cpu] += share
+    return bins
+
+
+def simulate_multi(algorithm: str,
+                   tasks: TaskTable,
+                   param: Optional[int],
+                   cpus: int,
+                   placement: str = "global",
+                   profile: bool = False) -> Result:
+    # param is the RR quantum, the EDUI idle allowance or the RP ending time;
+    # only global runs can be profiled, being a single simulator
+    periodic = algorithm in ("FP", "EDCD")
+    rows = tasks.fresh()
+    if placement == "global":
+        if periodic:
+            return run_simulator(GlobalSimulator(releases(rows, param), algorithm, cpus, end=param), profile)
+        return run_simulator(GlobalSimulator(rows, algorithm, cpus, param), profile)
+    if placement not in PLACEMENTS:
+        raise ValueError("unknown placement {}".format(placement))
+    if not periodic:
+        rows = sorted(rows, key=lambda x: x.arrival)
+    shared = periodic and len(set(this_task.name for this_task in rows)) < len(rows)
+    merged = Result(algorithm, SIMULATORS[algorithm].label, cpus)
+    for cpu, part in enumerate(partition(rows, cpus, placement, periodic)):
+        if not part:
+            continue
+        names = renumbering(rows, part, param) if shared else dict()
+        result = build(algorithm, part, param).run()
+        for segment in result.segments:
+            merged.add(names.get(segment.task, segment.task), segment.start, segment.stop, segment.kind, cpu)
+        merged.missed |= set(names.get(name, name) for name in result.missed)
+    return merged
@@ -0,0 +1,125 @@
+from typing import *
+from contextlib import contextmanager
+from functools import partial
+from heapq import heappush, heappop
+import gc
+from itertools import accumulate, repeat
+from operator import add, sub
+from .tasks import TaskTable
+from .results import Result, Segment, COMPLETED
+from . import FCFS, SPN
+
+# numpy only speeds up the FCFS arithmetic; without it the same sums and
+# running maxima are taken with itertools
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# policies that only decide at completions, so a run is one pass over the
+# arrivals rather than a tick loop
+NONPREEMPTIVE: Tuple[str, ...] = ("FCFS", "SPN")
+
+
+def eligible(algorithm: str, tasks: TaskTable) -> bool:
+    # The tick-driven SPN drops tasks arriving before 0 and lets zero
+    # length ones hold the processor for a tick, only if the run lasts
+    # that long; those sets go through the simulator classes instead.
+    if algorithm == "FCFS" or not len(tasks):
+        return True
+    return min(tasks.arrival) >= 0 and min(tasks.estimated) > 0
+
+
+def arrival_order(tasks: TaskTable) -> List[int]:
+    # row indexes by arrival, ties in input order, as Simulator sorts them
+    if tasks.ordered:
+        return list(range(len(tasks)))
+    if numpy is not None:
+        return numpy.argsort(numpy.frombuffer(tasks.arrival, dtype=numpy.int64), kind="stable").tolist()
+    return sorted(range(len(tasks)), key=tasks.arrival.__getitem__)
+
+
+def fcfs_times(arrival: Sequence[int], estimated: Sequence[int]) -> Tuple[List[int], List[int]]:
+    # (starts, completions) of tasks already in arrival order. Completion i
+    # is max(arrival i, completion i-1) + estimated i, which unrolls to the
+    # running total of service plus the running maximum of arrival i less
+    # the service before it, floored at the clock's start of 0.
+    if numpy is not None:
+        arrival = numpy.asarray(arrival, dtype=numpy.int64)
+        estimated = numpy.asarray(estimated, dtype=numpy.int64)
+        total = numpy.cumsum(estimated)
+        lead = numpy.maximum(numpy.maximum.accumulate(arrival - (total - estimated)), 0)
+        completion = total + lead
+        return (completion - estimated).tolist(), completion.tolist()
+    total = list(accumulate(estimated))
+    lead = accumulate(map(sub, arrival, map(sub, total, estimated)), max, initial=0)
+    next(lead)
+    completion = list(map(add, total, lead))
+    return list(map(sub, completion, estimated)), completion
+
+
+def spn_times(arrival: Sequence[int], estimated: Sequence[int]) -> Tuple[List[int], List[int], List[int]]:
+    # (positions, starts, completions) in the order tasks run, for tasks
+    # already in arrival order. Ties on the estimate go to the latest
+    # arrival, as in the ReadyQueue SPN pops from.
+    positions = list()
+    starts = list()
+    completions = list()
+    ready = list()
+    count = len(arrival)
+    upcoming = 0
+    clk = 0
+    while upcoming < count or ready:
+        if not ready:
+            clk = max(clk, arrival[upcoming])
+        while upcoming < count and arrival[upcoming] <= clk:
+            heappush(ready, (estimated[upcoming], -upcoming))
+            upcoming += 1
+        service, position = heappop(ready)
+        positions.append(-position)
+        starts.append(clk)
+        clk += service
+        completions.append(clk)
+    return positions, starts, completions
+
+
+@contextmanager
+def collector_paused() -> Iterator[None]:
+    # Millions of fresh tuples, none of them in a cycle, would otherwise
+    # set the cycle collector off over and over for nothing.
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def simulate_nonpreemptive(algorithm: str, tasks: TaskTable) -> Result:
+    # the same Result FCFS or SPN would give, for an eligible() table
+    with collector_paused():
+        return schedule(algorithm, tasks)
+
+
+def schedule(algorithm: str, tasks: TaskTable) -> Result:
+    order = arrival_order(tasks)
+    if tasks.ordered:
+        arrival, estimated = tasks.arrival, tasks.estimated
+    else:
+        arrival = [tasks.arrival[index] for index in order]
+        estimated = [tasks.estimated[index] for index in order]
+    if algorithm == "FCFS":
+        starts, completions = fcfs_times(arrival, estimated)
+    elif algorithm == "SPN":
+        positions, starts, completions = spn_times(arrival, estimated)
+        order = [order[position] for position in positions]
+    else:
+        raise ValueError("{} is not a non-preemptive policy".format(algorithm))
+    result = Result(algorithm, FCFS.label if algorithm == "FCFS" else SPN.label)
+    names = [tasks.names[index] for index in order]
+    # tuple.__new__ fills each Segment straight from its fields without a
+    # call into the Python level constructor per segment
+    fields = zip(names, starts, completions, repeat(COMPLETED), repeat(0))
+    result.segments = list(map(partial(tuple.__new__, Segment), fields))
+    return result
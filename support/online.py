@@ -0,0 +1,119 @@
+from typing import *
+from collections import deque
+import copy
+from .tasks import Task, RealtimeTask, TaskTable
+from .results import Result, COMPLETED
+from . import SUITES, Simulator, build
+
+# policies driven tick by tick; FCFS runs its own loop and cannot stop midway
+ONLINE: Tuple[str, ...] = ("RR", "SPN", "SRT", "HRRN", "ED", "EDUI", "RFCSC", "FP", "EDCD")
+
+
+class Feed:
+    # An iterator that can run dry and be topped up again: a simulator that
+    # reads it as a stream picks up later submissions on its next fetch.
+    def __init__(self):
+        self.queue: Deque[Task] = deque()
+
+    def __iter__(self) -> "Feed":
+        return self
+
+    def __next__(self) -> Task:
+        if not self.queue:
+            raise StopIteration
+        return self.queue.popleft()
+
+
+class OnlineSimulator:
+    # Drives one simulator from a live feed. Tasks are submitted as they
+    # become known and the clock is moved forward on demand, so each call
+    # costs only the events since the last one. Every tick before now has
+    # run, so a task may be submitted for now or later but not earlier.
+    # For FP and EDCD submissions are templates, releasing from the first
+    # release due at or after now until the run is dropped.
+    def __init__(self, algorithm: str, param: Optional[int] = None):
+        if algorithm not in ONLINE:
+            raise ValueError("{} cannot be run online".format(algorithm))
+        self.algorithm: str = algorithm
+        self.periodic: bool = algorithm in SUITES["RP"]
+        self.kind: str = [kind for kind, algorithms in SUITES.items() if algorithm in algorithms][0]
+        self.table: TaskTable = TaskTable(Task if self.kind == "U" else RealtimeTask)
+        self.feed: Feed = Feed()
+        # param is the RR quantum or the EDUI idle allowance
+        if self.periodic:
+            self.simulator: Simulator = build(algorithm, list(), None)
+        else:
+            self.simulator: Simulator = build(algorithm, self.feed, param)
+        self.now: int = 0
+        self.latest: Optional[int] = None
+
+    @property
+    def result(self) -> Result:
+        # segments reported so far
+        return self.simulator.result
+
+    @property
+    def running(self) -> Optional[Task]:
+        # the task that held the processor for the tick before now
+        return self.simulator.running
+
+    def submit(self, name: str, arrival: int, estimated: int, deadline: Optional[int] = None) -> Task:
+        # deadline as in a task file row: the starting deadline for RA
+        # policies, the period for RP ones
+        if self.periodic:
+            index = self.table.append(name, arrival, estimated, end_dln=deadline)
+            template = self.table.view(index)
+            self.simulator.adopt(template, self.now)
+            return template
+        if arrival < self.now:
+            raise ValueError("{} arrives at {} but the clock is already at {}".format(name, arrival, self.now))
+        if self.latest is not None and arrival < self.latest:
+            raise ValueError("{} arrives before a task already submitted, submit in arrival order".format(name))
+        if self.kind == "RA":
+            index = self.table.append(name, arrival, estimated, start_dln=deadline)
+        else:
+            index = self.table.append(name, arrival, estimated)
+        this_task = self.table.view(index)
+        self.latest = arrival
+        self.feed.queue.append(this_task)
+        if self.simulator.upcoming is None:
+            self.simulator.fetch()
+        return this_task
+
+    def advance_to(self, clk: int) -> None:
+        # run every tick before clk
+        self.simulator.horizon = clk
+        # the horizon stops event skipping at clk, so the run lands on it
+        self.simulator.run(self.now, until=clk)
+        self.now = max(self.now, clk)
+
+    def step(self) -> int:
+        # run up to the next instant something happens; later submissions
+        # may not arrive before it
+        self.simulator.horizon = None
+        self.simulator.tick(self.now)
+        self.now = self.simulator.advance(self.now)
+        return self.now
+
+    def ready(self) -> List[Task]:
+        # queued tasks, the one dispatched next first
+        return self.simulator.waiting(self.now)
+
+    def projection(self) -> Dict[str, Optional[int]]:
+        # When each unfinished job (and task submitted ahead of its arrival)
+        # would complete if nothing more were submitted, None for those that
+        # would miss. Runs a copy of the live state; the history in the
+        # result is left out of the copy.
+        result = self.simulator.result
+        clone = copy.deepcopy(self.simulator, {id(result): Result(result.algorithm, result.label)})
+        clone.horizon = None
+        if self.periodic:
+            clone.releases.clear()
+        clone.run(self.now)
+        completions = dict()
+        for segment in clone.result.segments:
+            if segment.kind == COMPLETED:
+                completions[segment.task] = segment.stop
+        for name in clone.result.missed:
+            completions[name] = None
+        return completions
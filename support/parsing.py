@@ -0,0 +1,74 @@
+from typing import *
+from .tasks import Task, RealtimeTask, TaskTable
+
+
+class Header(NamedTuple):
+    kind: str
+    processes: int
+    # RR quantum for U files, ending time for RP files
+    param: Optional[int]
+
+
+def parse_header(line: str) -> Header:
+    tokens = [token.strip() for token in line.rstrip("\n").split(",")]
+    type_schedule = tokens[0]
+    number_of_processes = int(tokens[1])
+    if type_schedule == "U":
+        return Header("U", number_of_processes, int(tokens[2]))
+    elif type_schedule == "RA":
+        return Header("RA", number_of_processes, None)
+    else:  # RP
+        return Header("RP", number_of_processes, int(tokens[2]))
+
+
+def parse_rows(lines: Iterable[str], kind: str) -> Iterator[Tuple[str, int, int, Optional[int]]]:
+    # (name, arrival, service time, deadline) per task line; the deadline is
+    # the starting one for RA files, the ending one (period) for RP files
+    for line in lines:
+        tokens = [token.strip() for token in line.rstrip("\n").split(",")]
+        if not tokens[0]:
+            continue
+        deadline = int(tokens[3]) if kind != "U" else None
+        yield tokens[0], int(tokens[1]), int(tokens[2]), deadline
+
+
+def make_task(kind: str, row: Tuple[str, int, int, Optional[int]]) -> Task:
+    name, arrival, service_time, deadline = row
+    if kind == "U":
+        return Task(name, arrival, service_time)
+    elif kind == "RA":
+        return RealtimeTask(name, arrival, service_time, start_dln=deadline)
+    else:
+        return RealtimeTask(name, arrival, service_time, end_dln=deadline)
+
+
+def tabulate(kind: str, rows: Iterable[Tuple[str, int, int, Optional[int]]]) -> TaskTable:
+    tasks = TaskTable(Task if kind == "U" else RealtimeTask)
+    for name, arrival, service_time, deadline in rows:
+        if kind == "RA":
+            tasks.append(name, arrival, service_time, start_dln=deadline)
+        elif kind == "RP":
+            tasks.append(name, arrival, service_time, end_dln=deadline)
+        else:
+            tasks.append(name, arrival, service_time)
+    return tasks
+
+
+def load_tasks(filepath: str) -> Tuple[Header, TaskTable]:
+    with open(filepath, "r") as f:
+        header = parse_header(f.readline())
+        return header, tabulate(header.kind, parse_rows(f, header.kind))
+
+
+def stream_header(filepath: str) -> Header:
+    with open(filepath, "r") as f:
+        return parse_header(f.readline())
+
+
+def stream_tasks(filepath: str) -> Iterator[Task]:
+    # one task at a time straight off the file; simulators fed this way
+    # expect the rows in arrival order
+    with open(filepath, "r") as f:
+        header = parse_header(f.readline())
+        for row in parse_rows(f, header.kind):
+            yield make_task(header.kind, row)
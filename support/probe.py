@@ -0,0 +1,162 @@
+from typing import *
+from collections import Counter
+from time import perf_counter
+from .queues import ReadyQueue
+from .results import Result, Segment, Switches, COMPLETED, PREEMPTED
+
+PHASES: Tuple[str, ...] = ("admission", "miss check", "selection", "service", "events")
+
+
+class CountingList(list):
+    # stands in for a list ready queue so its sorts can be counted
+    def __init__(self, items: Iterable[Any], probe: "Probe"):
+        super(CountingList, self).__init__(items)
+        self.probe: "Probe" = probe
+
+    def sort(self, *args, **kwargs) -> None:
+        self.probe.sorts += 1
+        super(CountingList, self).sort(*args, **kwargs)
+
+
+class Probe:
+    # Counters for one simulator run. attach() swaps timed wrappers in for
+    # the simulator's own methods on that instance only, so a simulator
+    # that was never attached runs exactly the code it always did.
+    def __init__(self):
+        self.ticks: int = 0
+        self.skipped: int = 0
+        self.sorts: int = 0
+        self.switches: Switches = Switches()
+        self.preemptions: int = 0
+        self.completions: int = 0
+        self.misses: int = 0
+        # ready queue length at each tick, bucketed by powers of two
+        self.ready_lengths: Counter = Counter()
+        self.seconds: Dict[str, float] = dict((phase, 0.0) for phase in PHASES)
+        self.ticking: float = 0.0
+        self.total: float = 0.0
+
+    def timed(self, phase: str, method: Callable) -> Callable:
+        seconds = self.seconds
+
+        def wrapper(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                seconds[phase] += perf_counter() - start
+        return wrapper
+
+    def attach(self, simulator: Any) -> None:
+        run = simulator.run
+        tick = simulator.tick
+        skip = simulator.skip
+        advance = simulator.advance
+        arrived = simulator.arrived
+
+        def timed_tick(clk: int) -> None:
+            self.ticks += 1
+            ready = getattr(simulator, "ready", None)
+            size = len(ready) if ready is not None else 0
+            self.ready_lengths[size.bit_length()] += 1
+            start = perf_counter()
+            tick(clk)
+            self.ticking += perf_counter() - start
+
+        def timed_skip(ticks: int) -> None:
+            self.skipped += ticks
+            start = perf_counter()
+            skip(ticks)
+            self.seconds["service"] += perf_counter() - start
+
+        def timed_advance(clk: int) -> int:
+            start = perf_counter()
+            service = self.seconds["service"]
+            nxt = advance(clk)
+            # skip() inside advance() is service, the rest is finding events
+            self.seconds["events"] += perf_counter() - start - (self.seconds["service"] - service)
+            return nxt
+
+        def timed_arrived(clk: int) -> Iterator[Any]:
+            # drained up front so the time spent admitting is measured here
+            start = perf_counter()
+            tasks = list(arrived(clk))
+            self.seconds["admission"] += perf_counter() - start
+            return iter(tasks)
+
+        def timed_run(*args, **kwargs) -> Result:
+            start = perf_counter()
+            result = run(*args, **kwargs)
+            self.total += perf_counter() - start
+            return result
+
+        simulator.run = timed_run
+        simulator.tick = timed_tick
+        simulator.skip = timed_skip
+        simulator.advance = timed_advance
+        simulator.arrived = timed_arrived
+        if hasattr(simulator, "spawn"):
+            simulator.spawn = self.timed("admission", simulator.spawn)
+        if hasattr(simulator, "expire"):
+            simulator.expire = self.timed("miss check", simulator.expire)
+        ready = getattr(simulator, "ready", None)
+        if isinstance(ready, ReadyQueue):
+            settle = ready.settle
+
+            def counted_settle() -> None:
+                self.sorts += 1
+                settle()
+            ready.settle = counted_settle
+        elif isinstance(ready, list):
+            simulator.ready = CountingList(ready, self)
+
+    def tally(self, segments: List[Segment]) -> None:
+        self.switches.add(segments)
+        for segment in segments:
+            if segment.kind == PREEMPTED:
+                self.preemptions += 1
+            elif segment.kind == COMPLETED:
+                self.completions += 1
+
+    def watch(self, sink: Callable[[int, List[Segment]], None]) -> Callable[[int, List[Segment]], None]:
+        # the sink of a run, tallying the segments on their way through
+        def watched(clk: int, segments: List[Segment]) -> None:
+            self.tally(segments)
+            sink(clk, segments)
+        return watched
+
+    def report(self, result: Result) -> dict:
+        # segments a sink took were tallied as they went by
+        self.tally(result.segments)
+        self.misses = len(result.missed)
+        seconds = dict(self.seconds)
+        # whatever a tick spent outside admission and miss checks
+        seconds["selection"] = max(self.ticking - seconds["admission"] - seconds["miss check"], 0.0)
+        seconds["total"] = self.total
+        histogram = dict()
+        for bucket in sorted(self.ready_lengths):
+            low = 0 if bucket == 0 else 1 << (bucket - 1)
+            high = 0 if bucket == 0 else (1 << bucket) - 1
+            histogram["{}-{}".format(low, high) if low != high else str(low)] = self.ready_lengths[bucket]
+        return {
+            "ticks": self.ticks,
+            "skipped": self.skipped,
+            "sorts": self.sorts,
+            "context switches": self.switches.count,
+            "preemptions": self.preemptions,
+            "misses": self.misses,
+            "ready lengths": histogram,
+            "seconds": seconds,
+        }
+
+
+def render_profile(result: Result) -> str:
+    profile = result.profile
+    lines = ["{} profile:".format(result.algorithm)]
+    for name in ("ticks", "skipped", "sorts", "context switches", "preemptions", "misses"):
+        lines.append("  {}: {}".format(name, profile[name]))
+    lines.append("  ready lengths: " + " ".join("{}:{}".format(length, count)
+                                               for length, count in profile["ready lengths"].items()))
+    for phase in PHASES + ("total",):
+        lines.append("  {} seconds: {:.6f}".format(phase, profile["seconds"][phase]))
+    return "\n".join(lines)
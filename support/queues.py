@@ -0,0 +1,178 @@
+from typing import *
+from heapq import heappush, heappop, heapify
+
+
+class ReadyQueue:
+    # Stands in for a ready list that is appended to, sorted on a key with
+    # reverse=True and popped from the end. Settled entries live in a binary
+    # heap ordered on (key, -seq) so that equal keys come out newest first,
+    # the same way a stable reverse sort leaves them at the end of the list.
+    # Entries pushed since the last settle() sit in an unsorted tail, just
+    # like appends made after the last sort.
+    def __init__(self, key: Callable[[Any], Any]):
+        self.key: Callable[[Any], Any] = key
+        self.heap: List[list] = list()
+        self.tail: List[list] = list()
+        self.entries: Dict[int, list] = dict()
+        self.stale: Dict[int, list] = dict()
+        self.seq: int = 0
+        self.low: int = 0
+        self.dead: int = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def clear(self) -> None:
+        self.heap.clear()
+        self.tail.clear()
+        self.entries.clear()
+        self.stale.clear()
+        self.dead = 0
+
+    def __setstate__(self, state: dict) -> None:
+        # entries are looked up by id(task), which a copy or an unpickled
+        # queue has to redo
+        self.__dict__.update(state)
+        self.entries = dict((id(entry[2]), entry) for entry in self.entries.values())
+        self.stale = dict((id(entry[2]), entry) for entry in self.stale.values())
+
+    def __iter__(self) -> Iterator[Any]:
+        for entry in list(self.entries.values()):
+            yield entry[2]
+
+    def __contains__(self, task: Any) -> bool:
+        return id(task) in self.entries
+
+    def push(self, task: Any) -> None:
+        self.seq += 1
+        entry = [self.key(task), -self.seq, task]
+        self.entries[id(task)] = entry
+        self.tail.append(entry)
+
+    def update(self, task: Any) -> None:
+        # decrease-key (or any re-key): the new key is picked up by settle()
+        if id(task) in self.entries:
+            self.stale[id(task)] = self.entries[id(task)]
+
+    def remove(self, task: Any) -> None:
+        entry = self.entries.pop(id(task))
+        self.stale.pop(id(task), None)
+        if self.tail and entry is self.tail[-1]:
+            self.tail.pop()
+        elif self._in_tail(entry):
+            self.tail = [other for other in self.tail if other is not entry]
+        else:
+            entry[2] = None
+            self.dead += 1
+
+    def settle(self) -> None:
+        # A stable sort keeps the old relative order of entries that end up
+        # tied, so a re-keyed entry is reseated in front of (key dropped) or
+        # behind (key rose) everything it now ties with.
+        moved = list()
+        for entry in self.stale.values():
+            key = self.key(entry[2])
+            if key != entry[0] and not self._in_tail(entry):
+                moved.append((entry, key))
+        self.stale.clear()
+        moved.sort(key=lambda pair: (pair[0][0], pair[0][1]))
+        for entry, key in moved:
+            if key < entry[0]:
+                self.low -= 1
+                seq = self.low
+            else:
+                continue
+            self._reseat(entry, key, seq)
+        for entry, key in reversed(moved):
+            if key > entry[0]:
+                self.seq += 1
+                self._reseat(entry, key, self.seq)
+        for entry in self.tail:
+            self.seq += 1
+            entry[0] = self.key(entry[2])
+            entry[1] = -self.seq
+            heappush(self.heap, entry)
+        self.tail.clear()
+        if self.dead > len(self.entries):
+            self.heap = [entry for entry in self.heap if entry[2] is not None]
+            heapify(self.heap)
+            self.dead = 0
+
+    def _reseat(self, entry: list, key: Any, seq: int) -> None:
+        fresh = [key, -seq, entry[2]]
+        entry[2] = None
+        self.dead += 1
+        self.entries[id(fresh[2])] = fresh
+        heappush(self.heap, fresh)
+
+    def _in_tail(self, entry: list) -> bool:
+        for other in self.tail:
+            if other is entry:
+                return True
+        return False
+
+    def _prune(self) -> None:
+        while self.heap and self.heap[0][2] is None:
+            heappop(self.heap)
+            self.dead -= 1
+
+    def peek(self) -> Any:
+        if self.tail:
+            return self.tail[-1][2]
+        self._prune()
+        return self.heap[0][2]
+
+    def pop(self) -> Any:
+        if self.tail:
+            entry = self.tail.pop()
+        else:
+            self._prune()
+            entry = heappop(self.heap)
+        del self.entries[id(entry[2])]
+        self.stale.pop(id(entry[2]), None)
+        return entry[2]
+
+    def least(self) -> Any:
+        # smallest key in the queue, counting entries not yet settled
+        self._prune()
+        keys = [self.key(entry[2]) for entry in self.tail]
+        if self.heap:
+            keys.append(self.heap[0][0])
+        return min(keys)
+
+    def leads(self, task: Any) -> bool:
+        # would task come out first if the queue were settled right now?
+        # No whenever that cannot be told without settling
+        if self.tail or len(self.stale) > (id(task) in self.stale):
+            return False
+        head = self.peek()
+        mine = self.entries[id(task)]
+        key = self.key(task)
+        if head is task:
+            # a rise may have let the runner-up past it
+            return key <= mine[0]
+        theirs = self.entries[id(head)]
+        if key != theirs[0] or key == mine[0]:
+            return (key, mine[1]) < (theirs[0], theirs[1])
+        # tied after a re-key: it goes in front on a drop, behind on a rise
+        return key > mine[0]
+
+    def arrange(self, tasks: Iterable[Any]) -> List[Any]:
+        # some queued tasks, in the order listing() would give them
+        settled = list()
+        queued = list()
+        for task in tasks:
+            entry = self.entries[id(task)]
+            if self._in_tail(entry):
+                queued.append(entry)
+            else:
+                settled.append(entry)
+        settled.sort(reverse=True)
+        order = dict((id(entry), index) for index, entry in enumerate(self.tail)) if queued else dict()
+        queued.sort(key=lambda entry: order[id(entry)])
+        return [entry[2] for entry in settled] + [entry[2] for entry in queued]
+
+    def listing(self) -> List[Any]:
+        # the equivalent ready list, front to back
+        settled = sorted((entry for entry in self.heap if entry[2] is not None), reverse=True)
+        return [entry[2] for entry in settled] + [entry[2] for entry in self.tail]
@@ -0,0 +1,90 @@
+from typing import *
+
+# segment kinds
+COMPLETED: str = "completed"
+PREEMPTED: str = "preempted"
+MISSED: str = "missed"
+
+
+class Segment(NamedTuple):
+    task: str
+    start: Optional[int]
+    stop: Optional[int]
+    kind: str
+    # processor it ran on; None for a miss no processor was involved in
+    cpu: Optional[int] = 0
+
+
+class Result:
+    # What one simulator run produced: its segments in the order they were
+    # reported (a missed task is reported with the segment that follows its
+    # miss) and every task that missed, reported or not.
+    def __init__(self, algorithm: str, label: str, cpus: int = 1):
+        self.algorithm: str = algorithm
+        self.label: str = label
+        self.cpus: int = cpus
+        self.segments: List[Segment] = list()
+        self.missed: Set[str] = set()
+        # counters from a profiled run, see probe.Probe.report()
+        self.profile: Optional[dict] = None
+
+    def add(self,
+            task: str,
+            start: Optional[int],
+            stop: Optional[int],
+            kind: str,
+            cpu: Optional[int] = 0) -> None:
+        self.segments.append(Segment(task, start, stop, kind, cpu))
+
+    def miss(self, task: str, cpu: Optional[int] = 0) -> None:
+        self.segments.append(Segment(task, None, None, MISSED, cpu))
+
+
+class Switches:
+    # Context switches in a schedule, fed its segments a batch at a time: a
+    # processor starting a task other than the last one it ran. The first
+    # task on a processor and a task resumed after a gap are not switches.
+    def __init__(self):
+        self.count: int = 0
+        self.last: Dict[Optional[int], str] = dict()
+
+    def add(self, segments: Iterable[Segment]) -> None:
+        last = self.last
+        for segment in segments:
+            if segment.kind == MISSED:
+                continue
+            previous = last.get(segment.cpu)
+            if previous is not None and previous != segment.task:
+                self.count += 1
+            last[segment.cpu] = segment.task
+
+
+def render_segment(segment: Segment) -> str:
+    if segment.kind == MISSED:
+        return "{}:Missed".format(segment.task)
+    return "{}:{}->{}".format(segment.task, segment.start, segment.stop)
+
+
+def render(result: Result) -> str:
+    lines = [result.label]
+    if result.cpus == 1:
+        lines.extend(render_segment(segment) for segment in result.segments)
+        return "\n".join(lines)
+    # one block per processor, then misses that happened off every processor
+    for cpu in range(result.cpus):
+        lines.append("CPU{}:".format(cpu))
+        lines.extend(render_segment(segment) for segment in result.segments if segment.cpu == cpu)
+    lines.extend(render_segment(segment) for segment in result.segments if segment.cpu is None)
+    return "\n".join(lines)
+
+
+def render_table(rows: Sequence[Sequence[str]], left: int = 0) -> str:
+    # rows of cells, the heading first, in columns as wide as their widest
+    # cell; the first left columns are flush left, the rest flush right
+    widths = [max(len(row[column]) for row in rows) for column in range(len(rows[0]))]
+    lines = list()
+    for row in rows:
+        cells = [cell.ljust(width) for cell, width in zip(row[:left], widths)]
+        cells += [cell.rjust(width) for cell, width in zip(row[left:], widths[left:])]
+        lines.append("  ".join(cells))
+    return "\n".join(lines)
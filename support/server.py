@@ -0,0 +1,156 @@
+from typing import *
+from concurrent.futures import ProcessPoolExecutor
+import asyncio
+import json
+import os
+import signal
+import stat
+from .parsing import tabulate
+from .cache import dump_result
+from .metrics import job_set, measure, metrics_entry
+
+# One JSON object per line each way. A request looks like
+#   {"id": 7, "kind": "U", "param": 4, "tasks": [["A", 0, 3], ["B", 2, 6]]}
+# with rows shaped as in the task files (RA rows add the starting deadline,
+# RP rows the period) and param the RR quantum, EDUI idle allowance or RP
+# ending time. Optional: "algorithms" (default the kind's whole suite),
+# "cpus", "placement" and "metrics": true. The reply carries the same id
+# and either "results", one per algorithm in order, or "error".
+
+# longest request line accepted
+LIMIT: int = 64 << 20
+
+
+def parse_request(request: dict) -> Tuple[str, Optional[int], list]:
+    from . import SUITES
+    kind = request.get("kind")
+    if kind not in SUITES:
+        raise ValueError("unknown kind {!r}".format(kind))
+    param = request.get("param")
+    if param is not None:
+        param = int(param)
+    elif kind in ("U", "RP"):
+        raise ValueError("{} task sets need a param".format(kind))
+    rows = list()
+    for row in request.get("tasks", ()):
+        deadline = int(row[3]) if kind != "U" else None
+        rows.append((str(row[0]), int(row[1]), int(row[2]), deadline))
+    return kind, param, rows
+
+
+def simulate_request(request: dict) -> dict:
+    from . import SUITES, simulate, simulate_multi
+    kind, param, rows = parse_request(request)
+    tasks = tabulate(kind, rows)
+    algorithms = request.get("algorithms") or SUITES[kind]
+    cpus = int(request.get("cpus", 1))
+    placement = request.get("placement", "global")
+    jobs = job_set(kind, tasks.replay(), param) if request.get("metrics") else None
+    results = list()
+    for algorithm in algorithms:
+        if algorithm not in SUITES[kind]:
+            raise ValueError("{} does not schedule {} task sets".format(algorithm, kind))
+        if cpus > 1:
+            result = simulate_multi(algorithm, tasks, param, cpus, placement)
+        else:
+            result = simulate(algorithm, tasks, param)
+        entry = dump_result(result)
+        if jobs is not None:
+            entry["metrics"] = metrics_entry(measure(result, jobs))
+        results.append(entry)
+    return {"results": results}
+
+
+def answer(line: bytes) -> bytes:
+    # runs in a worker: the request goes in and the reply comes out as
+    # bytes, so the event loop only ever moves lines around
+    ident = None
+    try:
+        request = json.loads(line)
+        if not isinstance(request, dict):
+            raise ValueError("a request is a JSON object")
+        ident = request.get("id")
+        reply = simulate_request(request)
+    except Exception as error:
+        # anything a task set can make a simulator raise goes back to the
+        # client rather than losing the reply
+        reply = {"error": str(error) or type(error).__name__}
+    reply["id"] = ident
+    return json.dumps(reply, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+class SimulationServer:
+    # Requests from every connection share pending slots. A connection
+    # waits for a free slot before it reads past its current line, so once
+    # the workers fall behind clients see the socket fill up instead of the
+    # server queueing without bound. Replies go out as they are ready,
+    # tagged with the request's id.
+    def __init__(self, path: str, jobs: int = 0, pending: Optional[int] = None):
+        self.path: str = path
+        self.pool: ProcessPoolExecutor = ProcessPoolExecutor(jobs if jobs > 0 else None)
+        workers = jobs if jobs > 0 else os.cpu_count() or 1
+        self.slots: asyncio.Semaphore = asyncio.Semaphore(pending if pending else 2 * workers)
+        self.server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> None:
+        if os.path.exists(self.path) and stat.S_ISSOCK(os.stat(self.path).st_mode):
+            os.unlink(self.path)
+        self.server = await asyncio.start_unix_server(self.handle, self.path, limit=LIMIT)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        lock = asyncio.Lock()
+        replies = set()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, ConnectionError):
+                    # a line over LIMIT, or the client went away
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                # the next line is not read until this one has a slot
+                await self.slots.acquire()
+                reply = asyncio.ensure_future(self.reply(line, writer, lock))
+                replies.add(reply)
+                reply.add_done_callback(replies.discard)
+            if replies:
+                await asyncio.gather(*replies)
+        finally:
+            writer.close()
+
+    async def reply(self, line: bytes, writer: asyncio.StreamWriter, lock: asyncio.Lock) -> None:
+        try:
+            data = await asyncio.get_event_loop().run_in_executor(self.pool, answer, line)
+            async with lock:
+                writer.write(data)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.slots.release()
+
+    def close(self) -> None:
+        if self.server is not None:
+            self.server.close()
+        self.pool.shutdown()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+def serve(path: str, jobs: int = 0, pending: Optional[int] = None) -> None:
+    # until SIGINT or SIGTERM
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    server = SimulationServer(path, jobs, pending)
+    stopped = asyncio.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stopped.set)
+    try:
+        loop.run_until_complete(server.start())
+        loop.run_until_complete(stopped.wait())
+    finally:
+        server.close()
+        loop.close()
@@ -0,0 +1,76 @@
+from typing import *
+from concurrent.futures import ProcessPoolExecutor
+from .tasks import TaskTable
+from .results import Result, Switches, COMPLETED, render_table
+
+# the knob each sweepable algorithm exposes through build()'s param
+KNOBS: Dict[str, str] = {"RR": "quantum", "EDUI": "idle_allowed"}
+
+# task tables a worker was handed once at start-up, by file path
+shared: Dict[str, TaskTable] = dict()
+
+
+class Summary(NamedTuple):
+    filepath: str
+    algorithm: str
+    param: int
+    mean_turnaround: Optional[float]
+    misses: int
+    context_switches: int
+
+
+def parse_range(text: str) -> List[int]:
+    # "8", "1,2,4" or an inclusive "1..64"
+    values = list()
+    for part in text.split(","):
+        if ".." in part:
+            low, high = part.split("..", 1)
+            values.extend(range(int(low), int(high) + 1))
+        else:
+            values.append(int(part))
+    return values
+
+
+def summarize(filepath: str, param: int, result: Result, tasks: TaskTable) -> Summary:
+    arrivals = dict()
+    for index in range(len(tasks)):
+        arrivals.setdefault(tasks.names[index], tasks.arrival[index])
+    turnarounds = list()
+    for segment in result.segments:
+        if segment.kind == COMPLETED and segment.task in arrivals:
+            turnarounds.append(segment.stop - arrivals[segment.task])
+    switches = Switches()
+    switches.add(result.segments)
+    mean = sum(turnarounds) / len(turnarounds) if turnarounds else None
+    return Summary(filepath, result.algorithm, param, mean, len(result.missed), switches.count)
+
+
+def share(tables: Dict[str, TaskTable]) -> None:
+    shared.update(tables)
+
+
+def run_config(filepath: str, algorithm: str, param: int) -> Summary:
+    from . import simulate
+    tasks = shared[filepath]
+    return summarize(filepath, param, simulate(algorithm, tasks, param), tasks)
+
+
+def sweep(tables: Dict[str, TaskTable],
+          configs: List[Tuple[str, str, int]],
+          jobs: int = 1) -> List[Summary]:
+    # configs are (filepath, algorithm, param); the tables go to each worker
+    # once instead of being pickled with every configuration
+    if jobs == 1:
+        share(tables)
+        return [run_config(*config) for config in configs]
+    with ProcessPoolExecutor(jobs if jobs > 0 else None, initializer=share, initargs=(tables,)) as pool:
+        return list(pool.map(run_config, *zip(*configs))) if configs else list()
+
+
+def format_table(summaries: List[Summary]) -> str:
+    rows = [("file", "algorithm", "param", "mean turnaround", "misses", "context switches")]
+    for summary in summaries:
+        mean = "-" if summary.mean_turnaround is None else "{:.2f}".format(summary.mean_turnaround)
+        rows.append((summary.filepath, summary.algorithm, str(summary.param), mean,
+                     str(summary.misses), str(summary.context_switches)))
+    return render_table(rows, left=2)
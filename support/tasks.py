@@ -0,0 +1,320 @@
+from typing import *
+from array import array
+import copy
+from heapq import heapify, heappush, heappop
+from operator import attrgetter
+
+# stands in for None in the integer columns
+NONE: int = -(1 << 63)
+
+
+def column(name: str, optional: bool = False) -> property:
+    cells = attrgetter(name)
+    if optional:
+        def get(self):
+            value = cells(self.table)[self.index]
+            return None if value == NONE else value
+
+        def put(self, value):
+            cells(self.table)[self.index] = NONE if value is None else value
+    else:
+        def get(self):
+            return cells(self.table)[self.index]
+
+        def put(self, value):
+            cells(self.table)[self.index] = value
+    return property(get, put)
+
+
+class TaskTable:
+    # Tasks stored column-wise. The fixed columns come from the input file,
+    # the rest is simulator state that reset() puts back between runs, so
+    # one table can be handed to every algorithm without copying it.
+    def __init__(self, kind: Optional[type] = None):
+        self.kind: type = kind if kind is not None else Task
+        self.names: List[str] = list()
+        self.arrival: array = array("q")
+        self.estimated: array = array("q")
+        self.priority: array = array("q")
+        self.start_dln: array = array("q")
+        self.end_dln: array = array("q")
+        self.remaining: array = array("q")
+        self.started: array = array("q")
+        self.stopped: array = array("q")
+        self.completed: array = array("q")
+        self.serviced: array = array("q")
+        self.waited: array = array("q")
+        self.missed: array = array("b")
+        # rows already sorted by arrival can be replayed as a stream
+        self.ordered: bool = False
+        self.views: List[Task] = list()
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def append(self,
+               name: str,
+               arrival: int,
+               estimated: int,
+               priority: int = 0,
+               start_dln: Optional[int] = None,
+               end_dln: Optional[int] = None) -> int:
+        self.names.append(name)
+        self.arrival.append(arrival)
+        self.estimated.append(estimated)
+        self.priority.append(priority)
+        self.start_dln.append(NONE if start_dln is None else start_dln)
+        self.end_dln.append(NONE if end_dln is None else end_dln)
+        self.remaining.append(estimated)
+        self.started.append(NONE)
+        self.stopped.append(NONE)
+        self.completed.append(NONE)
+        self.serviced.append(NONE)
+        self.waited.append(0)
+        self.missed.append(0)
+        return len(self.names) - 1
+
+    def view(self, index: int) -> "Task":
+        view = object.__new__(self.kind)
+        view.table = self
+        view.index = index
+        return view
+
+    def __getstate__(self) -> dict:
+        # views are cheap to rebuild and would only bloat the pickle
+        state = dict(self.__dict__)
+        del state["views"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.views = list()
+
+    def __deepcopy__(self, memo: dict) -> "TaskTable":
+        # column by column rather than cell by cell; views are rebuilt on
+        # demand as after unpickling, those held elsewhere are copied there
+        twin = copy.copy(self)
+        memo[id(self)] = twin
+        for name, value in vars(self).items():
+            if isinstance(value, (array, list)):
+                setattr(twin, name, value[:])
+        twin.views = list()
+        return twin
+
+    def task(self, index: int) -> "Task":
+        while len(self.views) <= index:
+            self.views.append(self.view(len(self.views)))
+        return self.views[index]
+
+    def reset(self) -> None:
+        size = len(self.names)
+        self.remaining = array("q", self.estimated)
+        self.started = array("q", [NONE]) * size
+        self.stopped = array("q", [NONE]) * size
+        self.completed = array("q", [NONE]) * size
+        self.serviced = array("q", [NONE]) * size
+        self.waited = array("q", [0]) * size
+        self.missed = array("b", [0]) * size
+
+    def fresh(self) -> List["Task"]:
+        # reset state and hand out the row views for another simulator run
+        self.reset()
+        if len(self.names):
+            self.task(len(self.names) - 1)
+        return list(self.views)
+
+    def replay(self) -> Iterator["Task"]:
+        # like fresh() but one row at a time, for tables kept in arrival
+        # order; views are made on the way and not kept
+        self.reset()
+        if len(self.views) == len(self.names):
+            yield from self.views
+        else:
+            for index in range(len(self.names)):
+                yield self.view(index)
+
+
+class Task:
+    # A row of a TaskTable. Tasks made on their own, outside any table, are
+    # TaskRecords instead, which keep their fields in plain slots.
+    __slots__ = ("table", "index")
+
+    def __new__(cls, *args, **kwargs):
+        # no arguments when copy and pickle remake a view
+        if args or kwargs:
+            cls = RECORDS.get(cls, cls)
+        return object.__new__(cls)
+
+    def __init__(self, name: str, arrival: int, estimated: int, priority: int = 0):
+        self.name: str = name
+        self.arrival: int = arrival
+        self.estimated: int = estimated
+        self.priority: int = priority
+        self.started: Optional[int] = None
+        self.stopped: Optional[int] = None
+        self.remaining: int = estimated
+        self.completed: Optional[int] = None
+        self.serviced: Optional[int] = None
+        self.waited: int = 0
+
+    name = property(lambda self: self.table.names[self.index],
+                    lambda self, value: self.table.names.__setitem__(self.index, value))
+    arrival = column("arrival")
+    estimated = column("estimated")
+    priority = column("priority")
+    started = column("started", optional=True)
+    stopped = column("stopped", optional=True)
+    remaining = column("remaining")
+    completed = column("completed", optional=True)
+    serviced = column("serviced", optional=True)
+    waited = column("waited")
+
+    def service(self, ticks: int):
+        self.table.remaining[self.index] -= ticks
+
+    def wait(self, ticks: int):
+        self.table.waited[self.index] += ticks
+
+    def is_done(self) -> bool:
+        return self.table.remaining[self.index] <= 0
+
+
+class RealtimeTask(Task):
+    __slots__ = ()
+
+    def __init__(self,
+                 name: str,
+                 arrival: int,
+                 estimated: int,
+                 start_dln: Optional[int] = None,
+                 end_dln: Optional[int] = None):
+        super(RealtimeTask, self).__init__(name, arrival, estimated)
+        self.start_dln: Optional[int] = start_dln
+        self.end_dln: Optional[int] = end_dln
+        self.missed: bool = False
+
+    start_dln = column("start_dln", optional=True)
+    end_dln = column("end_dln", optional=True)
+    missed = property(lambda self: bool(self.table.missed[self.index]),
+                      lambda self, value: self.table.missed.__setitem__(self.index, value))
+
+    def miss_check(self, time: int) -> None:
+        if self.start_dln is not None:
+            if time > self.start_dln and self.started is None:
+                self.missed = True
+        if self.end_dln is not None:
+            if time >= self.end_dln and self.remaining:
+                self.missed = True
+
+    def is_done(self) -> bool:
+        return self.missed or super(RealtimeTask, self).is_done()
+
+    def miss_time(self) -> Optional[int]:
+        # first clock value at which miss_check() would flag this task
+        times = list()
+        if self.start_dln is not None and self.started is None:
+            times.append(self.start_dln + 1)
+        if self.end_dln is not None and self.remaining:
+            times.append(self.end_dln)
+        return min(times) if times else None
+
+
+def releasing(template: RealtimeTask) -> bool:
+    # an RP template releases whenever clk % period == arrival, so one whose
+    # offset is not below its period never does
+    return 0 <= template.arrival < template.end_dln
+
+
+def job_name(name: str, serial: int) -> str:
+    return "{}({})".format(name, serial)
+
+
+class Releases:
+    # The RP release calendar: (next release, template index) in a heap and
+    # the number of the next job per template name, so templates sharing a
+    # name share one numbering. Every RP job is released through here.
+    def __init__(self, templates: Iterable[RealtimeTask] = ()):
+        self.templates: List[RealtimeTask] = list()
+        self.serials: Dict[str, int] = dict()
+        self.calendar: List[Tuple[int, int]] = list()
+        for template in templates:
+            self.templates.append(template)
+            self.serials[template.name] = 1
+            if releasing(template):
+                self.calendar.append((template.arrival, len(self.templates) - 1))
+        heapify(self.calendar)
+
+    def add(self, template: RealtimeTask, clk: int) -> None:
+        # a template handed over at clk releases from its first release at
+        # or after clk on, its jobs numbered as if it had been there from
+        # the start
+        self.templates.append(template)
+        releases = 0
+        if releasing(template):
+            releases = max(0, -(-(clk - template.arrival) // template.end_dln))
+            heappush(self.calendar, (template.arrival + releases * template.end_dln, len(self.templates) - 1))
+        self.serials.setdefault(template.name, releases + 1)
+
+    def upcoming(self) -> Optional[int]:
+        return self.calendar[0][0] if self.calendar else None
+
+    def pop(self) -> Tuple[int, int, int]:
+        # (release, template index, job number) of the next job
+        release, index = heappop(self.calendar)
+        template = self.templates[index]
+        heappush(self.calendar, (release + template.end_dln, index))
+        serial = self.serials[template.name]
+        self.serials[template.name] = serial + 1
+        return release, index, serial
+
+    def due(self, clk: int) -> Iterator[Tuple[int, int, int]]:
+        while self.calendar and self.calendar[0][0] == clk:
+            yield self.pop()
+
+    def until(self, end: int) -> Iterator[Tuple[int, int, int]]:
+        # every job released up to end, in release order
+        while self.calendar and self.calendar[0][0] <= end:
+            yield self.pop()
+
+    def skip(self, offset: int) -> None:
+        # move the calendar and the numbering forward by a multiple of
+        # every period
+        for release, index in self.calendar:
+            template = self.templates[index]
+            self.serials[template.name] += offset // template.end_dln
+        self.calendar = [(release + offset, index) for release, index in self.calendar]
+
+    def clear(self) -> None:
+        self.calendar.clear()
+
+
+FIELDS: Tuple[str, ...] = ("name", "arrival", "estimated", "priority", "started", "stopped", "remaining", "completed",
+                           "serviced", "waited")
+
+
+class TaskRecord(Task):
+    # a standalone Task, its slots shadow the column properties
+    __slots__ = FIELDS
+
+    def service(self, ticks: int):
+        self.remaining -= ticks
+
+    def wait(self, ticks: int):
+        self.waited += ticks
+
+    def is_done(self) -> bool:
+        return self.remaining <= 0
+
+
+class RealtimeTaskRecord(RealtimeTask):
+    __slots__ = FIELDS + ("start_dln", "end_dln", "missed")
+
+    service = TaskRecord.service
+    wait = TaskRecord.wait
+
+    def is_done(self) -> bool:
+        return self.missed or self.remaining <= 0
+
+
+# the record class Task(...) hands out for each kind of row
+RECORDS: Dict[type, type] = {Task: TaskRecord, RealtimeTask: RealtimeTaskRecord}
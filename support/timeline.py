@@ -0,0 +1,203 @@
+from typing import *
+from array import array
+import json
+import struct
+import sys
+from .tasks import NONE
+from .results import Result, Segment, COMPLETED, PREEMPTED, MISSED
+
+# Columnar timeline layout, all little-endian:
+#   header  magic, version
+#   run     b"R", cpus, label length, utf-8 label; starts each schedule
+#   block   b"B", segment count, name count, then the block's distinct
+#           task names (length, utf-8 each) and the columns: name index
+#           as uint32, start, stop and cpu as int64 (NONE for none) and
+#           kind as int8 (an index into KINDS)
+# Blocks hold at most BLOCK segments and only their own names, so neither
+# the writer nor a reader needs more than a block in memory.
+MAGIC: bytes = b"STML"
+VERSION: int = 1
+BLOCK: int = 1 << 16
+KINDS: Tuple[str, ...] = (COMPLETED, PREEMPTED, MISSED)
+FILE_HEADER = struct.Struct("<4sH")
+RUN = struct.Struct("<cHI")
+BLOCK_HEADER = struct.Struct("<cII")
+NAME = struct.Struct("<H")
+FORMATS: Tuple[str, ...] = ("chrome", "columnar")
+
+
+class Block(NamedTuple):
+    label: str
+    names: List[str]
+    task: array
+    start: array
+    stop: array
+    cpu: array
+    kind: array
+
+
+def little(cells: array) -> array:
+    if sys.byteorder != "little":
+        cells.byteswap()
+    return cells
+
+
+class ColumnarWriter:
+    def __init__(self, file: BinaryIO):
+        self.file: BinaryIO = file
+        self.file.write(FILE_HEADER.pack(MAGIC, VERSION))
+
+    def begin(self, label: str, cpus: int = 1) -> None:
+        encoded = label.encode("utf-8")
+        self.file.write(RUN.pack(b"R", cpus, len(encoded)) + encoded)
+
+    def write(self, segments: List[Segment]) -> None:
+        for low in range(0, len(segments), BLOCK):
+            self.block(segments[low:low + BLOCK])
+
+    def block(self, segments: List[Segment]) -> None:
+        indexes = dict()
+        names = list()
+        task = array("I")
+        start = array("q")
+        stop = array("q")
+        cpu = array("q")
+        kind = array("b")
+        for segment in segments:
+            index = indexes.get(segment.task)
+            if index is None:
+                index = indexes[segment.task] = len(names)
+                names.append(segment.task)
+            task.append(index)
+            start.append(NONE if segment.start is None else segment.start)
+            stop.append(NONE if segment.stop is None else segment.stop)
+            cpu.append(NONE if segment.cpu is None else segment.cpu)
+            kind.append(KINDS.index(segment.kind))
+        parts = [BLOCK_HEADER.pack(b"B", len(segments), len(names))]
+        for name in names:
+            encoded = name.encode("utf-8")
+            parts.append(NAME.pack(len(encoded)) + encoded)
+        for cells in (task, start, stop, cpu, kind):
+            parts.append(little(cells).tobytes())
+        # one write per block
+        self.file.write(b"".join(parts))
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class ChromeWriter:
+    # Chrome trace-event JSON, as loaded by chrome://tracing and Perfetto:
+    # one process per schedule, one thread per processor, a complete event
+    # per segment and an instant event per miss. Ticks are written as
+    # microseconds. A miss has no time of its own, it is placed where the
+    # schedule had got to when it was reported.
+    def __init__(self, file: BinaryIO):
+        self.file: BinaryIO = file
+        self.pending: List[str] = list()
+        self.size: int = 0
+        self.events: int = 0
+        self.pid: int = 0
+        self.clk: int = 0
+        self.file.write(b'{"displayTimeUnit":"ns","traceEvents":[\n')
+
+    def emit(self, event: str) -> None:
+        self.pending.append(event if not self.events else ",\n" + event)
+        self.events += 1
+        self.size += len(event)
+        if self.size >= BLOCK * 64:
+            self.flush()
+
+    def flush(self) -> None:
+        self.file.write("".join(self.pending).encode("utf-8"))
+        self.pending.clear()
+        self.size = 0
+
+    def begin(self, label: str, cpus: int = 1) -> None:
+        self.pid += 1
+        self.clk = 0
+        self.emit('{{"ph":"M","pid":{},"name":"process_name","args":{{"name":{}}}}}'
+                  .format(self.pid, json.dumps(label)))
+        for cpu in range(cpus):
+            self.emit('{{"ph":"M","pid":{},"tid":{},"name":"thread_name","args":{{"name":"CPU{}"}}}}'
+                      .format(self.pid, cpu, cpu))
+
+    def write(self, segments: List[Segment]) -> None:
+        for segment in segments:
+            name = json.dumps(segment.task)
+            if segment.kind == MISSED:
+                scope = "p" if segment.cpu is None else "t"
+                self.emit('{{"ph":"i","pid":{},"tid":{},"name":{},"ts":{},"s":"{}","args":{{"end":"missed"}}}}'
+                          .format(self.pid, segment.cpu or 0, name, self.clk, scope))
+                continue
+            self.clk = max(self.clk, segment.stop)
+            self.emit('{{"ph":"X","pid":{},"tid":{},"name":{},"ts":{},"dur":{},"args":{{"end":"{}"}}}}'
+                      .format(self.pid, segment.cpu, name, segment.start, segment.stop - segment.start,
+                              segment.kind))
+
+    def close(self) -> None:
+        self.flush()
+        self.file.write(b"\n]}\n")
+        self.file.close()
+
+
+def open_timeline(filepath: str, style: str) -> Union[ChromeWriter, ColumnarWriter]:
+    if style == "chrome":
+        return ChromeWriter(open(filepath, "wb"))
+    if style == "columnar":
+        return ColumnarWriter(open(filepath, "wb"))
+    raise ValueError("unknown timeline format {}".format(style))
+
+
+def read_blocks(filepath: str) -> Iterator[Block]:
+    with open(filepath, "rb") as f:
+        magic, version = FILE_HEADER.unpack(f.read(FILE_HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("{} is not a version {} timeline".format(filepath, VERSION))
+        label = ""
+        while True:
+            tag = f.read(1)
+            if not tag:
+                return
+            if tag == b"R":
+                _, _, length = RUN.unpack(tag + f.read(RUN.size - 1))
+                label = f.read(length).decode("utf-8")
+                continue
+            if tag != b"B":
+                raise ValueError("{} is damaged".format(filepath))
+            _, count, named = BLOCK_HEADER.unpack(tag + f.read(BLOCK_HEADER.size - 1))
+            names = list()
+            for _ in range(named):
+                length, = NAME.unpack(f.read(NAME.size))
+                names.append(f.read(length).decode("utf-8"))
+            columns = list()
+            for code, width in (("I", 4), ("q", 8), ("q", 8), ("q", 8), ("b", 1)):
+                cells = array(code)
+                cells.frombytes(f.read(count * width))
+                columns.append(little(cells))
+            yield Block(label, names, *columns)
+
+
+def read_timeline(filepath: str) -> Iterator[Tuple[str, Segment]]:
+    # (schedule label, segment) in the order they were written
+    for block in read_blocks(filepath):
+        for index, start, stop, cpu, kind in zip(block.task, block.start, block.stop, block.cpu, block.kind):
+            yield block.label, Segment(block.names[index],
+                                       None if start == NONE else start,
+                                       None if stop == NONE else stop,
+                                       KINDS[kind],
+                                       None if cpu == NONE else cpu)
+
+
+def export_result(result: Result, writer: Union[ChromeWriter, ColumnarWriter], label: str) -> None:
+    # a schedule computed whole, by FCFS, SPN or on several processors
+    writer.begin(label, result.cpus)
+    writer.write(result.segments)
+
+
+def export(simulator: Any, writer: Union[ChromeWriter, ColumnarWriter], label: str) -> Result:
+    # Simulator.run() handing segments to writer a block at a time, so the
+    # schedule is never held whole. The Result returned keeps everything
+    # but the segments.
+    writer.begin(label)
+    return simulator.run(sink=lambda clk, segments: writer.write(segments), every=BLOCK)